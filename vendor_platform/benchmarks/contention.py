@@ -0,0 +1,275 @@
+import multiprocessing
+import queue
+import random
+import sys
+import threading
+import time
+from contextlib import ExitStack
+from datetime import date, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.signals import got_request_exception
+from django.db import DatabaseError, connection, connections
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from authentication.utils import generate_jwt_token
+from bookings.capacity import INACTIVE_STATUSES
+from bookings.models import Booking
+from bookings.views import BookingCreateView
+from vendors.models import Vendor, VendorService, VendorServiceCategory, AvailabilitySlot
+from .datagen import BENCHMARK_EMAIL_DOMAIN
+
+CONTENTION_EMAIL = f'contention@{BENCHMARK_EMAIL_DOMAIN}'
+FIRST_DATE = date(2098, 1, 1)
+# Seconds clients wait for each other to start, so a worker that died early cannot hold the rest
+START_TIMEOUT = 30
+# Seconds between checks for dead worker processes while collecting samples
+POLL_INTERVAL = 1
+
+# The test client's own exception hook is a global signal receiver, so with
+# several clients in threads one request's error is re-raised by another.
+# Errors are kept per thread instead and the clients return the 500.
+_request_error = threading.local()
+
+
+def _remember_error(sender, **kwargs):
+    _request_error.exc = sys.exc_info()[1]
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))], 3)
+
+
+def slot_weights(count, skew):
+    """Zipf weights: slot k gets 1 / (k + 1) ** skew of the traffic (0 = uniform)."""
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def classify_error(exc):
+    message = str(exc).lower()
+    if 'deadlock' in message or '1213' in message:
+        return 'deadlock'
+    if 'lock wait timeout' in message or 'database is locked' in message or 'table is locked' in message:
+        return 'lock_timeout'
+    return 'db_error'
+
+
+class LockWaitRecorder:
+    """Execute wrapper timing the row-locking reads, which is where waiting for other bookings happens."""
+
+    def __init__(self):
+        self.ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'FOR UPDATE' not in sql:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.ms += (time.perf_counter() - started) * 1000
+
+
+class ContentionFixture:
+    """A dedicated vendor and service with fresh slots; bookings of earlier runs are removed."""
+
+    def __init__(self, slots, capacity):
+        self.vendor, created = Vendor.objects.get_or_create(
+            email=CONTENTION_EMAIL,
+            defaults={
+                'vendor_id': 'BVCONTENTION', 'company_name': 'Contention Test', 'status': 'approved',
+                'password': make_password(None),
+            },
+        )
+        category = VendorServiceCategory.objects.order_by('id').first()
+        if category is None:
+            category = VendorServiceCategory.objects.create(name='Contention')
+        self.service, _ = VendorService.objects.get_or_create(
+            vendor=self.vendor, name='Contended service',
+            defaults={'category': category, 'description': 'Booking contention runs', 'base_price': 100},
+        )
+
+        Booking.objects.filter(vendor=self.vendor).delete()
+        AvailabilitySlot.objects.filter(vendor=self.vendor).delete()
+        self.slots = AvailabilitySlot.objects.bulk_create([
+            AvailabilitySlot(
+                vendor=self.vendor, service=self.service, date=FIRST_DATE + timedelta(days=index),
+                start_time='10:00', end_time='11:00', max_capacity=capacity,
+            )
+            for index in range(slots)
+        ])
+        self.slot_ids = list(
+            AvailabilitySlot.objects.filter(vendor=self.vendor).order_by('date').values_list('id', flat=True)
+        )
+        self.token = generate_jwt_token(self.vendor)
+
+    def check_invariants(self, booked_responses):
+        """Return a list of violations: overselling, or capacity counters out of step with the bookings."""
+        violations = []
+        counts = {
+            (row['booking_date'], row['start_time']): row['count']
+            for row in Booking.objects.filter(service=self.service).exclude(status__in=INACTIVE_STATUSES)
+            .values('booking_date', 'start_time').annotate(count=Count('id'))
+        }
+        booked_total = 0
+        for slot in AvailabilitySlot.objects.filter(vendor=self.vendor).order_by('date'):
+            bookings = counts.get((slot.date, slot.start_time), 0)
+            booked_total += slot.booked_capacity
+            if slot.booked_capacity > slot.max_capacity:
+                violations.append(f'slot {slot.id}: booked {slot.booked_capacity} > capacity {slot.max_capacity}')
+            if slot.booked_capacity != bookings:
+                violations.append(f'slot {slot.id}: booked_capacity {slot.booked_capacity} but {bookings} bookings')
+        if booked_total != booked_responses:
+            violations.append(f'{booked_responses} bookings confirmed to clients but {booked_total} counted')
+        return violations
+
+
+def _fire(path, token, service_id, slot_ids, barrier, put):
+    """One client: book each slot in `slot_ids` in turn and report every outcome."""
+    client = APIClient(raise_request_exception=False)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    recorder = LockWaitRecorder()
+    barrier.wait(START_TIMEOUT)
+    with connection.execute_wrapper(recorder):
+        for index, slot_id in enumerate(slot_ids):
+            data = {
+                'service_id': service_id, 'slot_id': slot_id, 'quantity': 1,
+                'customer_name': f'Customer {index}', 'customer_email': f'customer{index}@example.com',
+            }
+            waited = recorder.ms
+            started = time.perf_counter()
+            _request_error.exc = None
+            response = client.post(path, data, format='json')
+            if response.status_code == 201:
+                outcome = 'booked'
+            elif response.status_code == 400 and 'fully booked' in str(response.data):
+                outcome = 'sold_out'
+            elif response.status_code == 503:
+                outcome = 'shed'
+            elif isinstance(_request_error.exc, DatabaseError):
+                outcome = classify_error(_request_error.exc)
+            else:
+                outcome = f'http_{response.status_code}'
+            put((outcome, (time.perf_counter() - started) * 1000, recorder.ms - waited))
+    connection.close()
+
+
+class ContentionRunner:
+    """
+    Fire booking requests at a few hot slots from many threads or processes.
+
+    Requests pick their slot with a Zipf distribution (`skew` 0 is uniform,
+    higher values concentrate traffic on the first slots) and go through
+    the whole stack, including middleware, JWT authentication and
+    BookingCreateView's row lock. Throttling is disabled.
+    """
+
+    def __init__(self, workers=8, requests=400, slots=5, capacity=50, skew=1.2,
+                 mode='threads', seed=0, log=None):
+        self.workers = workers
+        self.requests = requests
+        self.slots = slots
+        self.capacity = capacity
+        self.skew = skew
+        self.mode = mode
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+    def run(self):
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']))
+            stack.enter_context(mock.patch.object(APIView, 'check_throttles', lambda self, request: None))
+            stack.enter_context(mock.patch.object(BookingCreateView, 'send_confirmation_email', lambda self, b: None))
+            got_request_exception.connect(_remember_error, dispatch_uid='benchmarks.contention')
+            stack.callback(got_request_exception.disconnect, dispatch_uid='benchmarks.contention')
+
+            fixture = ContentionFixture(self.slots, self.capacity)
+            targets = self.rng.choices(fixture.slot_ids, slot_weights(self.slots, self.skew), k=self.requests)
+            plans = [targets[index::self.workers] for index in range(self.workers)]
+            args = (reverse('create-booking'), fixture.token, fixture.service.id)
+
+            self.log(
+                f'{self.requests} requests from {self.workers} {self.mode} on {self.slots} slots '
+                f'of capacity {self.capacity} (skew {self.skew:g})'
+            )
+            started = time.perf_counter()
+            samples = self._run_threads(plans, args) if self.mode == 'threads' else self._run_processes(plans, args)
+            elapsed = time.perf_counter() - started
+
+            outcomes = {}
+            for outcome, _, _ in samples:
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            # Requests of workers that died before reporting them
+            if len(samples) < self.requests:
+                outcomes['lost'] = self.requests - len(samples)
+            latencies = [latency for _, latency, _ in samples]
+            lock_waits = [waited for _, _, waited in samples]
+            hot = fixture.slot_ids[0]
+            return {
+                'database': connection.vendor,
+                'mode': self.mode,
+                'workers': self.workers,
+                'requests': len(samples),
+                'slots': self.slots,
+                'capacity': self.capacity,
+                'skew': self.skew,
+                'hot_slot_share': round(targets.count(hot) / len(targets), 3),
+                'elapsed_s': round(elapsed, 3),
+                'throughput_rps': round(len(samples) / elapsed, 1),
+                'bookings_per_s': round(outcomes.get('booked', 0) / elapsed, 1),
+                'p50_ms': _percentile(latencies, 50),
+                'p99_ms': _percentile(latencies, 99),
+                'lock_wait_p50_ms': _percentile(lock_waits, 50),
+                'lock_wait_p99_ms': _percentile(lock_waits, 99),
+                'lock_wait_total_ms': round(sum(lock_waits), 1),
+                'outcomes': dict(sorted(outcomes.items())),
+                'violations': fixture.check_invariants(outcomes.get('booked', 0)),
+            }
+
+    def _run_threads(self, plans, args):
+        samples = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(plans))
+
+        def put(sample):
+            with lock:
+                samples.append(sample)
+
+        threads = [threading.Thread(target=_fire, args=(*args, plan, barrier, put)) for plan in plans]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples
+
+    def _run_processes(self, plans, args):
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(len(plans))
+        results = context.Queue()
+
+        # Forked children must not share the parent's database connection
+        connections.close_all()
+        processes = [context.Process(target=_fire, args=(*args, plan, barrier, results.put)) for plan in plans]
+        for process in processes:
+            process.start()
+        samples = []
+        expected = sum(map(len, plans))
+        while len(samples) < expected:
+            try:
+                samples.append(results.get(timeout=POLL_INTERVAL))
+            except queue.Empty:
+                # Everything a finished child sent has arrived by now; the rest is lost
+                if all(process.exitcode is not None for process in processes):
+                    break
+        for process in processes:
+            process.join()
+        return samples
@@ -0,0 +1,247 @@
+import random
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from faker import Faker
+
+from bookings.models import Booking
+from vendors.models import Vendor, VendorServiceCategory, VendorService, AvailabilitySlot
+
+BENCHMARK_EMAIL_DOMAIN = 'bench.example.com'
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+# Volumes at scale 1.0
+DEFAULT_VOLUMES = {
+    'vendors': 100_000,
+    'services': 1_000_000,
+    'slots': 1_000_000,
+    'bookings': 10_000_000,
+}
+
+CATEGORY_NAMES = [
+    'Web Development', 'Photography', 'Catering', 'Cleaning', 'Plumbing',
+    'Electrical', 'Tutoring', 'Fitness', 'Beauty', 'Event Planning',
+    'Moving', 'Landscaping',
+]
+
+VENDOR_STATUS_WEIGHTS = [('approved', 90), ('pending', 6), ('suspended', 3), ('rejected', 1)]
+BOOKING_STATUS_WEIGHTS = [
+    ('pending', 10), ('confirmed', 25), ('in_progress', 5),
+    ('completed', 45), ('cancelled', 12), ('refunded', 3),
+]
+INACTIVE_BOOKING_STATUSES = {'cancelled', 'refunded'}
+
+SLOT_HOURS = list(range(9, 17))
+
+
+def scaled_volumes(scale):
+    """Return DEFAULT_VOLUMES multiplied by scale (at least one row each)."""
+    return {name: max(1, int(count * scale)) for name, count in DEFAULT_VOLUMES.items()}
+
+
+def _spread(index, ratio):
+    """Number of children for parent `index` so that the totals follow `ratio` exactly."""
+    return int((index + 1) * ratio) - int(index * ratio)
+
+
+def _weighted(rng, weights):
+    values, cum_weights = zip(*weights)
+    return rng.choices(values, weights=cum_weights)[0]
+
+
+class BenchmarkDataGenerator:
+    """
+    Bulk-seed vendors, services, availability slots and bookings.
+
+    Rows are generated vendor chunk by vendor chunk so memory stays flat no
+    matter how many bookings are requested; each chunk is one transaction.
+    """
+
+    def __init__(self, volumes, batch_size=5000, seed=42, log=None):
+        self.volumes = volumes
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+        faker = Faker()
+        Faker.seed(seed)
+        self.company_names = [faker.company() for _ in range(2000)]
+        self.locations = [(faker.city(), faker.state()) for _ in range(300)]
+        self.descriptions = [faker.paragraph(nb_sentences=4) for _ in range(500)]
+        self.streets = [faker.street_address() for _ in range(1000)]
+        self.customer_names = [faker.name() for _ in range(2000)]
+        self.password_hash = make_password(BENCHMARK_PASSWORD)
+        self.today = date.today()
+
+    def run(self):
+        categories = self.ensure_categories()
+
+        vendors = self.volumes['vendors']
+        services_per_vendor = self.volumes['services'] / vendors
+        slots_per_service = self.volumes['slots'] / self.volumes['services']
+        bookings_per_slot = self.volumes['bookings'] / self.volumes['slots']
+
+        # Size vendor chunks so the largest table gets roughly batch_size rows per chunk
+        rows_per_vendor = max(1, self.volumes['bookings'] // vendors)
+        chunk_size = max(1, self.batch_size // rows_per_vendor)
+
+        start = Vendor.objects.filter(email__endswith='@' + BENCHMARK_EMAIL_DOMAIN).count()
+        totals = {'vendors': 0, 'services': 0, 'slots': 0, 'bookings': 0}
+        service_cursor = slot_cursor = 0
+
+        for chunk_start in range(start, start + vendors, chunk_size):
+            chunk = range(chunk_start, min(chunk_start + chunk_size, start + vendors))
+            with transaction.atomic():
+                vendor_ids = self.create_vendors(chunk)
+                service_rows = self.create_services(
+                    vendor_ids, categories, services_per_vendor, totals['vendors']
+                )
+                service_cursor += len(service_rows)
+                slot_plan = self.create_slots(
+                    service_rows, slots_per_service, bookings_per_slot,
+                    service_cursor - len(service_rows), slot_cursor
+                )
+                slot_cursor += len(slot_plan)
+                booking_count = self.create_bookings(vendor_ids, service_rows, slot_plan)
+
+            totals['vendors'] += len(vendor_ids)
+            totals['services'] += len(service_rows)
+            totals['slots'] += len(slot_plan)
+            totals['bookings'] += booking_count
+            self.log(
+                f"{totals['vendors']}/{vendors} vendors, {totals['services']} services, "
+                f"{totals['slots']} slots, {totals['bookings']} bookings"
+            )
+
+        return totals
+
+    def ensure_categories(self):
+        for name in CATEGORY_NAMES:
+            VendorServiceCategory.objects.get_or_create(
+                name=name, defaults={'description': f'{name} services'}
+            )
+        return list(
+            VendorServiceCategory.objects.filter(name__in=CATEGORY_NAMES).values_list('id', 'name')
+        )
+
+    def create_vendors(self, chunk):
+        rng = self.rng
+        vendors = []
+        for index in chunk:
+            city, state = rng.choice(self.locations)
+            vendors.append(Vendor(
+                vendor_id=f'BV{index:09d}',
+                email=f'vendor{index}@{BENCHMARK_EMAIL_DOMAIN}',
+                password=self.password_hash,
+                company_name=f'{rng.choice(self.company_names)} {index}',
+                description=rng.choice(self.descriptions),
+                address=rng.choice(self.streets),
+                city=city,
+                state=state,
+                country='United States',
+                zip_code=f'{rng.randint(10000, 99999)}',
+                phone=f'+1{rng.randint(2000000000, 9999999999)}',
+                status=_weighted(rng, VENDOR_STATUS_WEIGHTS),
+                rating=round(rng.uniform(1, 5), 1),
+                total_reviews=rng.randint(0, 500),
+            ))
+            vendors[-1].sync_normalized()
+        Vendor.objects.bulk_create(vendors, batch_size=self.batch_size)
+
+        codes = [vendor.vendor_id for vendor in vendors]
+        id_by_code = dict(Vendor.objects.filter(vendor_id__in=codes).values_list('vendor_id', 'id'))
+        return [id_by_code[code] for code in codes]
+
+    def create_services(self, vendor_ids, categories, ratio, cursor):
+        rng = self.rng
+        services = []
+        for vendor_id in vendor_ids:
+            for position in range(_spread(cursor, ratio)):
+                category_id, category_name = rng.choice(categories)
+                services.append(VendorService(
+                    vendor_id=vendor_id,
+                    category_id=category_id,
+                    name=f'{category_name} package {position}',
+                    description=rng.choice(self.descriptions),
+                    base_price=Decimal(rng.randint(2000, 200000)) / 100,
+                ))
+            cursor += 1
+        VendorService.objects.bulk_create(services, batch_size=self.batch_size)
+
+        return list(
+            VendorService.objects.filter(vendor_id__in=vendor_ids)
+            .order_by('id')
+            .values_list('id', 'vendor_id', 'base_price')
+        )
+
+    def create_slots(self, service_rows, slots_ratio, bookings_ratio, service_cursor, slot_cursor):
+        """Create slots and return [(slot key, [booking status, ...])] for the booking pass."""
+        rng = self.rng
+        slots = []
+        plan = []
+        first_day = self.today - timedelta(days=180)
+        for service_id, vendor_id, _ in service_rows:
+            for position in range(_spread(service_cursor, slots_ratio)):
+                slot_day = first_day + timedelta(days=position // len(SLOT_HOURS))
+                hour = SLOT_HOURS[position % len(SLOT_HOURS)]
+                statuses = [
+                    _weighted(rng, BOOKING_STATUS_WEIGHTS)
+                    for _ in range(_spread(slot_cursor + len(plan), bookings_ratio))
+                ]
+                booked = sum(1 for value in statuses if value not in INACTIVE_BOOKING_STATUSES)
+                slots.append(AvailabilitySlot(
+                    vendor_id=vendor_id,
+                    service_id=service_id,
+                    date=slot_day,
+                    start_time=time(hour),
+                    end_time=time(hour + 1),
+                    is_available=slot_day >= self.today,
+                    max_capacity=max(1, booked + rng.randint(0, 3)),
+                    booked_capacity=booked,
+                ))
+                plan.append(((vendor_id, service_id, slot_day, hour), statuses))
+            service_cursor += 1
+        AvailabilitySlot.objects.bulk_create(slots, batch_size=self.batch_size)
+        return plan
+
+    def create_bookings(self, vendor_ids, service_rows, slot_plan):
+        rng = self.rng
+        price_by_service = {service_id: price for service_id, _, price in service_rows}
+        # Booking ids are derived from the vendor id so reruns never collide
+        sequence = {vendor_id: 0 for vendor_id in vendor_ids}
+        bookings = []
+        created = 0
+
+        for (vendor_id, service_id, slot_day, hour), statuses in slot_plan:
+            for booking_status in statuses:
+                quantity = rng.randint(1, 3)
+                base_price = price_by_service[service_id]
+                subtotal = base_price * quantity
+                platform_fee = (subtotal * Decimal('0.15')).quantize(Decimal('0.01'))
+                tax_amount = (subtotal * Decimal('0.08')).quantize(Decimal('0.01'))
+                sequence[vendor_id] += 1
+                bookings.append(Booking(
+                    booking_id=f'BB{vendor_id:08d}{sequence[vendor_id]:05d}',
+                    vendor_id=vendor_id,
+                    service_id=service_id,
+                    customer_name=rng.choice(self.customer_names),
+                    customer_email=f'customer{rng.randint(1, 10**7)}@{BENCHMARK_EMAIL_DOMAIN}',
+                    booking_date=slot_day,
+                    start_time=time(hour),
+                    end_time=time(hour + 1),
+                    quantity=quantity,
+                    base_price=base_price,
+                    tax_amount=tax_amount,
+                    platform_fee=platform_fee,
+                    total_amount=subtotal + platform_fee + tax_amount,
+                    status=booking_status,
+                ))
+                if len(bookings) >= self.batch_size:
+                    Booking.objects.bulk_create(bookings, batch_size=self.batch_size)
+                    created += len(bookings)
+                    bookings = []
+
+        Booking.objects.bulk_create(bookings, batch_size=self.batch_size)
+        return created + len(bookings)
@@ -0,0 +1,300 @@
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import date, datetime
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from authentication.utils import generate_jwt_token
+from bookings.models import Booking
+from vendors.models import Vendor, VendorService, VendorServiceCategory, AvailabilitySlot
+from .datagen import BENCHMARK_EMAIL_DOMAIN
+
+# Absolute noise floor per metric; smaller changes are never reported as regressions
+ABSOLUTE_TOLERANCE = {
+    'p50_ms': 1.0,
+    'p95_ms': 1.0,
+    'queries': 0,
+    'peak_memory_kb': 64,
+}
+
+
+class BenchmarkFixture:
+    """Objects the route scenarios act on, picked from the seeded data."""
+
+    def __init__(self):
+        self.vendor = (
+            Vendor.objects.filter(
+                status='approved',
+                email__endswith='@' + BENCHMARK_EMAIL_DOMAIN,
+                services__isnull=False,
+            )
+            .order_by('id')
+            .first()
+        )
+        if self.vendor is None:
+            raise LookupError('No seeded vendor found; run seed_benchmark_data first')
+
+        self.token = generate_jwt_token(self.vendor)
+        self.service = VendorService.objects.filter(vendor=self.vendor).order_by('id').first()
+        self.booking = Booking.objects.filter(vendor=self.vendor).order_by('id').first()
+        self.booking_ids = list(
+            Booking.objects.filter(vendor=self.vendor).order_by('id').values_list('id', flat=True)[:100]
+        )
+        self.category = VendorServiceCategory.objects.order_by('id').first()
+        self.city = self.vendor.city
+
+        # A dedicated slot that never fills up, so create-booking keeps succeeding
+        self.slot, _ = AvailabilitySlot.objects.get_or_create(
+            vendor=self.vendor,
+            service=self.service,
+            date=date(2099, 1, 1),
+            start_time='10:00',
+            defaults={'end_time': '11:00', 'max_capacity': 10 ** 9},
+        )
+
+
+def _registration(fixture, iteration):
+    return {
+        'email': f'register{iteration}-{time.time_ns()}@{BENCHMARK_EMAIL_DOMAIN}',
+        'password': 'benchmark-password',
+        'company_name': 'Benchmark Registration',
+        'address': '1 Benchmark Way',
+        'city': fixture.city,
+        'state': fixture.vendor.state,
+        'country': 'United States',
+        'zip_code': '10001',
+        'phone': '+12025550100',
+    }
+
+
+def _new_service(fixture, iteration):
+    return {
+        'category': fixture.category.id,
+        'name': f'Benchmark service {iteration}-{time.time_ns()}',
+        'description': 'Created by the benchmark harness',
+        'base_price': '99.00',
+    }
+
+
+def _new_slot(fixture, iteration):
+    return {
+        'service': fixture.service.id,
+        'date': f'2098-01-{1 + iteration % 28:02d}',
+        'start_time': f'{iteration % 24:02d}:00',
+        'end_time': f'{iteration % 24:02d}:30',
+        'max_capacity': 5,
+    }
+
+
+def _new_booking(fixture, iteration):
+    return {
+        'service_id': fixture.service.id,
+        'slot_id': fixture.slot.id,
+        'quantity': 1,
+        'customer_name': 'Benchmark Customer',
+        'customer_email': f'customer@{BENCHMARK_EMAIL_DOMAIN}',
+    }
+
+
+# url name -> (method, reverse kwargs, request data builder, authenticated)
+SCENARIOS = {
+    'vendor-register': ('post', None, _registration, False),
+    'vendor-login': (
+        'post', None,
+        lambda fixture, i: {'email': fixture.vendor.email, 'password': 'benchmark-password'},
+        False,
+    ),
+    'vendor-profile': ('get', None, None, True),
+    'vendor-services': ('get', None, None, True),
+    'vendor-service-detail': ('get', lambda fixture: {'pk': fixture.service.id}, None, True),
+    'vendor-availability': ('get', None, None, True),
+    'vendor-availability-calendar': ('get', None, None, True),
+    'vendor-availability-rules': ('get', None, None, True),
+    'vendor-bookings': ('get', None, None, True),
+    'vendor-booking-detail': ('get', lambda fixture: {'pk': fixture.booking.id}, None, True),
+    'vendor-booking-transition': (
+        'post', None,
+        lambda fixture, i: {'booking_ids': fixture.booking_ids, 'status': 'confirmed'},
+        True,
+    ),
+    'create-booking': ('post', None, _new_booking, True),
+    'create-slot-hold': ('post', None, _new_booking, True),
+    'vendor-search': ('get', None, lambda fixture, i: {'city': fixture.city, 'ordering': 'rating'}, False),
+}
+
+# Write scenarios that are also worth measuring, keyed by a synthetic route name
+EXTRA_SCENARIOS = {
+    'vendor-services:post': ('vendor-services', 'post', None, _new_service, True),
+    'vendor-availability:post': ('vendor-availability', 'post', None, _new_slot, True),
+}
+
+
+def discover_routes():
+    """Return the names of the routes in config/urls.py, in declaration order."""
+    from config import urls
+
+    return [
+        pattern.name for pattern in urls.urlpatterns
+        if isinstance(pattern, URLPattern) and pattern.name
+    ]
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class BenchmarkRunner:
+    def __init__(self, iterations=20, warmup=3, routes=None, cold_cache=False,
+                 with_throttling=False, log=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.routes = routes
+        self.cold_cache = cold_cache
+        self.with_throttling = with_throttling
+        self.log = log or (lambda message: None)
+
+    def scenarios(self):
+        selected = {}
+        skipped = {}
+        for name in discover_routes():
+            if name in SCENARIOS:
+                method, kwargs, data, auth = SCENARIOS[name]
+                selected[name] = (name, method, kwargs, data, auth)
+            else:
+                skipped[name] = 'no scenario defined'
+        for key, scenario in EXTRA_SCENARIOS.items():
+            if scenario[0] in selected:
+                selected[key] = scenario
+
+        if self.routes:
+            unknown = set(self.routes) - set(selected)
+            if unknown:
+                raise KeyError(f"Unknown benchmark routes: {', '.join(sorted(unknown))}")
+            selected = {key: value for key, value in selected.items() if key in self.routes}
+        return selected, skipped
+
+    def run(self):
+        selected, skipped = self.scenarios()
+        results = {}
+
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']))
+            if not self.with_throttling:
+                stack.enter_context(mock.patch.object(APIView, 'check_throttles', lambda self, request: None))
+
+            # Everything the scenarios write is rolled back so runs stay comparable
+            with transaction.atomic():
+                fixture = BenchmarkFixture()
+                for key, scenario in selected.items():
+                    self.log(f'Benchmarking {key}')
+                    try:
+                        with transaction.atomic():
+                            results[key] = self.measure(fixture, *scenario)
+                    except Exception as exc:
+                        skipped[key] = f'failed: {exc!r}'
+                transaction.set_rollback(True)
+
+        return {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'iterations': self.iterations,
+            'routes': results,
+            'skipped': skipped,
+        }
+
+    def measure(self, fixture, name, method, kwargs, data_builder, authenticated):
+        client = APIClient()
+        if authenticated:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {fixture.token}')
+        path = reverse(name, kwargs=kwargs(fixture) if kwargs else None)
+
+        def call(iteration):
+            if self.cold_cache:
+                cache.clear()
+            data = data_builder(fixture, iteration) if data_builder else None
+            if method == 'get':
+                return client.get(path, data)
+            return getattr(client, method)(path, data, format='json')
+
+        for iteration in range(self.warmup):
+            call(iteration)
+
+        timings = []
+        for iteration in range(self.warmup, self.warmup + self.iterations):
+            started = time.perf_counter()
+            response = call(iteration)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Query count and memory are taken from one extra, instrumented request
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = call(self.warmup + self.iterations)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'method': method.upper(),
+            'path': path,
+            'status': response.status_code,
+            'mean_ms': round(statistics.mean(timings), 3),
+            'min_ms': round(min(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'p50_ms': round(_percentile(timings, 50), 3),
+            'p95_ms': round(_percentile(timings, 95), 3),
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+
+def compare_results(current, baseline, thresholds):
+    """
+    Return the regressions of `current` against `baseline`.
+
+    A metric regresses when it grows by more than its relative threshold
+    and by more than its absolute noise floor.
+    """
+    regressions = []
+    for route, metrics in current['routes'].items():
+        reference = baseline.get('routes', {}).get(route)
+        if not reference:
+            continue
+        for metric, threshold in thresholds.items():
+            if metric not in metrics or metric not in reference:
+                continue
+            before, after = reference[metric], metrics[metric]
+            allowed = before * (1 + threshold)
+            if after > allowed and after - before > ABSOLUTE_TOLERANCE.get(metric, 0):
+                regressions.append({
+                    'route': route,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': round((after - before) / before, 3) if before else None,
+                })
+    return regressions
+
+
+def write_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as handle:
+        return json.load(handle)
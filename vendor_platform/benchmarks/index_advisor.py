@@ -0,0 +1,238 @@
+import re
+
+from django.apps import apps
+from django.db import connection
+
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE')
+
+_TABLE_REF = re.compile(
+    r'\b(?:FROM|JOIN|UPDATE)\s+[`"]?(\w+)[`"]?(?:\s+(?:AS\s+)?[`"]?(\w+)[`"]?)?', re.IGNORECASE
+)
+_SQL_KEYWORDS = {
+    'ON', 'WHERE', 'INNER', 'LEFT', 'RIGHT', 'OUTER', 'CROSS', 'JOIN', 'GROUP', 'ORDER',
+    'LIMIT', 'SET', 'AS', 'USING', 'HAVING', 'UNION', 'FOR', 'WINDOW',
+}
+_COMPARISON = re.compile(
+    r'(UPPER\(|LOWER\()?[`"]?(\w+)[`"]?\.[`"]?(\w+)[`"]?\)?\s*(=|<=|>=|<|>|IN\b|LIKE\b|BETWEEN\b)',
+    re.IGNORECASE,
+)
+_SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+_SQLITE_SCAN = re.compile(r'^(SCAN|SEARCH) (?:TABLE )?(\w+)(?: AS (\w+))?')
+
+RANGE_OPERATORS = {'<', '>', '<=', '>=', 'BETWEEN', 'LIKE'}
+
+
+def table_aliases(sql):
+    """Map every alias (and table name) used in `sql` to its table."""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.upper() not in _SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def filtered_columns(sql):
+    """
+    Return {table: [(column, operator, wrapped_in_function), ...]} for WHERE-style comparisons.
+    """
+    aliases = table_aliases(sql)
+    where = re.split(r'\bWHERE\b', sql, maxsplit=1, flags=re.IGNORECASE)
+    predicates = where[1] if len(where) > 1 else ''
+    # JOIN conditions are handled by foreign key indexes; only look at filters
+    columns = {}
+    for function, alias, column, operator in _COMPARISON.findall(predicates):
+        table = aliases.get(alias)
+        if table is None:
+            continue
+        entry = (column, operator.upper(), bool(function))
+        if entry not in columns.setdefault(table, []):
+            columns[table].append(entry)
+    return columns
+
+
+def explain(sql, params):
+    """Run EXPLAIN for `sql` and return the plan as a list of dicts."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [{'detail': row[-1]} for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN ' + sql, params)
+        names = [column[0].lower() for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def analyze_plan(plan, aliases):
+    """
+    Turn an EXPLAIN plan into findings.
+
+    Returns (findings, used_indexes) where findings are dicts with a
+    `table` and an `issue` of full_scan, filesort or temporary.
+    """
+    findings = []
+    used = set()
+
+    for row in plan:
+        if 'detail' in row:
+            detail = row['detail']
+            index = _SQLITE_INDEX.search(detail)
+            if index:
+                used.add(index.group(1))
+            scan = _SQLITE_SCAN.match(detail)
+            if scan:
+                table = aliases.get(scan.group(2), scan.group(2))
+                if scan.group(1) == 'SCAN' and not index:
+                    findings.append({'table': table, 'issue': 'full_scan'})
+            if 'TEMP B-TREE FOR ORDER BY' in detail:
+                findings.append({'table': None, 'issue': 'filesort'})
+            elif 'TEMP B-TREE' in detail:
+                findings.append({'table': None, 'issue': 'temporary'})
+            continue
+
+        table = aliases.get(row.get('table'), row.get('table'))
+        extra = row.get('extra') or ''
+        if row.get('key'):
+            used.update(row['key'].split(','))
+        if row.get('type') == 'ALL':
+            findings.append({'table': table, 'issue': 'full_scan', 'rows': row.get('rows')})
+        if 'Using filesort' in extra:
+            findings.append({'table': table, 'issue': 'filesort'})
+        if 'Using temporary' in extra:
+            findings.append({'table': table, 'issue': 'temporary'})
+
+    return findings, used
+
+
+def declared_indexes():
+    """{index name: (model, fields)} for the Meta.indexes of the project's models."""
+    indexes = {}
+    for model in apps.get_models():
+        if model._meta.app_config.name.startswith('django.'):
+            continue
+        for index in model._meta.indexes:
+            indexes[index.name] = (model, list(index.fields))
+    return indexes
+
+
+def suggest_index(table, columns):
+    """Equality columns first, then at most one range column, as in a B-tree prefix."""
+    model = next((m for m in apps.get_models() if m._meta.db_table == table), None)
+    if model is None:
+        return None
+
+    by_column = {field.column: field.name for field in model._meta.concrete_fields}
+    equality = [by_column[c] for c, op, wrapped in columns if op in ('=', 'IN') and not wrapped and c in by_column]
+    ranges = [by_column[c] for c, op, wrapped in columns if op in RANGE_OPERATORS and not wrapped and c in by_column]
+    fields = list(dict.fromkeys(equality + ranges[:1]))[:3]
+    if not fields:
+        return None
+
+    existing = [list(index.fields) for index in model._meta.indexes]
+    if fields in existing or any(index[:len(fields)] == fields for index in existing):
+        return None
+    return model, fields
+
+
+def advise(collector, top=20):
+    """Explain the `top` most expensive fingerprints and build a report."""
+    queries = []
+    suggestions = {}
+    used_indexes = set()
+
+    for key, entry in collector.top():
+        if len(queries) >= top:
+            break
+        sql = entry['sample_sql']
+        if not sql.lstrip().upper().startswith(EXPLAINABLE) or entry['sample_params'] is None:
+            continue
+
+        aliases = table_aliases(sql)
+        try:
+            plan = explain(sql, entry['sample_params'])
+        except Exception as exc:
+            queries.append({'fingerprint': key, 'error': str(exc), **_timings(entry)})
+            continue
+
+        findings, used = analyze_plan(plan, aliases)
+        used_indexes |= used
+        columns = filtered_columns(sql)
+
+        for table, table_columns in columns.items():
+            for column, operator, wrapped in table_columns:
+                if wrapped:
+                    findings.append({'table': table, 'issue': 'function_on_column', 'column': column})
+
+        for finding in findings:
+            if finding['issue'] != 'full_scan' or finding['table'] not in columns:
+                continue
+            suggestion = suggest_index(finding['table'], columns[finding['table']])
+            if suggestion:
+                model, fields = suggestion
+                suggestions[(model._meta.label, tuple(fields))] = (model, fields)
+
+        queries.append({
+            'fingerprint': key,
+            'findings': findings,
+            'indexes_used': sorted(used),
+            'plan': plan,
+            **_timings(entry),
+        })
+
+    unused = [
+        {'index': name, 'model': model._meta.label, 'fields': fields}
+        for name, (model, fields) in declared_indexes().items()
+        if name not in used_indexes
+    ]
+
+    return {
+        'database': connection.vendor,
+        'queries': queries,
+        'unused_indexes': unused,
+        'suggested_indexes': [
+            {'model': model._meta.label, 'fields': fields} for model, fields in suggestions.values()
+        ],
+        'migration': suggested_migration(suggestions.values()),
+    }
+
+
+def _timings(entry):
+    return {
+        'count': entry['count'],
+        'total_ms': round(entry['total_ms'], 3),
+        'mean_ms': round(entry['total_ms'] / entry['count'], 3) if entry['count'] else 0,
+    }
+
+
+def suggested_migration(suggestions):
+    """Render the suggested indexes as a migration module (one per app, concatenated)."""
+    by_app = {}
+    for model, fields in suggestions:
+        by_app.setdefault(model._meta.app_label, []).append((model, fields))
+    if not by_app:
+        return ''
+
+    modules = []
+    for app_label, items in sorted(by_app.items()):
+        operations = '\n'.join(
+            f"        migrations.AddIndex(\n"
+            f"            model_name='{model._meta.model_name}',\n"
+            f"            index=models.Index(fields={fields!r}, name='{_index_name(model, fields)}'),\n"
+            f"        ),"
+            for model, fields in items
+        )
+        modules.append(
+            f"# {app_label}/migrations/XXXX_advised_indexes.py\n"
+            "from django.db import migrations, models\n\n\n"
+            "class Migration(migrations.Migration):\n"
+            "    # Replace with the app's current latest migration\n"
+            f"    dependencies = [('{app_label}', '<latest migration>')]\n\n"
+            "    operations = [\n"
+            f"{operations}\n"
+            "    ]\n"
+        )
+    return '\n\n'.join(modules)
+
+
+def _index_name(model, fields):
+    name = f"{model._meta.db_table[:11]}_{'_'.join(field[:7] for field in fields)}_idx"
+    return name[:30]
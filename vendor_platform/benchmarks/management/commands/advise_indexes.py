@@ -0,0 +1,59 @@
+import glob
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.index_advisor import advise
+from utils.query_fingerprints import QueryFingerprintCollector
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the most expensive query fingerprints captured by run_benchmarks --fingerprints '
+        'or the sampling middleware, and report full scans, filesorts, unused indexes and '
+        'suggested new indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('inputs', nargs='*',
+                            help='Fingerprint JSON files (default: every file in QUERY_FINGERPRINT_DIR)')
+        parser.add_argument('--top', type=int, default=20, help='Fingerprints to EXPLAIN, by total time')
+        parser.add_argument('--output', help='Write the full report as JSON')
+        parser.add_argument('--migration', help='Write the suggested migration to this path')
+
+    def handle(self, *args, **options):
+        inputs = options['inputs'] or sorted(
+            glob.glob(os.path.join(settings.QUERY_FINGERPRINT_DIR, '*.json'))
+        )
+        if not inputs:
+            raise CommandError('No fingerprint files given or found in QUERY_FINGERPRINT_DIR')
+
+        report = advise(QueryFingerprintCollector.load(*inputs), top=options['top'])
+
+        for query in report['queries']:
+            issues = ', '.join(
+                finding['issue'] + (f" on {finding['table']}" if finding.get('table') else '')
+                for finding in query.get('findings', [])
+            ) or query.get('error', 'ok')
+            self.stdout.write(
+                f"{query['count']:>6}x {query['total_ms']:>10.1f}ms  {issues}\n"
+                f"        {query['fingerprint'][:160]}"
+            )
+
+        for index in report['unused_indexes']:
+            self.stdout.write(self.style.WARNING(
+                f"Unused index {index['index']} on {index['model']} {index['fields']}"
+            ))
+        for index in report['suggested_indexes']:
+            self.stdout.write(self.style.SUCCESS(f"Suggested index on {index['model']} {index['fields']}"))
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2, default=str)
+        if options['migration'] and report['migration']:
+            with open(options['migration'], 'w') as handle:
+                handle.write(report['migration'])
+        elif report['migration']:
+            self.stdout.write('\n' + report['migration'])
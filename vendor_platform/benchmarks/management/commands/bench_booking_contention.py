@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.contention import ContentionRunner
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent booking requests at a few hot slots and report throughput, latency, '
+        'lock waits and deadlocks; fails if any slot is oversold or its counter is off.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent clients (default: 8)')
+        parser.add_argument('--mode', choices=['threads', 'processes'], default='threads')
+        parser.add_argument('--requests', type=int, default=400, help='Booking requests in total (default: 400)')
+        parser.add_argument('--slots', type=int, default=5, help='Slots competed for (default: 5)')
+        parser.add_argument('--capacity', type=int, default=50, help='Capacity of each slot (default: 50)')
+        parser.add_argument(
+            '--skew', type=float, default=1.2,
+            help='Zipf exponent of the slot choice; 0 spreads requests evenly (default: 1.2)',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the report as JSON to this path')
+
+    def handle(self, *args, **options):
+        runner = ContentionRunner(
+            workers=options['workers'], requests=options['requests'], slots=options['slots'],
+            capacity=options['capacity'], skew=options['skew'], mode=options['mode'],
+            seed=options['seed'], log=self.stdout.write,
+        )
+        report = runner.run()
+
+        self.stdout.write(
+            f"{report['requests']} requests in {report['elapsed_s']}s on {report['database']}: "
+            f"{report['throughput_rps']} req/s, {report['bookings_per_s']} bookings/s, "
+            f"{report['hot_slot_share']:.0%} on the hottest slot"
+        )
+        self.stdout.write(
+            f"latency p50 {report['p50_ms']}ms p99 {report['p99_ms']}ms; "
+            f"lock wait p50 {report['lock_wait_p50_ms']}ms p99 {report['lock_wait_p99_ms']}ms "
+            f"total {report['lock_wait_total_ms']}ms"
+        )
+        self.stdout.write('outcomes: ' + ', '.join(f'{name} {count}' for name, count in report['outcomes'].items()))
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+
+        for violation in report['violations']:
+            self.stderr.write(violation)
+        lost = report['outcomes'].get('lost')
+        if lost:
+            raise CommandError(f'{lost} request(s) lost: a worker died before reporting them')
+        if report['violations']:
+            raise CommandError(f"{len(report['violations'])} invariant violation(s)")
+        self.stdout.write(self.style.SUCCESS('Invariants hold: no slot oversold, counters match the bookings'))
@@ -0,0 +1,73 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.index_advisor import analyze_plan, explain, table_aliases
+from services.filters import VendorFilter
+from vendors.models import Vendor
+
+
+def _plan_summary(queryset):
+    sql, params = queryset.query.sql_with_params()
+    findings, used = analyze_plan(explain(sql, params), table_aliases(sql))
+    scans = sorted({finding['table'] for finding in findings if finding['issue'] == 'full_scan'})
+    parts = [f"index {', '.join(sorted(used))}" if used else 'no index']
+    if scans:
+        parts.append(f"full scan of {', '.join(scans)}")
+    return '; '.join(parts)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the old iexact city/state filter with the exact match on the folded columns '
+        'used by VendorFilter: EXPLAIN both, check they return the same vendors and time them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--locations', type=int, default=20, help='Distinct city/state pairs to query')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the median is reported')
+
+    def handle(self, *args, **options):
+        base = Vendor.objects.filter(status='approved')
+        locations = list(
+            base.values_list('city', 'state').distinct().order_by('city', 'state')[:options['locations']]
+        )
+        if not locations:
+            raise CommandError('No approved vendors found; run seed_benchmark_data first')
+
+        def legacy(city, state):
+            return base.filter(city__iexact=city, state__iexact=state).values_list('id', flat=True)
+
+        def normalized(city, state):
+            # Upper-cased input, as users type it; the folded columns make case irrelevant
+            params = {'city': city.upper(), 'state': state.upper()}
+            return VendorFilter(params, queryset=base).qs.values_list('id', flat=True)
+
+        self.stdout.write(
+            f'{Vendor.objects.count()} vendors, {len(locations)} locations, {connection.vendor} backend'
+        )
+        results = {}
+        for name, build in (('iexact', legacy), ('normalized', normalized)):
+            self.stdout.write(f'{name:>10}: {_plan_summary(build(*locations[0]))}')
+            timings = []
+            matches = []
+            for city, state in locations:
+                queryset = build(city, state)
+                runs = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    ids = sorted(queryset.all())
+                    runs.append((time.perf_counter() - started) * 1000)
+                timings.append(statistics.median(runs))
+                matches.append(ids)
+            results[name] = matches
+            self.stdout.write(
+                f'{"":>10}  median {statistics.median(timings):.3f}ms, '
+                f'total {sum(timings):.1f}ms, {sum(map(len, matches))} vendors matched'
+            )
+
+        if results['iexact'] != results['normalized']:
+            raise CommandError('The two filters returned different vendors')
+        self.stdout.write(self.style.SUCCESS('Both filters returned the same vendors'))
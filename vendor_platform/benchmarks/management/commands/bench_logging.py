@@ -0,0 +1,98 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.log import JsonFormatter, QueueHandler, SamplingFilter
+
+
+class StalledFileHandler(logging.FileHandler):
+    """A file handler on a slow disk: every write takes `delay` seconds."""
+
+    def __init__(self, filename, delay):
+        super().__init__(filename)
+        self.delay = delay
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        super().emit(record)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the cost of a log call to the request thread: synchronous JSON file '
+        'logging against the queue handler, on a normal and on a stalled disk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=20000, help='Log calls per case (default: 20000)')
+        parser.add_argument('--stall-ms', type=float, default=1.0, help='Write delay of the stalled disk (default: 1ms)')
+        parser.add_argument('--queue-size', type=int, default=10000, help='Queue handler capacity (default: 10000)')
+        parser.add_argument('--sample-rate', type=float, default=0.1, help='INFO sample rate for the sampled case')
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        stall = options['stall_ms'] / 1000
+        # A stalled disk is too slow to push every call through synchronously
+        stalled_calls = min(calls, max(1, int(2 / stall))) if stall else calls
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.log')
+
+            def file_handler():
+                return logging.FileHandler(path)
+
+            def stalled_handler():
+                return StalledFileHandler(path, stall)
+
+            def queued(target, sample_rate=None):
+                def build():
+                    handler = QueueHandler([target()], maxsize=options['queue_size'])
+                    if sample_rate is not None:
+                        handler.addFilter(SamplingFilter(sample_rate))
+                    return handler
+                return build
+
+            cases = [
+                ('sync file', file_handler, calls),
+                ('queued file', queued(file_handler), calls),
+                (f"queued file, INFO sampled {options['sample_rate']:g}", queued(file_handler, options['sample_rate']), calls),
+                (f"sync stalled disk ({options['stall_ms']:g}ms)", stalled_handler, stalled_calls),
+                (f"queued stalled disk ({options['stall_ms']:g}ms)", queued(stalled_handler), calls),
+            ]
+            for name, build, count in cases:
+                self.run_case(name, build, count)
+
+    def run_case(self, name, build, calls):
+        handler = build()
+        for target in getattr(handler, 'handlers', [handler]):
+            target.setFormatter(JsonFormatter())
+        logger = logging.getLogger('benchmarks.logging')
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+
+        timings = []
+        started = time.perf_counter()
+        for index in range(calls):
+            before = time.perf_counter_ns()
+            logger.info('Booking %s confirmed for vendor %s', index, 42, extra={'service_id': 7})
+            timings.append(time.perf_counter_ns() - before)
+        elapsed = time.perf_counter() - started
+
+        logger.handlers = []
+        handler.close()
+        dropped = getattr(handler, 'dropped', 0)
+
+        timings.sort()
+        self.stdout.write(
+            f'{name:38} {calls:>7} calls  '
+            f'mean {statistics.mean(timings) / 1000:>8.2f}us  '
+            f'p50 {timings[len(timings) // 2] / 1000:>7.2f}us  '
+            f'p99 {timings[int(len(timings) * 0.99) - 1] / 1000:>8.2f}us  '
+            f'max {timings[-1] / 1000:>9.1f}us  '
+            f'total {elapsed * 1000:>8.1f}ms  dropped {dropped}'
+        )
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from utils.fast_serializers import fast_serializer
+from vendors.models import Vendor, VendorService, AvailabilitySlot
+from vendors.serializers import (
+    VendorProfileSerializer, VendorServiceSerializer, AvailabilitySlotSerializer
+)
+
+CASES = [
+    ('VendorProfileSerializer', VendorProfileSerializer, lambda: Vendor.objects.filter(status='approved')),
+    ('VendorServiceSerializer', VendorServiceSerializer, lambda: VendorService.objects.prefetch_related('pricing_tiers')),
+    ('AvailabilitySlotSerializer', AvailabilitySlotSerializer, lambda: AvailabilitySlot.objects.all()),
+    ('BookingSerializer', BookingSerializer, lambda: Booking.objects.all()),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ModelSerializer(many=True) with the fast values()-based serializer '
+        'on list-sized querysets and check that the rendered JSON is identical.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows per list (default: 2000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per serializer; the best is kept')
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        context = {'request': Request(RequestFactory().get('/'))}
+        mismatches = []
+
+        for name, serializer_class, queryset in CASES:
+            fast = fast_serializer(serializer_class)
+            if fast is None:
+                self.stdout.write(self.style.WARNING(f'{name:28} not compilable, skipped'))
+                continue
+
+            def drf():
+                rows = queryset().order_by('pk')[:options['rows']]
+                return renderer.render(serializer_class(rows, many=True, context=context).data)
+
+            def compiled():
+                rows = queryset().order_by('pk')[:options['rows']]
+                return renderer.render(fast.serialize(rows, context))
+
+            drf_time, drf_output = self.best_of(drf, options['repeat'])
+            fast_time, fast_output = self.best_of(compiled, options['repeat'])
+            if drf_output != fast_output:
+                mismatches.append(name)
+
+            rows = min(options['rows'], queryset().count())
+            self.stdout.write(
+                f'{name:28} {rows:>6} rows  '
+                f'ModelSerializer {drf_time * 1000:>9.1f}ms  fast {fast_time * 1000:>9.1f}ms  '
+                f'x{drf_time / fast_time:>5.1f}  identical={drf_output == fast_output}'
+            )
+
+        if mismatches:
+            raise CommandError(f"Output differs for: {', '.join(mismatches)}")
+
+    def best_of(self, func, repeat):
+        best, output = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
@@ -0,0 +1,136 @@
+import multiprocessing
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from utils import singleflight
+from utils.fast_serializers import serialize_many
+from vendors.models import VendorService
+from vendors.serializers import VendorServiceSerializer
+
+KEY = 'bench:stampede'
+TIMEOUT = 300
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent requests from several processes at an expired cache entry and '
+        'count how often its queries run: plain cache-aside against single-flight.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help='Worker processes (default: 4)')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent requests per process (default: 8)')
+        parser.add_argument(
+            '--delay-ms', type=float, default=50,
+            help='Extra time per computation, standing in for a slow query (default: 50)',
+        )
+
+    def handle(self, *args, **options):
+        self.vendor_id = (
+            VendorService.objects.filter(is_active=True).values_list('vendor_id', flat=True).first()
+        )
+        if self.vendor_id is None:
+            raise CommandError('No services found; run seed_benchmark_data first')
+
+        with CaptureQueriesContext(connections['default']) as queries:
+            self.compute_once()
+        self.queries_per_compute = len(queries)
+
+        backend = settings.CACHES['default']['BACKEND']
+        if options['processes'] > 1 and backend.endswith('LocMemCache'):
+            # Processes need a shared cache; note that its add() is not atomic like Redis SET NX
+            with tempfile.TemporaryDirectory() as directory:
+                shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}}
+                with override_settings(CACHES=shared):
+                    self.stdout.write(f'Using a file-based cache in {directory} shared by the worker processes')
+                    self.run_modes(options)
+        else:
+            self.run_modes(options)
+
+    def compute_once(self, delay=0):
+        services = VendorService.objects.filter(vendor_id=self.vendor_id, is_active=True)
+        data = serialize_many(VendorServiceSerializer, services)
+        time.sleep(delay)
+        return data
+
+    def run_modes(self, options):
+        delay = options['delay_ms'] / 1000
+        requests = options['processes'] * options['threads']
+        self.stdout.write(
+            f"{requests} concurrent requests ({options['processes']} processes x {options['threads']} threads) "
+            f"for one expired entry; {self.queries_per_compute} queries + {options['delay_ms']:g}ms per computation"
+        )
+
+        def cache_aside(compute):
+            value = cache.get(KEY)
+            if value is None:
+                value = compute()
+                cache.set(KEY, value, TIMEOUT)
+            return value
+
+        def single_flight(compute):
+            return singleflight.get_or_compute(KEY, compute, TIMEOUT, stale=60)
+
+        def expired(value):
+            cache.set(KEY, (time.time() - 1, value), TIMEOUT)
+
+        modes = [
+            ('cache-aside', cache_aside, None),
+            ('single-flight, cold', single_flight, None),
+            ('single-flight, stale', single_flight, expired),
+        ]
+        for name, lookup, prepare in modes:
+            cache.delete_many([KEY, f'{KEY}:lock'])
+            if prepare:
+                prepare(self.compute_once())
+            computes, latencies = self.stampede(lookup, options['processes'], options['threads'], delay)
+            latencies.sort()
+            self.stdout.write(
+                f'{name:22} computations {computes:>4}  queries {computes * self.queries_per_compute:>5}  '
+                f'p50 {statistics.median(latencies):>8.1f}ms  '
+                f'p95 {latencies[int(len(latencies) * 0.95) - 1]:>8.1f}ms  '
+                f'max {latencies[-1]:>8.1f}ms'
+            )
+
+    def stampede(self, lookup, processes, threads, delay):
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(processes * threads)
+        computes = context.Value('i', 0)
+        results = context.Queue()
+
+        def compute():
+            with computes.get_lock():
+                computes.value += 1
+            return self.compute_once(delay)
+
+        def request():
+            barrier.wait()
+            started = time.perf_counter()
+            lookup(compute)
+            results.put((time.perf_counter() - started) * 1000)
+            connections.close_all()
+
+        def worker():
+            pool = [threading.Thread(target=request) for _ in range(threads)]
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+
+        # Forked children must not share the parent's database connection
+        connections.close_all()
+        workers = [context.Process(target=worker) for _ in range(processes)]
+        for process in workers:
+            process.start()
+        latencies = [results.get() for _ in range(processes * threads)]
+        for process in workers:
+            process.join()
+        return computes.value, latencies
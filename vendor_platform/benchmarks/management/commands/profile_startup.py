@@ -0,0 +1,59 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.startup import by_package, profile_startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Boot Django in fresh interpreters the way a WSGI worker does and report '
+        'time per startup phase, per app ready() and import time by module.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Boots to run; phases are medians (default: 5)')
+        parser.add_argument('--top', type=int, default=25, help='Modules and packages to list (default: 25)')
+        parser.add_argument('--json', dest='json_path', help='Also write the full report to this file')
+        parser.add_argument(
+            '--max-boot-ms', type=float,
+            help='Fail when the median boot time exceeds this budget',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = profile_startup(options['repeat'], os.environ.get('DJANGO_SETTINGS_MODULE'))
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"Startup phases (median of {report['runs']} boots):")
+        for name, elapsed in report['phases'].items():
+            error = report['errors'].get(name)
+            suffix = self.style.ERROR(f'  failed: {error}') if error else ''
+            self.stdout.write(f'  {name:14} {elapsed:>9.1f}ms{suffix}')
+
+        self.stdout.write('\nApp ready():')
+        for label, elapsed in sorted(report['ready'].items(), key=lambda item: item[1], reverse=True):
+            self.stdout.write(f'  {label:14} {elapsed:>9.1f}ms')
+
+        modules = report['modules']
+        self.stdout.write(f"\nImports: {len(modules)} modules, {report['import_ms']:.1f}ms")
+        self.stdout.write('Slowest packages (self time):')
+        for package, self_us in by_package(modules)[:options['top']]:
+            self.stdout.write(f'  {package:32} {self_us / 1000:>9.1f}ms')
+
+        self.stdout.write('Slowest modules (cumulative):')
+        slowest = sorted(modules, key=lambda module: module[2], reverse=True)[:options['top']]
+        for module, self_us, cumulative_us, _depth in slowest:
+            self.stdout.write(f'  {module:48} {cumulative_us / 1000:>9.1f}ms  self {self_us / 1000:>7.1f}ms')
+
+        self.stdout.write(f"\nHeavy dependencies loaded at boot: {', '.join(report['loaded']) or 'none'}")
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+
+        budget = options['max_boot_ms']
+        if budget is not None and report['phases']['total'] > budget:
+            raise CommandError(f"Boot took {report['phases']['total']:.1f}ms, over the {budget:.0f}ms budget")
@@ -0,0 +1,81 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.query_fingerprints import capture_fingerprints
+from benchmarks.harness import BenchmarkRunner, compare_results, load_results, write_results
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure latency, query count and peak memory for every route in config/urls.py '
+        'and optionally compare the results against a stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per route')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per route')
+        parser.add_argument('--routes', help='Comma-separated route names to benchmark (default: all)')
+        parser.add_argument('--output', help='Where to write the JSON results')
+        parser.add_argument('--baseline', help='JSON results to compare against')
+        parser.add_argument('--threshold', action='append', default=[], metavar='METRIC=RATIO',
+                            help='Override a regression threshold, e.g. p95_ms=0.5 (repeatable)')
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Clear the cache before every request')
+        parser.add_argument('--with-throttling', action='store_true',
+                            help='Keep DRF throttling enabled (disabled by default)')
+        parser.add_argument('--fingerprints', metavar='PATH',
+                            help='Also write normalized query fingerprints for advise_indexes')
+
+    def handle(self, *args, **options):
+        thresholds = dict(settings.BENCHMARK_REGRESSION_THRESHOLDS)
+        for item in options['threshold']:
+            metric, _, value = item.partition('=')
+            try:
+                thresholds[metric] = float(value)
+            except ValueError:
+                raise CommandError(f'Invalid threshold: {item}')
+
+        runner = BenchmarkRunner(
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            routes=options['routes'].split(',') if options['routes'] else None,
+            cold_cache=options['cold_cache'],
+            with_throttling=options['with_throttling'],
+            log=self.stdout.write,
+        )
+        try:
+            with capture_fingerprints() as collector:
+                results = runner.run()
+        except (KeyError, LookupError) as exc:
+            raise CommandError(exc.args[0])
+            
+        if options['fingerprints']:
+            collector.dump(options['fingerprints'])
+            self.stdout.write(f"Query fingerprints written to {options['fingerprints']}")
+
+        output = options['output'] or os.path.join(settings.BENCHMARK_RESULTS_DIR, 'latest.json')
+        write_results(results, output)
+
+        for route, metrics in results['routes'].items():
+            self.stdout.write(
+                f"{route:32} {metrics['status']}  p50 {metrics['p50_ms']:>9.2f}ms  "
+                f"p95 {metrics['p95_ms']:>9.2f}ms  {metrics['queries']:>4} queries  "
+                f"{metrics['peak_memory_kb']:>9.1f}KB"
+            )
+        for route, reason in results['skipped'].items():
+            self.stdout.write(self.style.WARNING(f'{route:32} skipped: {reason}'))
+        self.stdout.write(f'Results written to {output}')
+
+        if not options['baseline']:
+            return
+
+        regressions = compare_results(results, load_results(options['baseline']), thresholds)
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(json.dumps(regression)))
+            raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
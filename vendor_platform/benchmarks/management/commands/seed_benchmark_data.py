@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.datagen import BenchmarkDataGenerator, scaled_volumes
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-seed synthetic vendors, services, availability slots and bookings '
+        'for benchmarking. Scale 1.0 is 100k vendors, 1M services, 1M slots and 10M bookings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.01,
+                            help='Multiplier applied to the default volumes (default: 0.01)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows per bulk insert and approximate rows per transaction')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale must be positive')
+
+        volumes = scaled_volumes(options['scale'])
+        self.stdout.write(
+            'Seeding ' + ', '.join(f'{count} {name}' for name, count in volumes.items())
+        )
+
+        started = time.perf_counter()
+        generator = BenchmarkDataGenerator(
+            volumes,
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+        totals = generator.run()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {totals['vendors']} vendors, {totals['services']} services, "
+            f"{totals['slots']} slots and {totals['bookings']} bookings "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,126 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Run in a fresh interpreter under `-X importtime`: boots Django the way a
+# WSGI worker does and prints the timing of each phase as JSON on stdout.
+BOOT_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+phases, ready, errors = {}, {}, {}
+
+from django.apps import AppConfig
+create = AppConfig.create.__func__
+
+def timed_create(cls, entry):
+    app_config = create(cls, entry)
+    original = app_config.ready
+    def timed_ready():
+        began = time.perf_counter()
+        original()
+        ready[app_config.label] = (time.perf_counter() - began) * 1000
+    app_config.ready = timed_ready
+    return app_config
+
+AppConfig.create = classmethod(timed_create)
+
+def phase(name, func):
+    began = time.perf_counter()
+    try:
+        func()
+    except Exception as exc:
+        errors[name] = repr(exc)
+    phases[name] = (time.perf_counter() - began) * 1000
+
+from django.conf import settings
+phase('settings', lambda: settings.INSTALLED_APPS)
+import django
+phase('app_registry', django.setup)
+from django.core.handlers.wsgi import WSGIHandler
+phase('middleware', WSGIHandler)
+from django.urls import get_resolver
+phase('urlconf', lambda: get_resolver().url_patterns)
+phases['total'] = (time.perf_counter() - started) * 1000
+
+heavy = ('PIL', 'boto3', 'botocore', 'pymysql', 'MySQLdb', 'jwt', 'django_filters')
+print(json.dumps({
+    'phases': phases,
+    'ready': ready,
+    'errors': errors,
+    'loaded': [name for name in heavy if name in sys.modules],
+}))
+'''
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(output):
+    """
+    Parse `-X importtime` output into [(module, self_us, cumulative_us, depth), ...].
+
+    Modules are listed in the order their import finished.
+    """
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return modules
+
+
+def by_package(modules):
+    """Self import time summed per top-level package, in microseconds, largest first."""
+    totals = {}
+    for module, self_us, _cumulative, _depth in modules:
+        package = module.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def boot_once(settings_module=None):
+    """Boot Django in a child interpreter; return (phase timings, parsed import times)."""
+    env = dict(os.environ)
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        capture_output=True, text=True, env=env, cwd=os.getcwd(),
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f'Startup profiling failed:\n{process.stderr[-2000:]}')
+    report = json.loads(process.stdout.strip().splitlines()[-1])
+    return report, parse_importtime(process.stderr)
+
+
+def profile_startup(repeat=5, settings_module=None):
+    """
+    Boot Django `repeat` times and summarize.
+
+    Phase and app ready() timings are medians across runs; import times
+    come from the fastest run, which has the least noise from the OS.
+    """
+    runs = [boot_once(settings_module) for _ in range(repeat)]
+    reports = [report for report, _modules in runs]
+    fastest = min(range(len(runs)), key=lambda index: reports[index]['phases']['total'])
+    modules = runs[fastest][1]
+
+    def median(key):
+        names = dict.fromkeys(name for report in reports for name in report[key])
+        return {
+            name: round(statistics.median(report[key].get(name, 0.0) for report in reports), 2)
+            for name in names
+        }
+
+    return {
+        'runs': repeat,
+        'phases': median('phases'),
+        'ready': median('ready'),
+        'errors': reports[fastest]['errors'],
+        'loaded': reports[fastest]['loaded'],
+        'import_ms': round(sum(self_us for _module, self_us, _cumulative, _depth in modules) / 1000, 2),
+        'modules': modules,
+    }
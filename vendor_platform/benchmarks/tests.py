@@ -0,0 +1,128 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from . import contention
+from .contention import ContentionRunner, classify_error, slot_weights
+from .datagen import DEFAULT_VOLUMES, _spread, scaled_volumes
+from .harness import compare_results
+from .index_advisor import advise, filtered_columns
+from .startup import by_package, parse_importtime
+from utils.query_fingerprints import capture_fingerprints, fingerprint
+from vendors.models import Vendor
+
+
+class DataGeneratorTestCase(SimpleTestCase):
+    def test_scaled_volumes(self):
+        volumes = scaled_volumes(0.001)
+        self.assertEqual(volumes['vendors'], DEFAULT_VOLUMES['vendors'] // 1000)
+        self.assertEqual(volumes['bookings'], DEFAULT_VOLUMES['bookings'] // 1000)
+        self.assertEqual(scaled_volumes(0)['vendors'], 1)
+        
+    def test_spread_matches_ratio(self):
+        # 7 children over 3 parents
+        counts = [_spread(index, 7 / 3) for index in range(3)]
+        self.assertEqual(sum(counts), 7)
+        self.assertTrue(all(count in (2, 3) for count in counts))
+        
+class CompareResultsTestCase(SimpleTestCase):
+    def setUp(self):
+        self.baseline = {'routes': {
+            'vendor-search': {'p95_ms': 20.0, 'queries': 3, 'peak_memory_kb': 100.0},
+        }}
+        
+    def test_regression_detected(self):
+        current = {'routes': {
+            'vendor-search': {'p95_ms': 30.0, 'queries': 4, 'peak_memory_kb': 100.0},
+        }}
+        regressions = compare_results(current, self.baseline, {'p95_ms': 0.25, 'queries': 0.0})
+        
+        self.assertEqual({item['metric'] for item in regressions}, {'p95_ms', 'queries'})
+        
+    def test_noise_is_ignored(self):
+        current = {'routes': {
+            'vendor-search': {'p95_ms': 20.9, 'queries': 3, 'peak_memory_kb': 150.0},
+            'vendor-login': {'p95_ms': 500.0},
+        }}
+        regressions = compare_results(
+            current, self.baseline, {'p95_ms': 0.01, 'queries': 0.0, 'peak_memory_kb': 0.25}
+        )
+        
+        self.assertEqual(regressions, [])
+        
+class QueryFingerprintTestCase(SimpleTestCase):
+    def test_literals_and_lists_are_normalized(self):
+        first = fingerprint('SELECT * FROM "vendors" WHERE "vendors"."id" IN (1, 2, 3) AND "city" = \'Austin\' LIMIT 21')
+        second = fingerprint('SELECT  *  FROM "vendors" WHERE "vendors"."id" IN (%s, %s) AND "city" = %s LIMIT 5')
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first, 'SELECT * FROM "vendors" WHERE "vendors"."id" IN (...) AND "city" = ? LIMIT ?')
+        
+    def test_filtered_columns(self):
+        sql = (
+            'SELECT "vendors"."id" FROM "vendors" INNER JOIN "vendor_services" ON '
+            '("vendors"."id" = "vendor_services"."vendor_id") WHERE (UPPER("vendors"."city") = UPPER(%s) '
+            'AND "vendor_services"."base_price" >= %s)'
+        )
+        
+        self.assertEqual(filtered_columns(sql), {
+            'vendors': [('city', '=', True)],
+            'vendor_services': [('base_price', '>=', False)],
+        })
+        
+class StartupProfileTestCase(SimpleTestCase):
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       300 |        300 |     PIL._version\n'
+            'import time:       500 |        800 |   PIL\n'
+            'import time:       200 |       1000 | utils.file_validation\n'
+            'unrelated stderr line\n'
+        )
+        modules = parse_importtime(output)
+        
+        self.assertEqual(modules, [
+            ('PIL._version', 300, 300, 2),
+            ('PIL', 500, 800, 1),
+            ('utils.file_validation', 200, 1000, 0),
+        ])
+        self.assertEqual(by_package(modules), [('PIL', 800), ('utils', 200)])
+        
+class IndexAdvisorTestCase(TestCase):
+    def test_full_scan_gets_index_suggestion(self):
+        with capture_fingerprints() as collector:
+            list(Vendor.objects.filter(company_name='Acme').values_list('id', flat=True))
+            
+        report = advise(collector)
+        
+        issues = [finding['issue'] for query in report['queries'] for finding in query['findings']]
+        self.assertIn('full_scan', issues)
+        self.assertIn({'model': 'vendors.Vendor', 'fields': ['company_name']}, report['suggested_indexes'])
+        self.assertIn("fields=['company_name']", report['migration'])
+        
+class ContentionTestCase(TransactionTestCase):
+    def test_slot_weights_and_error_classes(self):
+        self.assertEqual(slot_weights(3, 0), [1, 1, 1])
+        self.assertEqual(slot_weights(2, 1), [1, 0.5])
+        self.assertEqual(classify_error(Exception('(1213, Deadlock found when trying to get lock)')), 'deadlock')
+        self.assertEqual(classify_error(Exception('(1205, Lock wait timeout exceeded)')), 'lock_timeout')
+        
+    def test_capacity_is_never_oversold(self):
+        report = ContentionRunner(workers=2, requests=12, slots=2, capacity=3, seed=1).run()
+        
+        self.assertEqual(report['violations'], [])
+        self.assertEqual(report['requests'], 12)
+        self.assertLessEqual(report['outcomes'].get('booked', 0), 6)
+        
+    def test_dead_worker_process_does_not_hang_the_run(self):
+        def fire(path, token, service_id, slot_ids, barrier, put):
+            if slot_ids == [1]:
+                os._exit(1)
+            for _ in slot_ids:
+                put(('booked', 1.0, 0.0))
+                
+        with mock.patch.object(contention, '_fire', fire), mock.patch.object(contention, 'POLL_INTERVAL', 0.1):
+            samples = ContentionRunner(mode='processes')._run_processes([[1], [2, 3]], ('/', '', 0))
+            
+        self.assertEqual(samples, [('booked', 1.0, 0.0)] * 2)
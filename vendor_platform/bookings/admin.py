@@ -1,3 +1,49 @@
+from django.conf import settings
 from django.contrib import admin
 
-# Register your models here.
+from utils.admin import LargeTableAdmin
+from .models import Booking, BookingHistory
+from .transitions import bulk_transition, UPDATED
+
+
+class BookingHistoryInline(admin.TabularInline):
+    model = BookingHistory
+    extra = 0
+    raw_id_fields = ('created_by',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(Booking)
+class BookingAdmin(LargeTableAdmin):
+    list_display = (
+        'booking_id', 'vendor', 'service', 'customer_name', 'booking_date', 'start_time',
+        'quantity', 'total_amount', 'status',
+    )
+    # VendorService.__str__ reads its vendor as well
+    list_select_related = ('vendor', 'service__vendor')
+    list_filter = ('status',)
+    # booking_id is unique and customer_email indexed; exact matches only
+    search_fields = ('=booking_id', '=customer_email')
+    raw_id_fields = ('vendor', 'service')
+    readonly_fields = ('booking_id',)
+    inlines = [BookingHistoryInline]
+    actions = ['cancel_bookings']
+
+    @admin.action(description='Cancel selected bookings')
+    def cancel_bookings(self, request, queryset):
+        """Cancel through bulk_transition: one UPDATE and one history INSERT per chunk."""
+        booking_ids = list(queryset.values_list('pk', flat=True))
+        limit = settings.BOOKING_BULK_TRANSITION_LIMIT
+        updated = 0
+        for start in range(0, len(booking_ids), limit):
+            results = bulk_transition(
+                None, booking_ids[start:start + limit], 'cancelled',
+                notes='Cancelled from the admin', user=request.user,
+            )
+            updated += sum(1 for result in results if result['outcome'] == UPDATED)
+
+        skipped = len(booking_ids) - updated
+        message = f'{updated} booking(s) cancelled.'
+        if skipped:
+            message += f' {skipped} could not be cancelled from their current status.'
+        self.message_user(request, message)
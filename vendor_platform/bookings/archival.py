@@ -0,0 +1,122 @@
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Booking, BookingHistory, ArchivedBooking, ArchivedBookingHistory
+
+ARCHIVABLE_STATUSES = ('completed', 'cancelled', 'refunded')
+
+BOOKING_COLUMNS = [field.attname for field in Booking._meta.concrete_fields]
+HISTORY_COLUMNS = [field.attname for field in BookingHistory._meta.concrete_fields]
+
+
+def archive_cutoff(today=None):
+    """Bookings dated before this day are eligible for archiving."""
+    return (today or date.today()) - timedelta(days=settings.BOOKING_ARCHIVE_AFTER_DAYS)
+
+
+def includes_archive(date_from, date_to=None):
+    """
+    Whether a listing from `date_from` to `date_to` (ISO strings or dates) can reach archived rows.
+
+    A range with no lower bound but an upper one is open towards the past,
+    so it reaches the archive; a listing with neither bound stays on the hot table.
+    """
+    if not date_from:
+        return bool(date_to)
+    if isinstance(date_from, str):
+        try:
+            date_from = date.fromisoformat(date_from)
+        except ValueError:
+            return False
+    return date_from < archive_cutoff()
+
+
+def archive_bookings(before, batch_size=1000, pause=0, log=None):
+    """
+    Move finished bookings dated before `before`, with their history, to the archive tables.
+
+    Work is done in short transactions of `batch_size` bookings, walking the
+    primary key so each batch only locks the rows it moves. `pause` seconds
+    are slept between batches to leave room for live traffic.
+    """
+    moved = 0
+    last_id = 0
+
+    while True:
+        ids = list(
+            Booking.objects.filter(
+                id__gt=last_id, booking_date__lt=before, status__in=ARCHIVABLE_STATUSES
+            )
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return moved
+
+        last_id = ids[-1]
+        moved += _archive_batch(ids, before)
+        if log:
+            log(f'Archived {moved} bookings (up to id {last_id})')
+        if pause:
+            time.sleep(pause)
+
+
+def _archive_batch(ids, before):
+    with transaction.atomic():
+        # Re-check under lock: a booking may have been reopened since it was selected
+        rows = list(
+            Booking.objects.select_for_update()
+            .filter(id__in=ids, booking_date__lt=before, status__in=ARCHIVABLE_STATUSES)
+            .values(*BOOKING_COLUMNS)
+        )
+        if not rows:
+            return 0
+
+        ids = [row['id'] for row in rows]
+        ArchivedBooking.objects.bulk_create([ArchivedBooking(**row) for row in rows])
+        ArchivedBookingHistory.objects.bulk_create([
+            ArchivedBookingHistory(**row)
+            for row in BookingHistory.objects.filter(booking_id__in=ids).values(*HISTORY_COLUMNS)
+        ])
+
+        BookingHistory.objects.filter(booking_id__in=ids).delete()
+        Booking.objects.filter(id__in=ids).delete()
+        return len(ids)
+
+
+def get_vendor_booking(vendor, pk):
+    """Look a booking up in hot storage first, then in the archive."""
+    try:
+        return Booking.objects.get(pk=pk, vendor=vendor)
+    except Booking.DoesNotExist:
+        pass
+    try:
+        return ArchivedBooking.objects.get(pk=pk, vendor=vendor)
+    except ArchivedBooking.DoesNotExist:
+        return None
+
+
+def vendor_bookings(vendor, status=None, date_from=None, date_to=None):
+    """
+    Return the querysets (archive first, then hot) holding the vendor's bookings in the range.
+
+    The archive is only queried when the range reaches back past the
+    archive cutoff (see includes_archive), so recent listings never touch it.
+    """
+    querysets = []
+    models = [ArchivedBooking, Booking] if includes_archive(date_from, date_to) else [Booking]
+
+    for model in models:
+        bookings = model.objects.filter(vendor=vendor)
+        if status:
+            bookings = bookings.filter(status=status)
+        if date_from:
+            bookings = bookings.filter(booking_date__gte=date_from)
+        if date_to:
+            bookings = bookings.filter(booking_date__lte=date_to)
+        querysets.append(bookings)
+
+    return querysets
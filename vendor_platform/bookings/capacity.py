@@ -0,0 +1,158 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, When
+from django.utils import timezone
+
+from vendors.availability_calendar import invalidate_calendar
+from vendors.models import AvailabilitySlot
+from .archival import archive_cutoff
+from .models import Booking
+
+# Bookings in these statuses no longer take up a slot
+INACTIVE_STATUSES = ('cancelled', 'refunded')
+
+# Booking fields identifying its slot (bookings copy the slot instead of referencing it)
+SLOT_FIELDS = ('vendor_id', 'service_id', 'booking_date', 'start_time')
+
+WATERMARK_KEY = 'capacity:watermark'
+
+
+def releases_capacity(current, target):
+    return current not in INACTIVE_STATUSES and target in INACTIVE_STATUSES
+
+
+def _slot_key(booking):
+    if isinstance(booking, dict):
+        return tuple(booking[field] for field in SLOT_FIELDS)
+    return tuple(getattr(booking, field) for field in SLOT_FIELDS)
+
+
+def release_capacity(bookings):
+    """
+    Give the slot units of cancelled or refunded `bookings` back, one UPDATE per slot.
+
+    `bookings` are Booking instances or dicts with the SLOT_FIELDS. A counter
+    that already drifted below the release is set to 0 rather than going
+    negative; reconcile_capacity() puts it right.
+    """
+    per_slot = Counter(_slot_key(booking) for booking in bookings)
+    for (vendor_id, service_id, day, start_time), count in per_slot.items():
+        AvailabilitySlot.objects.filter(
+            vendor_id=vendor_id, service_id=service_id, date=day, start_time=start_time
+        ).update(booked_capacity=Case(
+            When(booked_capacity__gte=count, then=F('booked_capacity') - count),
+            default=0,
+        ))
+    for vendor_id, day in {(key[0], key[2]) for key in per_slot}:
+        invalidate_calendar(vendor_id, day)
+
+
+def _reconcile_batch(slot_ids):
+    """Recount the slots in `slot_ids` with one grouped query; returns the corrected slots."""
+    with transaction.atomic():
+        # Locked like BookingCreateView does, so no booking lands between the count and the write
+        slots = list(
+            AvailabilitySlot.objects.select_for_update()
+            .filter(id__in=slot_ids)
+            .only('id', 'vendor_id', 'service_id', 'date', 'start_time', 'booked_capacity')
+        )
+        counts = {
+            _slot_key(row): row['booked']
+            for row in Booking.objects.filter(
+                vendor_id__in={slot.vendor_id for slot in slots},
+                booking_date__in={slot.date for slot in slots},
+            ).exclude(status__in=INACTIVE_STATUSES).values(*SLOT_FIELDS).annotate(booked=Count('id'))
+        }
+
+        stale = []
+        for slot in slots:
+            booked = counts.get((slot.vendor_id, slot.service_id, slot.date, slot.start_time), 0)
+            if slot.booked_capacity != booked:
+                slot.booked_capacity = booked
+                stale.append(slot)
+        if stale:
+            AvailabilitySlot.objects.bulk_update(stale, ['booked_capacity'])
+
+    for vendor_id, day in {(slot.vendor_id, slot.date) for slot in stale}:
+        invalidate_calendar(vendor_id, day)
+    return stale
+
+
+def _all_slots(since_date, batch_size):
+    last_pk = 0
+    while True:
+        slot_ids = list(
+            AvailabilitySlot.objects.filter(pk__gt=last_pk, date__gte=since_date)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not slot_ids:
+            return
+        last_pk = slot_ids[-1]
+        yield slot_ids
+
+
+def _changed_slots(since_date, watermark, batch_size):
+    """Slots of the bookings changed since `watermark`, walking the updated_at index."""
+    changed_at, last_pk = watermark, 0
+    seen = set()
+    while True:
+        rows = list(
+            Booking.objects.filter(
+                Q(updated_at__gt=changed_at) | Q(updated_at=changed_at, pk__gt=last_pk),
+                booking_date__gte=since_date,
+            ).order_by('updated_at', 'pk').values('updated_at', 'pk', *SLOT_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return
+        changed_at, last_pk = rows[-1]['updated_at'], rows[-1]['pk']
+
+        keys = {_slot_key(row) for row in rows}
+        slot_ids = [
+            pk for pk, *key in AvailabilitySlot.objects.filter(
+                vendor_id__in={key[0] for key in keys},
+                service_id__in={key[1] for key in keys},
+                date__in={key[2] for key in keys},
+            ).values_list('pk', 'vendor_id', 'service_id', 'date', 'start_time')
+            if tuple(key) in keys and pk not in seen
+        ]
+        seen.update(slot_ids)
+        if slot_ids:
+            yield slot_ids
+
+
+def reconcile_capacity(batch_size=1000, full=False, pause=0, log=None):
+    """
+    Set each slot's booked_capacity to its number of active bookings.
+
+    Only slots touched by bookings changed since the last run's watermark
+    are recounted; the first run, a lost watermark or `full` go through
+    every slot. Slots dated before the archive cutoff are skipped, as
+    their finished bookings may already sit in the archive tables. Only
+    counters that differ are written. Returns (slots checked, slots corrected).
+    """
+    started = timezone.now()
+    since_date = archive_cutoff()
+    watermark = None if full else cache.get(WATERMARK_KEY)
+    if watermark is None:
+        batches = _all_slots(since_date, batch_size)
+    else:
+        batches = _changed_slots(since_date, watermark, batch_size)
+
+    checked = corrected = 0
+    for slot_ids in batches:
+        stale = _reconcile_batch(slot_ids)
+        checked += len(slot_ids)
+        corrected += len(stale)
+        if log:
+            log(f'{checked} slots checked, {corrected} corrected')
+        if pause:
+            time.sleep(pause)
+
+    # Moved back so bookings committed late by long transactions are seen next time
+    cache.set(WATERMARK_KEY, started - timedelta(seconds=settings.CAPACITY_RECONCILE_OVERLAP), timeout=None)
+    return checked, corrected
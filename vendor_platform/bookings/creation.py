@@ -0,0 +1,44 @@
+from utils.pricing import calculate_total_price
+from .models import Booking, BookingHistory
+
+
+def create_booking(service, slot, data):
+    """
+    Create a pending booking of `service` in `slot` with its first history entry.
+
+    `data` holds the validated BookingCreateSerializer fields. Slot capacity
+    is left to the caller, which owns the locking strategy.
+    """
+    # Calculate pricing
+    pricing_data = calculate_total_price(service, data['quantity'], data.get('pricing_tier_id'))
+
+    booking = Booking.objects.create(
+        vendor=service.vendor,
+        service=service,
+        customer_name=data['customer_name'],
+        customer_email=data['customer_email'],
+        customer_phone=data.get('customer_phone', ''),
+        booking_date=slot.date,
+        start_time=slot.start_time,
+        end_time=slot.end_time,
+        quantity=data['quantity'],
+        base_price=pricing_data['base_price'],
+        tax_amount=pricing_data['tax_amount'],
+        platform_fee=pricing_data['platform_fee'],
+        total_amount=pricing_data['total_amount'],
+        special_requests=data.get('special_requests', '')
+    )
+    
+    BookingHistory.objects.create(
+        booking=booking,
+        status='pending',
+        notes='Booking created'
+    )
+    return booking
+
+
+def send_confirmation_email(booking):
+    # In a real implementation, you would use Django's email system
+    # or a service like SendGrid/Mailgun
+    print(f"Mock email sent to {booking.customer_email}")
+    print(f"Booking confirmed: {booking.booking_id}")
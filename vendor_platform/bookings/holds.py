@@ -0,0 +1,128 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from vendors.availability import materialize_slot
+from vendors.availability_calendar import invalidate_slots
+from vendors.models import AvailabilitySlot, VendorService
+from .creation import create_booking
+from .models import SlotHold
+
+
+class HoldExpired(Exception):
+    """The hold timed out before it was confirmed."""
+
+
+def place_hold(user, data, minutes=None, occurrence=None):
+    """
+    Reserve one unit of the slot's capacity for `minutes` and return the SlotHold.
+
+    The reservation is a single conditional UPDATE of the slot counter, so
+    no lock is held beyond this short transaction. `occurrence` is the
+    (rule, day) of a rule_id + date request, stored as a slot in the same
+    transaction. Returns None when the slot is unavailable or fully booked/held.
+    """
+    minutes = minutes or settings.SLOT_HOLD_MINUTES
+    # Raises VendorService.DoesNotExist like direct booking does
+    VendorService.objects.only('id').get(id=data['service_id'], is_active=True)
+
+    with transaction.atomic():
+        if occurrence:
+            data = {**data, 'slot_id': materialize_slot(*occurrence).id}
+        reserved = AvailabilitySlot.objects.alias(
+            used=F('booked_capacity') + F('held_capacity')
+        ).filter(
+            id=data['slot_id'], is_available=True, used__lt=F('max_capacity')
+        ).update(held_capacity=F('held_capacity') + 1)
+        if not reserved:
+            return None
+
+        invalidate_slots([data['slot_id']])
+        return SlotHold.objects.create(
+            slot_id=data['slot_id'],
+            user=user,
+            details=data,
+            expires_at=timezone.now() + timedelta(minutes=minutes),
+        )
+
+
+def confirm_hold(user, hold_id):
+    """
+    Turn a live hold into a booking, moving its unit from held to booked capacity.
+
+    Returns (booking, created). Confirming an already confirmed hold returns
+    its booking with created=False. Raises SlotHold.DoesNotExist or HoldExpired.
+    """
+    with transaction.atomic():
+        hold = SlotHold.objects.select_for_update().select_related('booking').get(hold_id=hold_id, user=user)
+        if hold.booking is not None:
+            return hold.booking, False
+        if hold.expires_at <= timezone.now():
+            raise HoldExpired(hold_id)
+
+        service = VendorService.objects.select_related('vendor').get(id=hold.details['service_id'])
+        slot = AvailabilitySlot.objects.get(id=hold.slot_id)
+        booking = create_booking(service, slot, hold.details)
+
+        AvailabilitySlot.objects.filter(id=hold.slot_id).update(
+            held_capacity=F('held_capacity') - 1,
+            booked_capacity=F('booked_capacity') + 1,
+        )
+        invalidate_slots([hold.slot_id])
+        hold.booking = booking
+        hold.save(update_fields=['booking'])
+        return booking, True
+
+
+def release_hold(user, hold_id):
+    """Give an unconfirmed hold's capacity back before it expires. Returns False if there was nothing to release."""
+    with transaction.atomic():
+        hold = SlotHold.objects.select_for_update().filter(
+            hold_id=hold_id, user=user, booking__isnull=True
+        ).first()
+        if hold is None:
+            return False
+        AvailabilitySlot.objects.filter(id=hold.slot_id).update(held_capacity=F('held_capacity') - 1)
+        invalidate_slots([hold.slot_id])
+        hold.delete()
+        return True
+
+
+def release_expired_holds(batch_size=500, pause=0, now=None, log=None):
+    """
+    Delete expired holds in batches, returning unconfirmed capacity to the slots.
+
+    Batches are read through the expires_at index, so the cost follows the
+    number of expired holds, not the size of the table. Confirmed holds are
+    only deleted. Returns the number of capacity units released.
+    """
+    now = now or timezone.now()
+    released = 0
+
+    while True:
+        with transaction.atomic():
+            holds = list(
+                SlotHold.objects.select_for_update()
+                .filter(expires_at__lte=now)
+                .order_by('expires_at')
+                .values_list('id', 'slot_id', 'booking_id')[:batch_size]
+            )
+            if not holds:
+                return released
+
+            per_slot = Counter(slot_id for pk, slot_id, booking_id in holds if booking_id is None)
+            for slot_id, count in per_slot.items():
+                AvailabilitySlot.objects.filter(id=slot_id).update(held_capacity=F('held_capacity') - count)
+            invalidate_slots(list(per_slot))
+            SlotHold.objects.filter(id__in=[pk for pk, slot_id, booking_id in holds]).delete()
+            released += sum(per_slot.values())
+
+        if log:
+            log(f'Released {released} held slot units')
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+class KeyInUse(Exception):
+    """Another request with the same key committed first."""
+
+
+def request_hash(request):
+    """Fingerprint of who sent the request and what it asked for."""
+    data = request.data.dict() if hasattr(request.data, 'dict') else request.data
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.user.pk}:{request.path}:{payload}'.encode()).hexdigest()
+
+
+def lookup(key):
+    return IdempotencyKey.objects.filter(
+        key=key, expires_at__gt=timezone.now(), response_status__isnull=False
+    ).first()
+
+
+def replay(record, fingerprint):
+    """Response for a repeated request: the stored one, or 422 if the key was used for another request."""
+    if record.request_hash != fingerprint:
+        return Response(
+            {'error': f'{HEADER} was already used for a different request'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    return Response(record.response_body, status=record.response_status, headers={'Idempotent-Replayed': 'true'})
+
+
+def reserve(key, fingerprint):
+    """
+    Insert the key inside the caller's transaction.
+
+    The unique index makes a concurrent request with the same key wait
+    here until the first one commits (then KeyInUse is raised and the
+    stored response can be replayed) or rolls back (then it proceeds).
+    """
+    now = timezone.now()
+    # An expired key may be reused; drop it rather than waiting for the purge job
+    IdempotencyKey.objects.filter(key=key, expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                key=key,
+                request_hash=fingerprint,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+    except IntegrityError:
+        raise KeyInUse(key)
+
+
+def complete(record, response):
+    """Store the final response; call before the surrounding transaction commits."""
+    if record is None:
+        return response
+    record.response_status = response.status_code
+    record.response_body = response.data
+    record.save(update_fields=['response_status', 'response_body'])
+    return response
+
+
+def purge_expired(batch_size=1000, pause=0, log=None):
+    """Delete expired keys in batches found through the expires_at index."""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+        if log:
+            log(f'Deleted {deleted} expired idempotency keys')
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.archival import ARCHIVABLE_STATUSES, archive_bookings
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = 'Move finished bookings and their history older than the archive horizon into the archive tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.BOOKING_ARCHIVE_AFTER_DAYS,
+                            help='Archive bookings dated more than this many days ago (at least the setting)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Bookings moved per transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many bookings qualify')
+
+    def handle(self, *args, **options):
+        # Listings and capacity reconciliation treat everything after archive_cutoff() as hot
+        if options['older_than_days'] < settings.BOOKING_ARCHIVE_AFTER_DAYS:
+            raise CommandError(
+                f'--older-than-days must be at least BOOKING_ARCHIVE_AFTER_DAYS '
+                f'({settings.BOOKING_ARCHIVE_AFTER_DAYS}); lower the setting to archive sooner'
+            )
+
+        before = date.today() - timedelta(days=options['older_than_days'])
+
+        if options['dry_run']:
+            count = Booking.objects.filter(booking_date__lt=before, status__in=ARCHIVABLE_STATUSES).count()
+            self.stdout.write(f'{count} bookings dated before {before} would be archived')
+            return
+
+        moved = archive_bookings(
+            before,
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} bookings dated before {before}'))
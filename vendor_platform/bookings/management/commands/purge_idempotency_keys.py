@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from bookings.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired Idempotency-Key records in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Keys deleted per statement')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(batch_size=options['batch_size'], pause=options['pause'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from bookings.holds import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Delete expired slot holds and return their unconfirmed capacity to the slots.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Holds processed per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        released = release_expired_holds(
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Released {released} held slot units'))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 import uuid
@@ -41,11 +42,18 @@ class Booking(models.Model):
     def generate_booking_id(self):
         return f"B{str(timezone.now().timestamp()).replace('.', '')[-10:]}"
     
+    def __str__(self):
+        return self.booking_id
+    
     class Meta:
         db_table = 'bookings'
         indexes = [
             models.Index(fields=['vendor', 'status']),
             models.Index(fields=['booking_date', 'status']),
+            # Exact-match customer lookups (admin search)
+            models.Index(fields=['customer_email']),
+            # Incremental capacity reconciliation walks recently changed bookings
+            models.Index(fields=['updated_at']),
         ]
         
 class BookingHistory(models.Model):
@@ -57,4 +65,71 @@ class BookingHistory(models.Model):
     
     class Meta:
         db_table = 'booking_history'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+class ArchivedBooking(models.Model):
+    """Finished booking moved out of `bookings` by the archival job (see bookings.archival)."""
+    id = models.BigIntegerField(primary_key=True)
+    booking_id = models.CharField(max_length=20, unique=True)
+    vendor = models.ForeignKey('vendors.Vendor', on_delete=models.PROTECT, related_name='archived_bookings')
+    service = models.ForeignKey('vendors.VendorService', on_delete=models.PROTECT, related_name='archived_bookings')
+    customer_name = models.CharField(max_length=255)
+    customer_email = models.EmailField()
+    customer_phone = models.CharField(max_length=20, blank=True)
+    booking_date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    quantity = models.PositiveIntegerField(default=1)
+    base_price = models.DecimalField(max_digits=10, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    platform_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Booking.BOOKING_STATUS)
+    special_requests = models.TextField(blank=True)
+    cancellation_reason = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'bookings_archive'
+        indexes = [
+            models.Index(fields=['vendor', 'booking_date']),
+        ]
+        
+class ArchivedBookingHistory(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    booking = models.ForeignKey(ArchivedBooking, on_delete=models.CASCADE, related_name='history')
+    status = models.CharField(max_length=20, choices=Booking.BOOKING_STATUS)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    created_by = models.ForeignKey('vendors.Vendor', on_delete=models.SET_NULL, null=True, related_name='+')
+    
+    class Meta:
+        db_table = 'booking_history_archive'
+        ordering = ['-created_at']
+        
+class IdempotencyKey(models.Model):
+    """Client-supplied Idempotency-Key and the response stored with the booking it created."""
+    key = models.CharField(max_length=255, unique=True)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        db_table = 'idempotency_keys'
+        
+class SlotHold(models.Model):
+    """Checkout hold on one unit of an AvailabilitySlot's capacity, confirmed into a Booking or released."""
+    hold_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    slot = models.ForeignKey('vendors.AvailabilitySlot', on_delete=models.CASCADE, related_name='holds')
+    user = models.ForeignKey('vendors.Vendor', on_delete=models.CASCADE, null=True, related_name='+')
+    details = models.JSONField(encoder=DjangoJSONEncoder)
+    booking = models.OneToOneField(Booking, on_delete=models.SET_NULL, null=True, related_name='hold')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        db_table = 'slot_holds'
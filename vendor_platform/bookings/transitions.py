@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .capacity import SLOT_FIELDS, release_capacity, releases_capacity
+from .models import Booking, BookingHistory
+
+# status -> statuses it may move to
+ALLOWED_TRANSITIONS = {
+    'pending': {'confirmed', 'cancelled'},
+    'confirmed': {'in_progress', 'cancelled'},
+    'in_progress': {'completed', 'cancelled'},
+    'completed': {'refunded'},
+    'cancelled': {'refunded'},
+    'refunded': set(),
+}
+
+# Per-id outcomes reported by bulk_transition
+UPDATED = 'updated'
+NOT_FOUND = 'not_found'
+INVALID_TRANSITION = 'invalid_transition'
+
+
+def can_transition(current, target):
+    return target in ALLOWED_TRANSITIONS.get(current, ())
+
+
+def allowed_sources(target):
+    """Statuses a booking may be in to move to `target`."""
+    return [status for status, targets in ALLOWED_TRANSITIONS.items() if target in targets]
+
+
+def bulk_transition(vendor, booking_ids, target, notes='', user=None):
+    """
+    Move the vendor's bookings in `booking_ids` to `target` in one UPDATE.
+    With `vendor` None (staff through the admin) any booking may be moved.
+
+    Only bookings whose current status allows the transition are changed;
+    the rest are reported with their current status. History rows for the
+    changed bookings are written with a single bulk_create, and cancelled
+    or refunded bookings give their slot capacity back.
+
+    Returns a list of {'id', 'outcome', 'status'} dicts in request order.
+    """
+    booking_ids = list(dict.fromkeys(booking_ids))
+    sources = allowed_sources(target)
+    bookings = Booking.objects.all() if vendor is None else Booking.objects.filter(vendor=vendor)
+
+    with transaction.atomic():
+        # Lock the rows so the outcomes reported match what the UPDATE changed
+        rows = list(
+            bookings.select_for_update()
+            .filter(id__in=booking_ids)
+            .values('id', 'status', *SLOT_FIELDS)
+        )
+        current = {row['id']: row['status'] for row in rows}
+        eligible = [pk for pk, status in current.items() if status in sources]
+
+        if eligible:
+            bookings.filter(
+                id__in=eligible, status__in=sources
+            ).update(status=target, updated_at=timezone.now())
+
+            BookingHistory.objects.bulk_create([
+                BookingHistory(booking_id=pk, status=target, notes=notes, created_by=user)
+                for pk in eligible
+            ])
+
+            release_capacity([
+                row for row in rows
+                if row['status'] in sources and releases_capacity(row['status'], target)
+            ])
+
+    results = []
+    for pk in booking_ids:
+        if pk not in current:
+            results.append({'id': pk, 'outcome': NOT_FOUND, 'status': None})
+        elif current[pk] in sources:
+            results.append({'id': pk, 'outcome': UPDATED, 'status': target})
+        else:
+            results.append({'id': pk, 'outcome': INVALID_TRANSITION, 'status': current[pk]})
+    return results
@@ -1,24 +1,57 @@
 from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django.db import transaction
 from django.conf import settings
 from datetime import datetime
 
 from .models import Booking, BookingHistory
+from .archival import vendor_bookings, get_vendor_booking
+from .transitions import can_transition, bulk_transition, UPDATED
+from .capacity import release_capacity, releases_capacity
+from . import idempotency
+from .creation import create_booking, send_confirmation_email
+from .holds import place_hold, confirm_hold, release_hold, HoldExpired
+from .models import SlotHold
 from vendors.models import AvailabilitySlot, VendorService
+from vendors.availability import materialize_slot, resolve_slot
 from .serializers import BookingSerializer, BookingCreateSerializer
-from utils.pricing import calculate_total_price
+from utils.fast_serializers import serialize_many
+from utils.sparse_fields import requested_fields, sparse
+from utils.singleflight import cache_view
 
 class BookingCreateView(APIView):
     def post(self, request):
-        serializer = BookingCreateSerializer(data=request.data)
+        # Rule occurrences (rule_id + date) get a stored slot on first booking
+        resolved = resolve_slot(request.data)
+        if resolved is None:
+            return Response(
+                {'error': 'Time slot not available'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        data, occurrence = resolved
+        serializer = BookingCreateSerializer(data=data)
         
         if serializer.is_valid():
+            # Retries sent with the same Idempotency-Key get the first response back
+            key = request.headers.get(idempotency.HEADER)
+            fingerprint = None
+            if key is not None:
+                if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+                    return Response(
+                        {'error': f'{idempotency.HEADER} must be 1-{idempotency.MAX_KEY_LENGTH} characters'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                fingerprint = idempotency.request_hash(request)
+                record = idempotency.lookup(key)
+                if record:
+                    return idempotency.replay(record, fingerprint)
+                    
             try:
                 with transaction.atomic():
+                    record = idempotency.reserve(key, fingerprint) if key else None
+                    
                     # Validate availability
                     service = VendorService.objects.get(
                         id=serializer.validated_data['service_id'],
@@ -26,61 +59,42 @@ class BookingCreateView(APIView):
                     )
                     
                     # Check if slot is available
+                    slot_id = serializer.validated_data['slot_id']
+                    if occurrence:
+                        slot_id = materialize_slot(*occurrence).id
                     slot = AvailabilitySlot.objects.select_for_update().get(
-                        id=serializer.validated_data['slot_id'],
+                        id=slot_id,
                         is_available=True
                     )
                     
                     if slot.is_fully_booked():
-                        return Response(
+                        return idempotency.complete(record, Response(
                             {'error': 'Time slot is fully booked'},
                             status=status.HTTP_400_BAD_REQUEST
-                        )
-                    
-                    # Calculate pricing
-                    pricing_data = calculate_total_price(
-                        service, 
-                        serializer.validated_data['quantity'],
-                        serializer.validated_data.get('pricing_tier_id')
-                    )
+                        ))
                     
-                    # Create booking
-                    booking = Booking.objects.create(
-                        vendor=service.vendor,
-                        service=service,
-                        customer_name=serializer.validated_data['customer_name'],
-                        customer_email=serializer.validated_data['customer_email'],
-                        customer_phone=serializer.validated_data.get('customer_phone', ''),
-                        booking_date=slot.date,
-                        start_time=slot.start_time,
-                        end_time=slot.end_time,
-                        quantity=serializer.validated_data['quantity'],
-                        base_price=pricing_data['base_price'],
-                        tax_amount=pricing_data['tax_amount'],
-                        platform_fee=pricing_data['platform_fee'],
-                        total_amount=pricing_data['total_amount'],
-                        special_requests=serializer.validated_data.get('special_requests', '')
-                    )
+                    booking = create_booking(service, slot, serializer.validated_data)
                     
                     # Update slot capacity
                     slot.booked_capacity += 1
-                    slot.save()
-                    
-                    # Create booking history
-                    BookingHistory.objects.create(
-                        booking=booking,
-                        status='pending',
-                        notes='Booking created'
-                    )
+                    slot.save(update_fields=['booked_capacity'])
                     
                     # Send confirmation email (mock implementation)
                     self.send_confirmation_email(booking)
                     
-                    return Response(
+                    return idempotency.complete(record, Response(
                         BookingSerializer(booking).data,
                         status=status.HTTP_201_CREATED
-                    )
+                    ))
                     
+            except idempotency.KeyInUse:
+                record = idempotency.lookup(key)
+                if record is None:
+                    return Response(
+                        {'error': f'A request with this {idempotency.HEADER} is still in progress'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                return idempotency.replay(record, fingerprint)
             except VendorService.DoesNotExist:
                 return Response(
                     {'error': 'Service not found'},
@@ -95,33 +109,97 @@ class BookingCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
     def send_confirmation_email(self, booking):
-        # In a real implementation, you would use Django's email system
-        # or a service like SendGrid/Mailgun
-        print(f"Mock email sent to {booking.customer_email}")
-        print(f"Booking confirmed: {booking.booking_id}")
+        send_confirmation_email(booking)
+        
+class SlotHoldCreateView(APIView):
+    """First checkout phase: hold capacity on a slot while the customer pays."""
+    
+    def post(self, request):
+        resolved = resolve_slot(request.data)
+        if resolved is None:
+            return Response(
+                {'error': 'Time slot not available'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        data, occurrence = resolved
+        serializer = BookingCreateSerializer(data=data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            
+        try:
+            hold = place_hold(request.user, serializer.validated_data, occurrence=occurrence)
+        except VendorService.DoesNotExist:
+            return Response(
+                {'error': 'Service not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+            
+        if hold is None:
+            return Response(
+                {'error': 'Time slot is fully booked'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        return Response({
+            'hold_id': hold.hold_id,
+            'slot_id': hold.slot_id,
+            'expires_at': hold.expires_at,
+        }, status=status.HTTP_201_CREATED)
+        
+class SlotHoldDetailView(APIView):
+    def delete(self, request, hold_id):
+        if not release_hold(request.user, hold_id):
+            return Response(
+                {'error': 'Hold not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+            
+        return Response(status=status.HTTP_204_NO_CONTENT)
+        
+class SlotHoldConfirmView(APIView):
+    """Second checkout phase: convert the hold into a booking."""
+    
+    def post(self, request, hold_id):
+        try:
+            booking, created = confirm_hold(request.user, hold_id)
+        except SlotHold.DoesNotExist:
+            return Response(
+                {'error': 'Hold not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except HoldExpired:
+            return Response(
+                {'error': 'Hold has expired'},
+                status=status.HTTP_410_GONE
+            )
+            
+        if created:
+            send_confirmation_email(booking)
+            
+        return Response(
+            BookingSerializer(booking).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
         
 class VendorBookingListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
-    @method_decorator(cache_page(60 * 2))  # Cache for 2 minutes
+    @cache_view(60 * 2, stale=30)  # Cache for 2 minutes, per vendor
     def get(self, request):
         status_filter = request.query_params.get('status')
         date_from = request.query_params.get('from')
         date_to = request.query_params.get('to')
         
-        bookings = Booking.objects.filter(vendor=request.user)
+        fields, expand = requested_fields(request)
         
-        if status_filter:
-            bookings = bookings.filter(status=status_filter)
+        # Ranges reaching past the archive cutoff also read archived bookings
+        data = []
+        for bookings in vendor_bookings(request.user, status_filter, date_from, date_to):
+            data.extend(serialize_many(BookingSerializer, bookings, fields=fields, expand=expand))
             
-        if date_from:
-            bookings = bookings.filter(booking_date__gte=date_from)
-            
-        if date_to:
-            bookings = bookings.filter(booking_date__lte=date_to)
-            
-        serializer = BookingSerializer(bookings, many=True)
-        return Response(serializer.data)
+        return Response(data)
         
 class VendorBookingDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -133,7 +211,7 @@ class VendorBookingDetailView(APIView):
             return None
             
     def get(self, request, pk):
-        booking = self.get_object(pk, request.user)
+        booking = get_vendor_booking(request.user, pk)
         
         if not booking:
             return Response(
@@ -141,7 +219,8 @@ class VendorBookingDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
             
-        serializer = BookingSerializer(booking)
+        fields, expand = requested_fields(request)
+        serializer = sparse(BookingSerializer)(booking, fields=fields, expand=expand)
         return Response(serializer.data)
         
     def patch(self, request, pk):
@@ -162,16 +241,82 @@ class VendorBookingDetailView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
             
-        # Update booking status
-        booking.status = new_status
-        booking.save()
+        if not can_transition(booking.status, new_status):
+            return Response(
+                {'error': f'Cannot change status from {booking.status} to {new_status}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        with transaction.atomic():
+            # Locked so a concurrent change cannot release the slot unit twice
+            current = Booking.objects.select_for_update().values_list('status', flat=True).get(pk=booking.pk)
+            if current != booking.status:
+                return Response(
+                    {'error': 'Booking was changed by another request, please retry'},
+                    status=status.HTTP_409_CONFLICT
+                )
+                
+            # Cancelled and refunded bookings give their slot unit back
+            if releases_capacity(booking.status, new_status):
+                release_capacity([booking])
+                
+            # Update booking status
+            booking.status = new_status
+            booking.save()
+            
+            # Add to history
+            BookingHistory.objects.create(
+                booking=booking,
+                status=new_status,
+                notes=request.data.get('notes', ''),
+                created_by=request.user
+            )
+            
+        return Response(BookingSerializer(booking).data)
         
-        # Add to history
-        BookingHistory.objects.create(
-            booking=booking,
-            status=new_status,
+class VendorBookingBulkTransitionView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        new_status = request.data.get('status')
+        booking_ids = request.data.get('booking_ids')
+        
+        if not new_status or new_status not in dict(Booking.BOOKING_STATUS):
+            return Response(
+                {'error': 'Valid status required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        if not isinstance(booking_ids, list) or not booking_ids:
+            return Response(
+                {'error': 'booking_ids must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        if len(booking_ids) > settings.BOOKING_BULK_TRANSITION_LIMIT:
+            return Response(
+                {'error': f'At most {settings.BOOKING_BULK_TRANSITION_LIMIT} bookings per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        try:
+            booking_ids = [int(pk) for pk in booking_ids]
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'booking_ids must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        results = bulk_transition(
+            request.user,
+            booking_ids,
+            new_status,
             notes=request.data.get('notes', ''),
-            created_by=request.user
+            user=request.user
         )
         
-        return Response(BookingSerializer(booking).data)
\ No newline at end of file
+        return Response({
+            'status': new_status,
+            'updated': sum(1 for result in results if result['outcome'] == UPDATED),
+            'results': results
+        })
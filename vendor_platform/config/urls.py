@@ -4,6 +4,7 @@ from rest_framework import routers
 from vendors import views as vendor_views
 from bookings import views as booking_views
 from search import views as search_views
+from config import views as config_views
 
 router = routers.DefaultRouter()
 
@@ -13,12 +14,29 @@ urlpatterns = [
     path('api/auth/login/', vendor_views.VendorLoginView.as_view(), name='vendor-login'),
     path('api/vendor/profile/', vendor_views.VendorProfileView.as_view(), name='vendor-profile'),
     path('api/vendor/services/', vendor_views.VendorServiceListView.as_view(), name='vendor-services'),
+    path('api/vendor/services/import/', vendor_views.VendorServiceImportView.as_view(), name='vendor-services-import'),
     path('api/vendor/services/<int:pk>/', vendor_views.VendorServiceDetailView.as_view(), name='vendor-service-detail'),
     path('api/vendor/availability/', vendor_views.AvailabilitySlotView.as_view(), name='vendor-availability'),
+    path('api/vendor/availability/calendar/', vendor_views.AvailabilityCalendarView.as_view(), name='vendor-availability-calendar'),
+    path('api/vendor/availability/rules/', vendor_views.AvailabilityRuleListView.as_view(), name='vendor-availability-rules'),
+    path('api/vendor/availability/rules/<int:pk>/', vendor_views.AvailabilityRuleDetailView.as_view(), name='vendor-availability-rule-detail'),
     path('api/vendor/bookings/', booking_views.VendorBookingListView.as_view(), name='vendor-bookings'),
+    path('api/vendor/bookings/transition/', booking_views.VendorBookingBulkTransitionView.as_view(), name='vendor-booking-transition'),
     path('api/vendor/bookings/<int:pk>/', booking_views.VendorBookingDetailView.as_view(), name='vendor-booking-detail'),
     path('api/bookings/', booking_views.BookingCreateView.as_view(), name='create-booking'),
+    path('api/bookings/holds/', booking_views.SlotHoldCreateView.as_view(), name='create-slot-hold'),
+    path('api/bookings/holds/<uuid:hold_id>/', booking_views.SlotHoldDetailView.as_view(), name='slot-hold-detail'),
+    path('api/bookings/holds/<uuid:hold_id>/confirm/', booking_views.SlotHoldConfirmView.as_view(), name='confirm-slot-hold'),
     path('api/search/vendors/', search_views.VendorSearchView.as_view(), name='vendor-search'),
+    path('api/search/autocomplete/', search_views.AutocompleteView.as_view(), name='search-autocomplete'),
+    path('api/batch/', config_views.BatchView.as_view(), name='batch'),
+    path('api/metrics/concurrency/', config_views.ConcurrencyMetricsView.as_view(), name='concurrency-metrics'),
+    path('api/profiles/', config_views.ProfileListView.as_view(), name='profiles'),
+    path('api/profiles/<str:profile_id>/', config_views.ProfileDetailView.as_view(), name='profile-detail'),
+    path(
+        'api/profiles/<str:profile_id>/flamegraph/', config_views.ProfileDetailView.as_view(),
+        {'folded': True}, name='profile-flamegraph'
+    ),
 ]
 
 urlpatterns += router.urls
\ No newline at end of file
@@ -1,3 +1,96 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from utils import batch, concurrency, profiling
+
+
+class ConcurrencyMetricsView(APIView):
+    """Current adaptive limits, in-flight requests and shed counts of the worker serving the request."""
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        if concurrency.limits is None:
+            return Response({'enabled': False})
+        return Response({'enabled': True, **concurrency.limits.snapshot()})
+        
+        
+class BatchView(APIView):
+    """
+    Run several API requests in one round trip, e.g. everything a dashboard loads.
+    
+    POST {"requests": [{"method": "GET", "path": "/api/vendor/profile/?fields=company_name"}, ...]}
+    returns {"responses": [{"status": 200, "headers": {...}, "body": {...}}, ...]} in the same order.
+    Sub-requests share this request's authentication; each still applies its
+    own view's permissions and throttles.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        try:
+            parsed = batch.parse(request.data, request.path)
+        except batch.BatchError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            
+        return Response({'responses': batch.run(request, parsed)})
+        
+        
+class ProfileListView(APIView):
+    """
+    Stored request profiles of this host, and arming profiling for future requests.
+    
+    POST {"path": "/api/vendor/bookings/", "vendor_id": 12, "rate": 1.0, "minutes": 15, "limit": 20}
+    profiles matching requests from now on and also returns an X-Profile-Token
+    value for reproducing the problem by hand. DELETE disarms all targets.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response({'targets': profiling.get_targets(), 'profiles': profiling.stored_profiles()})
+        
+    def post(self, request):
+        path = request.data.get('path', '/api/')
+        try:
+            vendor_id = request.data.get('vendor_id')
+            vendor_id = int(vendor_id) if vendor_id is not None else None
+            rate = float(request.data.get('rate', 1.0))
+            minutes = int(request.data.get('minutes', 15))
+            limit = int(request.data.get('limit', 20))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'vendor_id, minutes and limit must be integers, rate a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(path, str) or not path.startswith('/') or not 0 < rate <= 1 or minutes < 1 or limit < 1:
+            return Response(
+                {'error': 'path must start with /, rate be in (0, 1], minutes and limit positive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        target = profiling.arm(path, vendor_id, rate, minutes, limit)
+        return Response({
+            'target': target,
+            'header': profiling.TOKEN_HEADER,
+            'token': profiling.make_token(path),
+        }, status=status.HTTP_201_CREATED)
+        
+    def delete(self, request):
+        profiling.disarm()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+        
+        
+class ProfileDetailView(APIView):
+    """One stored profile with its query list, or its stacks in folded flame graph format."""
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request, profile_id, folded=False):
+        profile = profiling.load(profile_id, folded=folded)
+        if profile is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+            
+        if folded:
+            response = HttpResponse(profile, content_type='text/plain; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="{profile_id}.folded"'
+            return response
+        return Response(profile)
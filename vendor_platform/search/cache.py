@@ -0,0 +1,153 @@
+import hashlib
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils import singleflight
+from utils.text import fold_text
+
+# Query parameters that change the result of VendorSearchView
+TEXT_PARAMS = ('q', 'city', 'state', 'service_category', 'ordering')
+NUMERIC_PARAMS = ('min_rating', 'max_rating', 'price_min', 'price_max')
+# Matched against case- and accent-folded values, so folded the same way here
+FOLDED_PARAMS = ('city', 'state', 'service_category')
+
+GENERATION_KEY = 'search:generation'
+HITS_KEY = 'search:stats:hits'
+MISSES_KEY = 'search:stats:misses'
+
+
+def _normalize_number(value):
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        # Leave invalid input as-is so the filter still reports the error
+        return value
+    if not number.is_finite():
+        return value
+    return format(number.normalize(), 'f')
+
+
+def canonical_params(query_params):
+    """
+    Reduce search parameters to a canonical, sorted list of (key, value) pairs.
+
+    Text values are matched case-insensitively, so they are lower-cased;
+    locations and categories are also accent-folded and whitespace-squeezed,
+    as their filters compare folded values. Numbers are written in their
+    shortest exact form, so `4.50` and `4.5` share an entry. Unknown and
+    empty parameters are dropped, as is `page=1`.
+    """
+    params = []
+    for key in sorted(TEXT_PARAMS + NUMERIC_PARAMS + ('page',)):
+        value = (query_params.get(key) or '').strip()
+        if not value:
+            continue
+        if key in NUMERIC_PARAMS:
+            value = _normalize_number(value)
+        elif key == 'page':
+            if value == '1':
+                continue
+        elif key in FOLDED_PARAMS:
+            value = fold_text(value)
+        else:
+            # `q` is matched with icontains and `ordering` by name: inner spaces still count
+            value = value.lower()
+        params.append((key, value))
+    return params
+
+
+def generation():
+    """Current search generation; bumping it retires every cached page."""
+    return cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+
+
+def page_key(params):
+    digest = hashlib.sha1(urlencode(params).encode()).hexdigest()
+    return f'search:page:{generation()}:{digest}'
+
+
+def vendor_key(vendor_id):
+    return f'search:vendor:{vendor_id}'
+
+
+def fetch_page(params, compute):
+    """
+    Return ({'count', 'number', 'ids'}, how) for these parameters.
+
+    `compute()` returns a Django Page of vendor ids. Concurrent misses for
+    the same page run it once, and an expired page is served stale for
+    SEARCH_CACHE_STALE seconds while one request refreshes it.
+    """
+    def build():
+        page = compute()
+        return {'count': page.paginator.count, 'number': page.number, 'ids': list(page.object_list)}
+
+    entry, how = singleflight.fetch(
+        page_key(params), build, settings.SEARCH_CACHE_TIMEOUT, stale=settings.SEARCH_CACHE_STALE
+    )
+    _increment(MISSES_KEY if how == singleflight.MISS else HITS_KEY)
+    return entry, how
+
+
+def get_profiles(serializer, vendor_ids):
+    """
+    Return `.values()` rows for `vendor_ids`, in order, from the per-vendor cache.
+
+    Vendors missing from the cache are loaded in one query and stored.
+    """
+    cached = cache.get_many([vendor_key(pk) for pk in vendor_ids])
+    rows = {pk: cached[vendor_key(pk)] for pk in vendor_ids if vendor_key(pk) in cached}
+
+    missing = [pk for pk in vendor_ids if pk not in rows]
+    if missing:
+        columns = dict.fromkeys(['id', *serializer.columns])
+        loaded = {
+            row['id']: row
+            for row in serializer.model.objects.filter(id__in=missing).values(*columns)
+        }
+        cache.set_many(
+            {vendor_key(pk): row for pk, row in loaded.items()}, settings.SEARCH_VENDOR_CACHE_TIMEOUT
+        )
+        rows.update(loaded)
+
+    return [rows[pk] for pk in vendor_ids if pk in rows]
+
+
+def invalidate_pages():
+    """Retire all cached result pages; per-vendor profiles are kept."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, timeout=None)
+
+
+def invalidate_vendor(vendor_id, pages=True):
+    cache.delete(vendor_key(vendor_id))
+    if pages:
+        invalidate_pages()
+
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def stats():
+    hits = cache.get(HITS_KEY) or 0
+    misses = cache.get(MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
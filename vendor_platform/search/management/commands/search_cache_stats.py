@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from search import cache as search_cache
+
+
+class Command(BaseCommand):
+    help = 'Report the hit ratio of the vendor search result cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after reporting')
+        parser.add_argument('--flush', action='store_true', help='Retire every cached result page')
+
+    def handle(self, *args, **options):
+        stats = search_cache.stats()
+        ratio = 'n/a' if stats['hit_ratio'] is None else f"{stats['hit_ratio']:.1%}"
+        self.stdout.write(f"hits={stats['hits']} misses={stats['misses']} hit_ratio={ratio}")
+
+        if options['reset']:
+            search_cache.reset_stats()
+            self.stdout.write('Counters reset')
+        if options['flush']:
+            search_cache.invalidate_pages()
+            self.stdout.write(self.style.SUCCESS('Cached search pages retired'))
@@ -0,0 +1,51 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from vendors.models import Vendor, VendorService, VendorServiceCategory
+from . import cache as search_cache
+from .typeahead import snapshot as typeahead_snapshot
+
+# Vendor fields that decide whether and where a vendor appears in search results
+SEARCH_FIELDS = {'company_name', 'description', 'city', 'state', 'status', 'rating', 'total_reviews'}
+
+
+# The receivers invalidate once the change commits, like invalidate_calendar, so a
+# concurrent search cannot cache the not yet committed rows under the new generation
+def _invalidate_vendor(vendor_id, pages=True):
+    search_cache.invalidate_vendor(vendor_id, pages=pages)
+    if pages:
+        typeahead_snapshot.invalidate()
+
+
+def _invalidate_listings(typeahead=False):
+    search_cache.invalidate_pages()
+    if typeahead:
+        typeahead_snapshot.invalidate()
+
+
+@receiver(post_save, sender=Vendor)
+def vendor_saved(sender, instance, update_fields=None, **kwargs):
+    # Saves limited to unrelated fields (e.g. last_login) keep the result pages
+    pages = update_fields is None or bool(SEARCH_FIELDS & set(update_fields))
+    transaction.on_commit(partial(_invalidate_vendor, instance.pk, pages=pages))
+
+
+@receiver(post_delete, sender=Vendor)
+def vendor_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(_invalidate_vendor, instance.pk))
+
+
+@receiver(post_save, sender=VendorService)
+@receiver(post_delete, sender=VendorService)
+def service_changed(sender, instance, **kwargs):
+    # Services only affect filtering and price ordering, not the cached profile
+    transaction.on_commit(_invalidate_listings)
+
+
+@receiver(post_save, sender=VendorServiceCategory)
+@receiver(post_delete, sender=VendorServiceCategory)
+def category_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(_invalidate_listings, typeahead=True))
@@ -1,3 +1,151 @@
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.http import QueryDict
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from vendors.models import Vendor, VendorServiceCategory, VendorService
+from utils.text import fold_text
+from . import cache as search_cache
+from . import typeahead
+
+class CanonicalParamsTestCase(TestCase):
+    def test_equivalent_queries_share_a_key(self):
+        first = search_cache.canonical_params(QueryDict('city=Pune&min_rating=4.50&q=%20Cake%20Shop&page=1'))
+        second = search_cache.canonical_params(QueryDict('q=cake shop&min_rating=4.5&city=PUNE&foo=bar'))
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first, [('city', 'pune'), ('min_rating', '4.5'), ('q', 'cake shop')])
+        
+    def test_distinct_values_are_kept_apart(self):
+        self.assertNotEqual(
+            search_cache.canonical_params(QueryDict('min_rating=4.5')),
+            search_cache.canonical_params(QueryDict('min_rating=4.55'))
+        )
+        self.assertEqual(search_cache.canonical_params(QueryDict('price_min=abc')), [('price_min', 'abc')])
+        
+class SearchQueryKeyTestCase(APITestCase):
+    def test_queries_with_different_results_get_different_keys(self):
+        Vendor.objects.create(
+            email='v@example.com', vendor_id='V1', company_name='Strauss  Bakery', status='approved'
+        )
+        
+        for first, second in [('strauss bakery', 'strauss  bakery'), ('strauss', 'STRAUß')]:
+            results = [
+                self.client.get('/api/search/vendors/', {'q': q}).data['count'] for q in (first, second)
+            ]
+            keys = [search_cache.canonical_params(QueryDict(urlencode({'q': q}))) for q in (first, second)]
+            self.assertNotEqual(results[0], results[1])
+            self.assertNotEqual(keys[0], keys[1])
+            
 
-# Create your tests here.
+class VendorSearchCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendors = [
+            Vendor.objects.create(
+                email=f'vendor{i}@example.com', vendor_id=f'V{i}', company_name=f'Vendor {i}',
+                city='Pune', status='approved', rating=i
+            )
+            for i in range(3)
+        ]
+        
+    def search(self, query='city=pune&ordering=rating'):
+        return self.client.get(f'/api/search/vendors/?{query}')
+        
+    def test_repeated_search_is_served_from_cache(self):
+        first = self.search()
+        
+        with self.assertNumQueries(0):
+            second = self.search('ordering=RATING&city=Pune')
+            
+        self.assertEqual(first['X-Search-Cache'], 'miss')
+        self.assertEqual(second['X-Search-Cache'], 'hit')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(search_cache.stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+        
+    def test_vendor_change_invalidates_results(self):
+        self.search()
+        vendor = self.vendors[0]
+        vendor.company_name = 'Renamed'
+        vendor.rating = 5
+        with self.captureOnCommitCallbacks(execute=True):
+            vendor.save()
+            
+        response = self.search()
+        
+        self.assertEqual(response['X-Search-Cache'], 'miss')
+        self.assertEqual(response.data['results'][0]['company_name'], 'Renamed')
+        
+    def test_invalidation_waits_for_commit(self):
+        self.search()
+        vendor = self.vendors[0]
+        vendor.company_name = 'Renamed'
+        with self.captureOnCommitCallbacks() as callbacks:
+            vendor.save()
+            # Still inside the transaction: the cached page stays current for other connections
+            self.assertEqual(self.search()['X-Search-Cache'], 'hit')
+            
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.search()['X-Search-Cache'], 'miss')
+        
+    def test_service_change_invalidates_pages_only(self):
+        self.search()
+        with self.captureOnCommitCallbacks(execute=True):
+            category = VendorServiceCategory.objects.create(name='Catering')
+            VendorService.objects.create(
+                vendor=self.vendors[0], category=category, name='Buffet', description='', base_price=100
+            )
+        
+        with self.assertNumQueries(2):
+            response = self.search()
+            
+        self.assertEqual(response['X-Search-Cache'], 'miss')
+        
+class TypeaheadTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        for i, (name, city, rating) in enumerate([
+            ('Royal Cake Shop', 'Pune', 4.5), ('Rose Caterers', 'Pune', 3), ('Café Rouge', 'Mumbai', 5)
+        ]):
+            Vendor.objects.create(
+                email=f'vendor{i}@example.com', vendor_id=f'V{i}', company_name=name,
+                city=city, status='approved', rating=rating
+            )
+        Vendor.objects.create(email='pending@example.com', vendor_id='P', company_name='Rogue', city='Pune')
+        VendorServiceCategory.objects.create(name='Photography')
+        
+    def test_prefix_lookup_matches_word_starts_by_weight(self):
+        index = typeahead.build_index()
+        
+        self.assertEqual([s['text'] for s in index.lookup('ro')], ['Café Rouge', 'Royal Cake Shop', 'Rose Caterers'])
+        self.assertEqual([s['text'] for s in index.lookup('cake s')], ['Royal Cake Shop'])
+        self.assertEqual([s['text'] for s in index.lookup('CAFE')], ['Café Rouge'])
+        self.assertEqual([s['type'] for s in index.lookup('pu')], ['city'])
+        self.assertEqual([s['text'] for s in index.lookup('photo')], ['Photography'])
+        self.assertEqual(index.lookup('rogue'), [])
+        
+    def test_fold_text(self):
+        self.assertEqual(fold_text('  Café   ROUGE '), 'cafe rouge')
+        
+    def test_endpoint_serves_from_memory(self):
+        self.client.get('/api/search/autocomplete/', {'q': 'r'})
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/search/autocomplete/', {'q': 'roy', 'limit': 5})
+            
+        vendor = Vendor.objects.get(company_name='Royal Cake Shop')
+        self.assertEqual(response.data['results'], [{'type': 'vendor', 'text': 'Royal Cake Shop', 'id': vendor.pk}])
+        
+    def test_vendor_change_swaps_generation(self):
+        self.client.get('/api/search/autocomplete/', {'q': 'r'})
+        vendor = Vendor.objects.get(company_name='Rose Caterers')
+        vendor.company_name = 'Zest Caterers'
+        with self.captureOnCommitCallbacks(execute=True):
+            vendor.save()
+            
+        response = self.client.get('/api/search/autocomplete/', {'q': 'zes'})
+        
+        self.assertEqual([s['text'] for s in response.data['results']], ['Zest Caterers'])
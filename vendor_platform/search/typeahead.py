@@ -0,0 +1,105 @@
+import heapq
+import math
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from utils.snapshots import VersionedSnapshot
+from utils.text import fold_text
+from vendors.models import Vendor, VendorServiceCategory
+
+MAX_SUGGESTIONS = 10
+# Prefixes up to this length are answered from precomputed lists
+PRECOMPUTED_PREFIX_LENGTH = 3
+_PREFIX_END = chr(0x10FFFF)
+
+
+class TypeaheadIndex:
+    """
+    Immutable prefix index over suggestions, built once per snapshot.
+
+    Every word start of a suggestion is a key ("Royal Cake Shop" is found by
+    "roy", "cak" and "sho"); keys are kept in one sorted list searched with
+    bisect. Short prefixes match too many keys to rank per keystroke, so
+    their top suggestions are precomputed.
+    """
+
+    def __init__(self, suggestions):
+        # suggestions: [(weight, {'type', 'text', 'id'}), ...]
+        ranked = sorted(suggestions, key=lambda item: (-item[0], item[1]['text']))
+        self.suggestions = [suggestion for weight, suggestion in ranked]
+
+        keys = []
+        for rank, suggestion in enumerate(self.suggestions):
+            words = fold_text(suggestion['text']).split(' ')
+            for start in range(len(words)):
+                keys.append((' '.join(words[start:]), rank))
+        keys.sort()
+        self.keys = [key for key, rank in keys]
+        self.ranks = [rank for key, rank in keys]
+
+        # Ranks are positions in the weight order, so the smallest ranks are the best
+        self.top = {}
+        for key, rank in keys:
+            for length in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                self.top.setdefault(key[:length], set()).add(rank)
+        self.top = {prefix: sorted(ranks)[:MAX_SUGGESTIONS] for prefix, ranks in self.top.items()}
+
+    def lookup(self, query, limit=MAX_SUGGESTIONS):
+        prefix = fold_text(query)
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            ranks = self.top.get(prefix, [])
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + _PREFIX_END, start)
+            ranks = heapq.nsmallest(limit, set(self.ranks[start:end]))
+        return [self.suggestions[rank] for rank in ranks[:limit]]
+
+
+def _normalized(rows):
+    """Scale weights of one suggestion type to 0..1 so types are comparable."""
+    highest = max((weight for weight, suggestion in rows), default=0) or 1
+    return [(weight / highest, suggestion) for weight, suggestion in rows]
+
+
+def build_index():
+    approved = Vendor.objects.filter(status='approved')
+
+    vendors = [
+        ((1 + rating) * math.log(2 + total_reviews), {'type': 'vendor', 'text': name, 'id': pk})
+        for pk, name, rating, total_reviews in approved.values_list(
+            'id', 'company_name', 'rating', 'total_reviews'
+        ).iterator()
+    ]
+
+    # Cities are stored free-form; merge spellings and show the most common one
+    cities = {}
+    for city, count in approved.values_list('city').annotate(count=Count('id')):
+        folded = fold_text(city)
+        if not folded:
+            continue
+        total, best, best_count = cities.get(folded, (0, city, 0))
+        cities[folded] = (total + count, city if count > best_count else best, max(count, best_count))
+    cities = [
+        (total, {'type': 'city', 'text': best, 'id': None})
+        for total, best, best_count in cities.values()
+    ]
+
+    categories = [
+        (services, {'type': 'category', 'text': name, 'id': pk})
+        for pk, name, services in VendorServiceCategory.objects.filter(is_active=True)
+        .annotate(services=Count('vendorservice', filter=Q(vendorservice__is_active=True)))
+        .values_list('id', 'name', 'services')
+    ]
+
+    return TypeaheadIndex(_normalized(vendors) + _normalized(cities) + _normalized(categories))
+
+
+snapshot = VersionedSnapshot('typeahead', build_index, max_age=settings.TYPEAHEAD_MAX_AGE)
+
+
+def suggest(query, limit=MAX_SUGGESTIONS):
+    return snapshot.get().lookup(query, limit)
@@ -1,3 +1,105 @@
-from django.shortcuts import render
+from django.core.paginator import Page, Paginator
+from django.db import models
+from django_filters import rest_framework as filters
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from vendors.models import Vendor
+from vendors.serializers import VendorProfileSerializer
+from services.filters import VendorFilter
+from utils.fast_serializers import fast_serializer
+from utils.sparse_fields import requested_fields
+from utils.throttling import AutocompleteThrottle
+from . import cache as search_cache
+from . import typeahead
+
+
+class VendorSearchView(generics.ListAPIView):
+    queryset = Vendor.objects.filter(status='approved')
+    serializer_class = VendorProfileSerializer
+    filter_backends = [filters.DjangoFilterBackend]
+    filterset_class = VendorFilter
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if 'services' in requested_fields(self.request)[1]:
+            queryset = queryset.prefetch_related('services')
+        
+        # Search by company name or description
+        # Stripped like search.cache.canonical_params, so equal cache keys mean equal results
+        search_query = (self.request.query_params.get('q') or '').strip()
+        if search_query:
+            queryset = queryset.filter(
+                models.Q(company_name__icontains=search_query) |
+                models.Q(description__icontains=search_query)
+            )
+            
+        # Ordering
+        ordering = (self.request.query_params.get('ordering') or '').strip().lower()
+        if ordering:
+            if ordering == 'rating':
+                queryset = queryset.order_by('-rating', '-total_reviews')
+            elif ordering == 'price_low':
+                queryset = queryset.annotate(
+                    min_price=models.Min('services__base_price')
+                ).order_by('min_price')
+            elif ordering == 'price_high':
+                queryset = queryset.annotate(
+                    min_price=models.Min('services__base_price')
+                ).order_by('-min_price')
+                
+        return queryset
+        
+    def get_serializer(self, *args, **kwargs):
+        kwargs['fields'], kwargs['expand'] = requested_fields(self.request)
+        return super().get_serializer(*args, **kwargs)
+        
+    def list(self, request, *args, **kwargs):
+        serializer = fast_serializer(self.get_serializer_class())
+        if serializer is None or self.paginator is None:
+            return super().list(request, *args, **kwargs)
+        # Cached profile rows hold every column; the requested subset only narrows the output
+        output = fast_serializer(self.get_serializer_class(), *requested_fields(request))
+            
+        # Results are cached as ordered vendor-id pages; profiles come from a per-vendor cache
+        params = search_cache.canonical_params(request.query_params)
+        
+        def compute():
+            queryset = self.filter_queryset(self.get_queryset()).values_list('id', flat=True)
+            self.paginate_queryset(queryset)
+            return self.paginator.page
+            
+        entry, cache_status = search_cache.fetch_page(params, compute)
+        self._restore_page(request, entry)
+        
+        rows = search_cache.get_profiles(serializer, entry['ids'])
+        response = self.get_paginated_response(
+            output.serialize(rows, self.get_serializer_context())
+        )
+        response['X-Search-Cache'] = cache_status
+        return response
+        
+    def _restore_page(self, request, entry):
+        """Rebuild the paginator state of a cached page so the links match a fresh response."""
+        paginator = Paginator([], self.paginator.get_page_size(request))
+        paginator.count = entry['count']
+        self.paginator.page = Page(entry['ids'], entry['number'], paginator)
+        self.paginator.request = request
+        
+        
+class AutocompleteView(APIView):
+    """Typeahead suggestions for vendor names, cities and categories, served from memory."""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [AutocompleteThrottle]
+    
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', typeahead.MAX_SUGGESTIONS))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, typeahead.MAX_SUGGESTIONS))
+        
+        return Response({'query': query, 'results': typeahead.suggest(query, limit)})
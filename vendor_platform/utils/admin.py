@@ -1,3 +1,33 @@
+import json
+
 from django.contrib import admin
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+
+from .paginators import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables that grow to millions of rows."""
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered COUNT(*) behind "N results (M total)"
+    show_full_result_count = False
+
 
-# Register your models here.
+def log_bulk_change(request, objects, fields):
+    """Record an admin history entry for each object changed by a bulk action, in one INSERT."""
+    if not objects:
+        return
+    content_type = ContentType.objects.get_for_model(objects[0], for_concrete_model=False)
+    message = json.dumps([{'changed': {'fields': fields}}])
+    LogEntry.objects.bulk_create([
+        LogEntry(
+            user_id=request.user.pk,
+            content_type=content_type,
+            object_id=str(obj.pk),
+            object_repr=str(obj)[:200],
+            action_flag=CHANGE,
+            change_message=message,
+        )
+        for obj in objects
+    ])
@@ -0,0 +1,167 @@
+import contextvars
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+from . import concurrency
+
+# Metadata describing the batch request itself; each sub-request sets its own
+_OWN_META = (
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'QUERY_STRING', 'PATH_INFO', 'REQUEST_METHOD', 'HTTP_IDEMPOTENCY_KEY',
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _executor
+    _executor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.BATCH_PARALLEL_WORKERS, thread_name_prefix='batch')
+        return _executor
+
+
+class BatchError(ValueError):
+    """The batch payload is malformed."""
+
+
+def parse(payload, batch_path):
+    """Validate the batch payload; returns a list of (method, path, query string, body, headers)."""
+    items = payload.get('requests') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise BatchError('requests must be a non-empty list')
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(f'At most {settings.BATCH_MAX_REQUESTS} requests per batch')
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            raise BatchError(f'requests[{index}]: path is required')
+        method = str(item.get('method', 'GET')).upper()
+        if method not in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+            raise BatchError(f'requests[{index}]: unsupported method {method}')
+        url = urlsplit(item['path'])
+        if not url.path.startswith('/api/') or url.path == batch_path:
+            raise BatchError(f'requests[{index}]: only API routes can be batched')
+        headers = item.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise BatchError(f'requests[{index}]: headers must be an object')
+        headers = {
+            'HTTP_' + name.upper().replace('-', '_'): str(value) for name, value in headers.items()
+            if name.lower() not in ('authorization', 'cookie', 'content-type', 'content-length')
+        }
+        parsed.append((method, url.path, url.query, item.get('body'), headers))
+    return parsed
+
+
+def _sub_request(request, method, path, query, body, headers):
+    """A plain HttpRequest for one sub-request, carrying the batch request's user."""
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = path
+    sub.META = {key: value for key, value in request.META.items() if key not in _OWN_META}
+    sub.META.update(headers, REQUEST_METHOD=method, PATH_INFO=path, QUERY_STRING=query)
+    sub.GET = QueryDict(query)
+
+    content = json.dumps(body).encode() if body is not None else b''
+    sub.META.update(CONTENT_TYPE='application/json', CONTENT_LENGTH=str(len(content)))
+    sub._stream = io.BytesIO(content)
+    sub._read_started = False
+
+    # Reuse the batch request's authentication instead of decoding the token again
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def _response_body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    content = response.content
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(content or b'null')
+    return content.decode(response.charset or 'utf-8', errors='replace')
+
+
+def run_one(request, method, path, query, body, headers):
+    """
+    Dispatch one sub-request to its view; returns {'status', 'headers', 'body'}.
+
+    Sub-requests skip the middleware, so each one takes a slot of its own
+    route class's concurrency limit here and comes back as a 503 when shed.
+    """
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {'status': 404, 'headers': {}, 'body': {'error': 'Not found'}}
+
+    sub = _sub_request(request, method, path, query, body, headers)
+    sub.resolver_match = match
+
+    def view(sub):
+        return match.func(sub, *match.args, **match.kwargs)
+
+    limits = concurrency.limits
+    response = limits.call(sub, view) if limits is not None else view(sub)
+    headers = {
+        name: value for name, value in response.items()
+        if name not in ('Content-Type', 'Content-Length', 'Vary', 'Allow')
+    }
+    return {'status': response.status_code, 'headers': headers, 'body': _response_body(response)}
+
+
+def _in_thread(context, *args):
+    # Mirror Django's request lifecycle: connections follow CONN_MAX_AGE in pool threads too
+    close_old_connections()
+    try:
+        return context.run(run_one, *args)
+    finally:
+        close_old_connections()
+
+
+def run(request, parsed):
+    """
+    Run the sub-requests in order and return their results.
+
+    Consecutive GETs run in parallel on a small thread pool (each thread
+    with its own DB connection); writes run alone on the request thread, so
+    every write sees the results of the requests before it and no read
+    runs at the same time as a write. Inside a transaction everything runs
+    on the request thread, since other connections could not see its data.
+    """
+    parallel = settings.BATCH_PARALLEL_WORKERS > 1 and not connection.in_atomic_block
+    results = []
+    index = 0
+    while index < len(parsed):
+        end = index + 1
+        if parallel:
+            while end < len(parsed) and parsed[end][0] == 'GET' and parsed[index][0] == 'GET':
+                end += 1
+        if end - index > 1:
+            futures = [
+                _pool().submit(_in_thread, contextvars.copy_context(), request, *item)
+                for item in parsed[index:end]
+            ]
+            results.extend(future.result() for future in futures)
+        else:
+            results.append(run_one(request, *parsed[index]))
+        index = end
+    return results
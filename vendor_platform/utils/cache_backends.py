@@ -0,0 +1,278 @@
+import bisect
+import hashlib
+import pickle
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+L1_VERSION_KEY = 'cache:l1:version'
+
+
+def raw_key(key, key_prefix, version):
+    """KEY_FUNCTION for L2 nodes: keys arrive already prefixed and versioned."""
+    return key
+
+
+class HashRing:
+    """
+    Consistent hash ring: each node owns `replicas` points on a 64-bit circle.
+
+    A key belongs to the first point at or after its hash, so adding a node
+    only takes over roughly 1/n of the keys from the others.
+    """
+
+    def __init__(self, nodes, replicas=160):
+        self.replicas = replicas
+        self.points = []
+        self.owners = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def hash(value):
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+    def add(self, node):
+        for replica in range(self.replicas):
+            point = self.hash(f'{node}#{replica}')
+            index = bisect.bisect(self.points, point)
+            self.points.insert(index, point)
+            self.owners.insert(index, node)
+
+    def node_for(self, key):
+        index = bisect.bisect_left(self.points, self.hash(key))
+        return self.owners[index % len(self.points)]
+
+
+class LocalLRU:
+    """Bounded, thread-safe LRU of pickled values with a deadline per key."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, value, ttl):
+        if ttl <= 0 or not self.max_entries:
+            self.delete(key)
+            return
+        entry = (time.monotonic() + ttl, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# One L1 per process and cache, shared by the per-thread backend instances
+_local_caches = {}
+_local_caches_lock = threading.Lock()
+
+
+class TwoTierCache(BaseCache):
+    """
+    Cache backend with an in-process LRU (L1) in front of sharded nodes (L2).
+
+    LOCATION lists the L2 nodes; keys are spread across them with a
+    consistent hash ring and multi-key calls make one request per node.
+    Each node is an instance of OPTIONS['NODE_BACKEND'] (django-redis by
+    default, or e.g. LocMemCache as a stand-in in tests).
+
+    L1 keeps a value for at most L1_TIMEOUT seconds, so writes made by
+    other processes show up within that delay. Writes in this process
+    update L1 directly; `invalidate_l1()` (also run by `clear()`) publishes
+    a new version that makes every process drop its L1 within
+    L1_CHECK_INTERVAL seconds. Keys matching L1_EXCLUDE, such as locks and
+    counters, always go to L2.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        locations = location if isinstance(location, (list, tuple)) else location.split(',')
+        locations = [item.strip() for item in locations if item.strip()]
+
+        node_backend = import_string(options.get('NODE_BACKEND', 'django_redis.cache.RedisCache'))
+        node_params = {
+            'TIMEOUT': params.get('TIMEOUT', 300),
+            'KEY_FUNCTION': raw_key,
+            'OPTIONS': options.get('NODE_OPTIONS', {}),
+        }
+        self.nodes = {node: node_backend(node, dict(node_params)) for node in locations}
+        self.ring = HashRing(locations, options.get('REPLICAS', 160))
+
+        self.l1_timeout = options.get('L1_TIMEOUT', 5)
+        self.l1_check_interval = options.get('L1_CHECK_INTERVAL', 1.0)
+        exclude = options.get('L1_EXCLUDE')
+        self.l1_exclude = re.compile(exclude) if exclude else None
+
+        name = options.get('L1_NAME', ','.join(locations))
+        with _local_caches_lock:
+            self.l1 = _local_caches.setdefault(name, LocalLRU(options.get('L1_MAX_ENTRIES', 1000)))
+
+    # Helpers
+
+    def node(self, key):
+        return self.nodes[self.ring.node_for(key)]
+
+    def by_node(self, keys):
+        groups = {}
+        for key in keys:
+            groups.setdefault(self.ring.node_for(key), []).append(key)
+        return [(self.nodes[name], group) for name, group in groups.items()]
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _l1_ttl(self, timeout):
+        return self.l1_timeout if timeout is None else min(self.l1_timeout, timeout)
+
+    def _local(self, key):
+        """The L1 store, or None when `key` bypasses it."""
+        if self.l1_exclude is not None and self.l1_exclude.search(key):
+            return None
+        now = time.monotonic()
+        if now - self.l1.checked_at >= self.l1_check_interval:
+            self.l1.checked_at = now
+            version = self.node(L1_VERSION_KEY).get(L1_VERSION_KEY)
+            if version != self.l1.version:
+                self.l1.clear()
+                self.l1.version = version
+        return self.l1
+
+    def invalidate_l1(self):
+        """Make every process drop its L1 within L1_CHECK_INTERVAL seconds."""
+        self.node(L1_VERSION_KEY).set(L1_VERSION_KEY, uuid.uuid4().hex, None)
+        self.l1.clear()
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        local = self._local(key)
+        if local is not None:
+            entry = local.get(made)
+            if entry is not None:
+                return pickle.loads(entry[1])
+
+        sentinel = object()
+        value = self.node(made).get(made, sentinel)
+        if value is sentinel:
+            return default
+        if local is not None:
+            # Never cache beyond the L2 expiry we cannot see; L1_TIMEOUT bounds it
+            local.set(made, value, self.l1_timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        made = {self.make_and_validate_key(key, version=version): key for key in keys}
+        found = {}
+        remote = []
+        for made_key, key in made.items():
+            local = self._local(key)
+            entry = local.get(made_key) if local is not None else None
+            if entry is not None:
+                found[key] = pickle.loads(entry[1])
+            else:
+                remote.append(made_key)
+
+        for node, group in self.by_node(remote):
+            for made_key, value in node.get_many(group).items():
+                key = made[made_key]
+                found[key] = value
+                local = self._local(key)
+                if local is not None:
+                    local.set(made_key, value, self.l1_timeout)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        self.node(made).set(made, value, timeout)
+        local = self._local(key)
+        if local is not None:
+            local.set(made, value, self._l1_ttl(timeout))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        made = {self.make_and_validate_key(key, version=version): key for key in data}
+        failed = []
+        for node, group in self.by_node(made):
+            failed.extend(node.set_many({made_key: data[made[made_key]] for made_key in group}, timeout) or [])
+        for made_key, key in made.items():
+            local = self._local(key)
+            if local is not None:
+                local.set(made_key, data[key], self._l1_ttl(timeout))
+        return [made[made_key] for made_key in failed]
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        self.l1.delete(made)
+        return self.node(made).add(made, value, self._timeout(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        self.l1.delete(made)
+        return self.node(made).touch(made, self._timeout(timeout))
+
+    def incr(self, key, delta=1, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        self.l1.delete(made)
+        return self.node(made).incr(made, delta)
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def delete(self, key, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        self.l1.delete(made)
+        return self.node(made).delete(made)
+
+    def delete_many(self, keys, version=None):
+        made = [self.make_and_validate_key(key, version=version) for key in keys]
+        for made_key in made:
+            self.l1.delete(made_key)
+        for node, group in self.by_node(made):
+            node.delete_many(group)
+
+    def has_key(self, key, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        local = self._local(key)
+        if local is not None and local.get(made) is not None:
+            return True
+        return self.node(made).has_key(made)
+
+    def clear(self):
+        for node in self.nodes.values():
+            node.clear()
+        self.invalidate_l1()
+
+    def close(self, **kwargs):
+        for node in self.nodes.values():
+            node.close(**kwargs)
@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit adapted to latency: additive increase, multiplicative decrease.
+
+    Each request finishing within `target_ms` raises the limit by 1/limit
+    (about +1 per full window of requests) while the limit is actually in
+    use; a slower or failed request cuts it by `backoff`, at most once per
+    `target_ms` so a burst of slow completions counts as one signal.
+    """
+
+    def __init__(self, name, priority, initial_limit=20, min_limit=2, max_limit=200,
+                 target_ms=500, backoff=0.8, retry_after=1):
+        self.name = name
+        self.priority = priority
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_ms = target_ms
+        self.backoff_ratio = backoff
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.latency_ms = None
+        self.decreased_at = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.in_flight >= int(self.limit):
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self, latency_ms, failed=False):
+        """Record a finished request; returns True when it signalled overload."""
+        with self.lock:
+            self.in_flight -= 1
+            self.latency_ms = latency_ms if self.latency_ms is None else 0.9 * self.latency_ms + 0.1 * latency_ms
+            if failed or latency_ms > self.target_ms:
+                overloaded = True
+            else:
+                overloaded = False
+                # Only grow a limit that is being used, so idle classes keep a meaningful bound
+                if self.in_flight + 1 >= self.limit / 2:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        if overloaded:
+            self.decrease()
+        return overloaded
+
+    def decrease(self):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.decreased_at < self.target_ms / 1000:
+                return
+            self.decreased_at = now
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'priority': self.priority,
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+                'target_ms': self.target_ms,
+            }
+
+
+class ConcurrencyLimits:
+    """The limiters of one worker process, with the route name -> class mapping."""
+
+    def __init__(self, classes, default_class):
+        self.limiters = {}
+        self.routes = {}
+        for name, config in classes.items():
+            config = dict(config)
+            routes = config.pop('routes', [])
+            self.limiters[name] = AIMDLimiter(name, **config)
+            self.routes.update(dict.fromkeys(routes, name))
+        self.default = self.limiters[default_class]
+
+    def for_request(self, request):
+        try:
+            url_name = resolve(request.path_info).url_name
+        except Resolver404:
+            return self.default
+        return self.limiters[self.routes[url_name]] if url_name in self.routes else self.default
+
+    def call(self, request, get_response):
+        """Return get_response(request) run under the request's class limit, or a 503 when shed."""
+        limiter = self.for_request(request)
+        if not limiter.acquire():
+            response = JsonResponse(
+                {'error': 'Server is busy, please retry shortly'}, status=503
+            )
+            response['Retry-After'] = str(limiter.retry_after)
+            return response
+
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = get_response(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            if limiter.release((time.perf_counter() - started) * 1000, failed):
+                self.overloaded(limiter)
+
+    def overloaded(self, limiter):
+        # Trouble in a class also backs off every lower-priority one, so search gives way to bookings
+        for other in self.limiters.values():
+            if other is not limiter and other.priority > limiter.priority:
+                other.decrease()
+
+    def snapshot(self):
+        return {
+            'pid': os.getpid(),
+            'classes': {name: limiter.snapshot() for name, limiter in self.limiters.items()},
+        }
+
+
+# Set by the middleware; None when it is disabled
+limits = None
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Shed requests over their route class's adaptive concurrency limit with 503 + Retry-After.
+
+    Runs before authentication and the view, so shed requests never reach
+    the database. Limits are per worker process (threaded workers).
+    OPTIONS requests are never counted or shed; CorsMiddleware, listed
+    before this one, answers CORS preflights.
+    """
+
+    def __init__(self, get_response):
+        global limits
+        if not settings.CONCURRENCY_LIMITS_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        if limits is None:
+            limits = ConcurrencyLimits(settings.CONCURRENCY_ROUTE_CLASSES, settings.CONCURRENCY_DEFAULT_CLASS)
+        self.limits = limits
+
+    def __call__(self, request):
+        if request.method == 'OPTIONS':
+            return self.get_response(request)
+
+        return self.limits.call(request, self.get_response)
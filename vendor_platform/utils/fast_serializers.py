@@ -0,0 +1,299 @@
+import decimal
+from datetime import date, time, timezone as dt_timezone
+
+from django.db import models
+from django.utils import timezone
+from rest_framework import fields, relations, serializers
+from rest_framework.settings import api_settings
+
+from .sparse_fields import check_sparse_fields, sparse
+
+ISO_8601 = 'iso-8601'
+
+_compiled = {}
+
+
+class NotCompilable(Exception):
+    """The serializer uses a feature the fast path can't reproduce exactly."""
+
+
+def _iso_format(field, default_format):
+    output_format = getattr(field, 'format', default_format)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _datetime_converter(field):
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is not None or not _iso_format(field, api_settings.DATETIME_FORMAT):
+        return field.to_representation
+
+    def convert(value):
+        if timezone.is_aware(value):
+            value = timezone.make_naive(value, dt_timezone.utc)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return convert
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.decimal_places is None:
+        return field.to_representation
+
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return '{:f}'.format(value.quantize(quantum, rounding=rounding, context=context))
+
+    return convert
+
+
+def _file_converter(field, model_field):
+    """Return a factory that binds the request, since absolute URLs depend on it."""
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return None, lambda name: name or None
+
+    storage = model_field.storage
+
+    def bind(request):
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            if request is not None:
+                return request.build_absolute_uri(url)
+            return url
+        return convert
+
+    return bind, None
+
+
+def _converter(field):
+    """Map a DRF field to a plain callable applied to the raw `.values()` value."""
+    if isinstance(field, fields.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, fields.DateField):
+        return date.isoformat if _iso_format(field, api_settings.DATE_FORMAT) else field.to_representation
+    if isinstance(field, fields.TimeField):
+        return time.isoformat if _iso_format(field, api_settings.TIME_FORMAT) else field.to_representation
+    if isinstance(field, fields.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+        return None
+    if isinstance(field, fields.ReadOnlyField):
+        return None
+    if type(field) is fields.BooleanField:
+        return bool
+    if type(field) is fields.IntegerField:
+        return int
+    if type(field) is fields.FloatField:
+        return float
+    if isinstance(field, fields.CharField):
+        return str
+    return field.to_representation
+
+
+class FastReadSerializer:
+    """
+    Read-only twin of a ModelSerializer that works from `.values()` rows.
+
+    Field converters are compiled once per serializer class, so each row
+    costs a dict build and one call per field instead of a model instance
+    plus DRF's per-field attribute walking. The output is identical to
+    `serializer_class(queryset, many=True).data`.
+    """
+
+    def __init__(self, serializer_class, fields=None, expand=()):
+        if serializer_class.to_representation is not serializers.ModelSerializer.to_representation:
+            raise NotCompilable(f'{serializer_class.__name__} overrides to_representation')
+
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.columns = []
+        # (output key, column, converter, request-bound converter factory)
+        self.plan = []
+        # (output key, related name, fk column, child FastReadSerializer)
+        self.nested = []
+        # (output key, fk column, related model, child FastReadSerializer)
+        self.expanded = []
+
+        declared = {name: field for name, field in serializer_class().fields.items() if not field.write_only}
+        expandable = getattr(serializer_class.Meta, 'expandable_fields', {})
+        check_sparse_fields(declared, expandable, fields, expand)
+
+        for name, field in declared.items():
+            if name in expand:
+                self._compile_expansion(name, expandable[name])
+            elif fields is None or name in fields:
+                self._compile_field(name, field)
+        for name in expand:
+            if name not in declared:
+                self._compile_expansion(name, expandable[name])
+
+        if (self.nested or self.expanded) and self.model._meta.pk.attname not in self.columns:
+            self.columns.append(self.model._meta.pk.attname)
+
+    def _compile_field(self, name, field):
+        if isinstance(field, (fields.SerializerMethodField, fields.HiddenField)):
+            raise NotCompilable(f'{name}: {type(field).__name__} is not supported')
+        if field.source == '*' or '.' in field.source:
+            raise NotCompilable(f'{name}: source {field.source!r} is not supported')
+
+        try:
+            model_field = self.model._meta.get_field(field.source)
+        except Exception:
+            raise NotCompilable(f'{name}: {field.source!r} is not a model field')
+
+        if isinstance(field, serializers.ListSerializer):
+            if not isinstance(model_field, models.ManyToOneRel):
+                raise NotCompilable(f'{name}: only reverse foreign keys can be nested')
+            child = _compile(type(field.child))
+            self.nested.append((name, model_field.get_accessor_name(), model_field.field.attname, child))
+            self.plan.append((name, None, None, None))
+            return
+
+        if model_field.many_to_many or model_field.one_to_many or not model_field.concrete:
+            raise NotCompilable(f'{name}: {field.source!r} is not a concrete column')
+
+        if isinstance(field, fields.FileField):
+            bind, converter = _file_converter(field, model_field)
+        else:
+            bind, converter = None, _converter(field)
+
+        self.columns.append(field.source)
+        self.plan.append((name, field.source, converter, bind))
+
+    def _compile_expansion(self, name, child_class):
+        model_field = self.model._meta.get_field(name)
+        child = _compile(child_class)
+        if isinstance(model_field, models.ManyToOneRel):
+            self.nested.append((name, model_field.get_accessor_name(), model_field.field.attname, child))
+            self.plan.append((name, None, None, None))
+        elif isinstance(model_field, models.ForeignKey):
+            self.expanded.append((name, model_field.attname, model_field.related_model, child))
+            self.columns.append(model_field.attname)
+            self.plan.append((name, None, None, None))
+        else:
+            raise NotCompilable(f'{name}: only foreign keys can be expanded')
+
+    def values(self, queryset):
+        """Return `queryset` narrowed to the columns this serializer needs."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows, context=None):
+        """Serialize `.values()` rows, or a queryset (narrowed automatically)."""
+        if isinstance(rows, models.QuerySet):
+            rows = self.values(rows)
+        rows = list(rows)
+        if not rows:
+            return []
+
+        request = (context or {}).get('request')
+        plan = [
+            (key, column, bind(request) if bind else converter)
+            for key, column, converter, bind in self.plan
+        ]
+
+        nested = {}
+        pk_column = self.model._meta.pk.attname
+        for key, related_name, fk_column, child in self.nested:
+            parent_ids = [row[pk_column] for row in rows]
+            related_model = self.model._meta.get_field(related_name).related_model
+            columns = child.columns if fk_column in child.columns else [*child.columns, fk_column]
+            children = related_model._default_manager.filter(
+                **{f'{fk_column}__in': parent_ids}
+            ).values(*columns)
+            grouped = {parent_id: [] for parent_id in parent_ids}
+            for child_row in children:
+                grouped[child_row[fk_column]].append(child_row)
+            nested[key] = (child, grouped)
+
+        for key, fk_column, related_model, child in self.expanded:
+            related_ids = {row[fk_column] for row in rows} - {None}
+            pk_name = related_model._meta.pk.attname
+            columns = child.columns if pk_name in child.columns else [*child.columns, pk_name]
+            related = related_model._default_manager.filter(pk__in=related_ids).values(*columns)
+            by_id = {related_row[pk_name]: related_row for related_row in related}
+            nested[key] = (child, {
+                row[pk_column]: by_id.get(row[fk_column]) for row in rows
+            })
+
+        output = []
+        for row in rows:
+            item = {}
+            for key, column, convert in plan:
+                if column is None:
+                    child, grouped = nested[key]
+                    related = grouped[row[pk_column]]
+                    if isinstance(related, list):
+                        item[key] = child.serialize(related, context)
+                    else:
+                        item[key] = child.serialize([related], context)[0] if related else None
+                    continue
+                value = row[column]
+                if value is None:
+                    item[key] = None
+                elif convert is None:
+                    item[key] = value
+                else:
+                    item[key] = convert(value)
+            output.append(item)
+        return output
+
+
+# Compiled field subsets per (serializer, fields, expand); the combinations are client-chosen
+MAX_SPARSE_COMPILED = 256
+_sparse_compiled = {}
+
+
+def _compile(serializer_class, fields=None, expand=()):
+    if fields is not None or expand:
+        key = (serializer_class, frozenset(fields) if fields is not None else None, frozenset(expand))
+        if key not in _sparse_compiled:
+            if len(_sparse_compiled) >= MAX_SPARSE_COMPILED:
+                _sparse_compiled.clear()
+            _sparse_compiled[key] = FastReadSerializer(serializer_class, fields, tuple(expand))
+        return _sparse_compiled[key]
+
+    if serializer_class not in _compiled:
+        try:
+            _compiled[serializer_class] = FastReadSerializer(serializer_class)
+        except NotCompilable as exc:
+            _compiled[serializer_class] = exc
+    compiled = _compiled[serializer_class]
+    if isinstance(compiled, NotCompilable):
+        raise compiled
+    return compiled
+
+
+def fast_serializer(serializer_class, fields=None, expand=()):
+    """
+    Return the compiled fast serializer for `serializer_class`, or None if it can't be compiled.
+
+    `fields` limits the output (and the columns read) to those names;
+    `expand` names entries of `Meta.expandable_fields` to nest in full.
+    """
+    try:
+        return _compile(serializer_class, fields, expand)
+    except NotCompilable:
+        return None
+
+
+def serialize_many(serializer_class, queryset, context=None, fields=None, expand=()):
+    """Serialize a list response through the fast path, falling back to DRF when needed."""
+    compiled = fast_serializer(serializer_class, fields, expand)
+    if compiled is None:
+        serializer = sparse(serializer_class)(
+            queryset, many=True, context=context or {}, fields=fields, expand=expand
+        )
+        return serializer.data
+    return compiled.serialize(queryset, context)
@@ -1,6 +1,5 @@
 from django.core.exceptions import ValidationError
 import os
-from PIL import Image
 
 class FileSizeValidator:
     def __init__(self, limit_mb=5):
@@ -17,6 +16,9 @@ class ImageDimensionValidator:
         self.max_height = max_height
         
     def __call__(self, value):
+        # Pillow is only needed once an image is actually uploaded
+        from PIL import Image
+        
         try:
             with Image.open(value) as img:
                 width, height = img.size
@@ -0,0 +1,201 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import threading
+import uuid
+import weakref
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from decimal import Decimal
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+request_id = ContextVar('request_id', default=None)
+
+# Incoming ids are echoed into logs and headers, so keep them short and plain
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'sample_rate'}
+
+# Arguments of these types cannot change after the call, so formatting can wait for the listener
+_IMMUTABLE = (str, int, float, bool, type(None), Decimal, uuid.UUID)
+
+
+class RequestIdMiddleware:
+    """
+    Tag each request with an id, available to log records and returned in X-Request-ID.
+
+    A well-formed id sent by the client or a proxy is reused so a request
+    can be followed across services.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        value = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        # Django logs 4xx/5xx responses after this middleware returned; they find the id here
+        request.request_id = value
+        token = request_id.set(value)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response[REQUEST_ID_HEADER] = value
+        return response
+
+
+def record_request_id(record):
+    """The request id of a log record: passed explicitly, the current request's, or its `request`'s."""
+    return (
+        getattr(record, 'request_id', None)
+        or request_id.get()
+        or getattr(getattr(record, 'request', None), 'request_id', None)
+    )
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a `rate` share of records at `level` or below; higher levels always pass.
+
+    Kept records carry their sample rate so counts can be scaled back up.
+    """
+
+    def __init__(self, rate=1.0, level='INFO'):
+        super().__init__()
+        self.rate = float(rate)
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def filter(self, record):
+        if record.levelno > self.level or self.rate >= 1:
+            return True
+        if random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request id and `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': record_request_id(record),
+            'process': record.process,
+        }
+        if hasattr(record, 'sample_rate'):
+            entry['sample_rate'] = record.sample_rate
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+_queue_handlers = weakref.WeakSet()
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to a background thread that formats them and writes to `handlers`.
+
+    The calling thread only captures the request id and enqueues. When the
+    bounded queue is full the record is dropped, never waited on; the
+    number dropped is logged as a warning once there is room again. The
+    listener starts on first use, and again in each forked worker.
+
+    Configure with `'()': 'utils.log.QueueHandler'` and the targets as
+    `cfg://handlers.<name>` references; they must sort before this
+    handler's name so dictConfig has built them already.
+    """
+
+    def __init__(self, handlers, maxsize=10000):
+        # Index access: dictConfig only resolves cfg:// references in __getitem__
+        handlers = [handlers[index] for index in range(len(handlers))]
+        for handler in handlers:
+            if not isinstance(handler, logging.Handler):
+                raise ValueError(f'QueueHandler target not configured yet: {handler!r}')
+        # SimpleQueue is much cheaper to put to than Queue; the bound is checked
+        # in enqueue(), which Handler.handle() already serializes
+        super().__init__(queue.SimpleQueue())
+        self.handlers = handlers
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._unreported = 0
+        self._listener = None
+        self._start_lock = threading.Lock()
+        _queue_handlers.add(self)
+
+    def prepare(self, record):
+        record.request_id = record_request_id(record)
+        args = record.args
+        if args:
+            values = args.values() if isinstance(args, dict) else args
+            if not all(isinstance(value, _IMMUTABLE) for value in values):
+                # Mutable arguments may change once the caller moves on
+                record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record):
+        if self._listener is None:
+            self._start()
+        if self.queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            self._unreported += 1
+            return
+        if self._unreported:
+            self.queue.put_nowait(self._drop_record())
+            self._unreported = 0
+        self.queue.put_nowait(record)
+
+    def _drop_record(self):
+        record = logging.makeLogRecord({
+            'name': __name__,
+            'levelno': logging.WARNING,
+            'levelname': 'WARNING',
+            'msg': 'Log queue full, dropped %d records',
+            'args': (self._unreported,),
+        })
+        record.dropped = self._unreported
+        return record
+
+    def _start(self):
+        with self._start_lock:
+            if self._listener is None:
+                listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+                listener.start()
+                self._listener = listener
+
+    def _after_fork(self):
+        # The listener thread does not survive fork; records queued before it are the parent's
+        self.queue = queue.SimpleQueue()
+        self._listener = None
+        self._start_lock = threading.Lock()
+
+    def close(self):
+        with self._start_lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+        super().close()
+
+
+def _reset_queue_handlers():
+    for handler in list(_queue_handlers):
+        handler._after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_queue_handlers)
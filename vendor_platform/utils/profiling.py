@@ -0,0 +1,278 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .log import request_id
+from .query_fingerprints import fingerprint
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'utils.profiling'
+TARGETS_KEY = 'profiling:targets'
+PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+_base_dir = str(settings.BASE_DIR)
+
+
+def _frame_name(code):
+    path = code.co_filename
+    if path.startswith(_base_dir):
+        path = os.path.relpath(path, _base_dir)
+    elif 'site-packages' in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+    # Semicolons separate frames and the last space the count in the folded format
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'.replace(';', ':').replace(' ', '_')
+
+
+def fold(frame):
+    """One stack as `outermost;...;innermost` frame names."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Sample one thread's Python stack every `interval` seconds from a helper thread.
+
+    The samples are counted per distinct stack, which is the "folded"
+    input of flamegraph.pl, speedscope and most flame graph viewers.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold(frame)] += 1
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class QueryRecorder:
+    """Connection execute wrapper keeping each query with its duration."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.queries = []
+        self.count = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += duration_ms
+            if len(self.queries) < self.limit:
+                self.queries.append({
+                    'sql': sql, 'fingerprint': fingerprint(sql), 'ms': round(duration_ms, 3), 'many': many,
+                })
+
+
+def make_token(path_prefix='/'):
+    """Signed X-Profile-Token value profiling requests under `path_prefix` until it expires."""
+    return signing.dumps({'path': path_prefix}, salt=TOKEN_SALT)
+
+
+def check_token(token, path):
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return path.startswith(payload.get('path', '/'))
+
+
+def get_targets():
+    return cache.get(TARGETS_KEY) or []
+
+
+def arm(path_prefix, vendor_id=None, rate=1.0, minutes=15, limit=20):
+    """Profile up to `limit` requests under `path_prefix` (optionally of one vendor) for `minutes`."""
+    target = {
+        'id': uuid.uuid4().hex,
+        'path': path_prefix,
+        'vendor_id': vendor_id,
+        'rate': rate,
+        'limit': limit,
+        'expires_at': time.time() + minutes * 60,
+    }
+    targets = [item for item in get_targets() if item['expires_at'] > time.time()]
+    targets.append(target)
+    cache.set(TARGETS_KEY, targets, minutes * 60)
+    return target
+
+
+def disarm():
+    cache.delete(TARGETS_KEY)
+
+
+def _captured_key(target):
+    return f"profiling:captured:{target['id']}"
+
+
+def store(profile, folded):
+    directory = settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{profile['id']}.folded"), 'w') as handle:
+        handle.write(folded)
+    with open(os.path.join(directory, f"{profile['id']}.json"), 'w') as handle:
+        json.dump(profile, handle)
+    _prune(directory, settings.PROFILING_KEEP)
+
+
+def _prune(directory, keep):
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime, reverse=True,
+    )
+    for entry in profiles[keep:]:
+        for suffix in ('.json', '.folded'):
+            try:
+                os.remove(entry.path[:-len('.json')] + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def stored_profiles():
+    """Summaries of the stored profiles of this host, newest first."""
+    directory = settings.PROFILING_DIR
+    if not os.path.isdir(directory):
+        return []
+    summaries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.json'):
+            with open(entry.path) as handle:
+                profile = json.load(handle)
+            profile.pop('queries', None)
+            summaries.append(profile)
+    return sorted(summaries, key=lambda profile: profile['started_at'], reverse=True)
+
+
+def load(profile_id, folded=False):
+    """A stored profile (with its queries), its folded stacks, or None."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILING_DIR, f"{profile_id}.{'folded' if folded else 'json'}")
+    try:
+        with open(path) as handle:
+            return handle.read() if folded else json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Capture a sampling CPU profile and the queries of selected requests.
+
+    A request is profiled when it carries a valid X-Profile-Token, matches a
+    target armed through the admin endpoint, or falls into the random
+    PROFILING_SAMPLE_RATE share. Other requests only pay for a header
+    lookup and a check of the armed targets, which are re-read from the
+    cache every PROFILING_TARGETS_REFRESH seconds.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.targets = []
+        self.targets_checked_at = float('-inf')
+
+    def select(self, request):
+        """Why the request should be profiled ('token', 'sample' or a target), or None."""
+        token = request.headers.get(TOKEN_HEADER)
+        if token and check_token(token, request.path):
+            return 'token'
+
+        now = time.monotonic()
+        if now - self.targets_checked_at >= settings.PROFILING_TARGETS_REFRESH:
+            self.targets_checked_at = now
+            self.targets = get_targets()
+        for target in self.targets:
+            if (request.path.startswith(target['path']) and target['expires_at'] > time.time()
+                    and random.random() < target['rate']
+                    and (cache.get(_captured_key(target)) or 0) < target['limit']):
+                return target
+
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        reason = self.select(request)
+        if reason is None:
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000).start()
+        recorder = QueryRecorder(settings.PROFILING_MAX_QUERIES)
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        user = getattr(request, 'user', None)
+        vendor_id = user.pk if user is not None and user.is_authenticated else None
+        if isinstance(reason, dict):
+            if reason['vendor_id'] is not None and reason['vendor_id'] != vendor_id:
+                return response
+            try:
+                cache.incr(_captured_key(reason))
+            except ValueError:
+                cache.set(_captured_key(reason), 1, max(1, int(reason['expires_at'] - time.time())))
+
+        profile = {
+            'id': uuid.uuid4().hex,
+            'request_id': request_id.get(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'vendor_id': vendor_id,
+            'reason': reason if isinstance(reason, str) else f"target:{reason['id']}",
+            'started_at': started_at,
+            'duration_ms': round(duration_ms, 3),
+            'samples': sum(sampler.stacks.values()),
+            'interval_ms': settings.PROFILING_INTERVAL_MS,
+            'query_count': recorder.count,
+            'query_ms': round(recorder.total_ms, 3),
+            'queries': recorder.queries,
+        }
+        store(profile, sampler.folded())
+        response['X-Profile-Id'] = profile['id']
+        return response
@@ -0,0 +1,155 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+_SAVEPOINT = re.compile(r'\b(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\s+\S+', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_LIST = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+
+def fingerprint(sql):
+    """
+    Normalize SQL so queries differing only in literal values share one key.
+
+    Literals and placeholders become `?`, value lists such as `IN (?, ?, ?)`
+    or multi-row VALUES collapse to `(...)`, and whitespace is squeezed.
+    """
+    sql = _SAVEPOINT.sub(r'\1 ?', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _VALUE_LIST.sub('(...)', sql)
+    sql = _REPEATED_LIST.sub('(...)', sql)
+    return ' '.join(sql.split())
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return str(value)
+
+
+class QueryFingerprintCollector:
+    """
+    Aggregate executed queries by fingerprint: count, total and max time.
+
+    One concrete statement and its parameters are kept per fingerprint so
+    the index advisor can EXPLAIN it later. Instances are usable as a
+    connection execute wrapper.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, None if many else params, (time.perf_counter() - started) * 1000)
+
+    def record(self, sql, params, duration_ms):
+        key = fingerprint(sql)
+        with self.lock:
+            entry = self.stats.get(key)
+            if entry is None:
+                entry = self.stats[key] = {
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'sample_sql': sql,
+                    'sample_params': _jsonable(params) if params is not None else None,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+
+    def merge(self, stats):
+        with self.lock:
+            for key, other in stats.items():
+                entry = self.stats.setdefault(key, dict(other, count=0, total_ms=0.0, max_ms=0.0))
+                entry['count'] += other['count']
+                entry['total_ms'] += other['total_ms']
+                entry['max_ms'] = max(entry['max_ms'], other['max_ms'])
+
+    def top(self, limit=None):
+        """Fingerprints ordered by total time spent, most expensive first."""
+        with self.lock:
+            ordered = sorted(self.stats.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        return ordered[:limit] if limit else ordered
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.lock:
+            payload = json.dumps(self.stats, indent=2, sort_keys=True)
+        with open(path, 'w') as handle:
+            handle.write(payload)
+
+    @classmethod
+    def load(cls, *paths):
+        collector = cls()
+        for path in paths:
+            with open(path) as handle:
+                collector.merge(json.load(handle))
+        return collector
+
+
+@contextmanager
+def capture_fingerprints(collector=None):
+    """Record every query run on the default connection in this thread."""
+    collector = collector or QueryFingerprintCollector()
+    with connection.execute_wrapper(collector):
+        yield collector
+
+
+class QueryFingerprintMiddleware:
+    """
+    Production sampling: fingerprint the queries of a random share of requests.
+
+    Enabled by QUERY_FINGERPRINT_SAMPLE_RATE; each worker process
+    periodically writes its cumulative stats to QUERY_FINGERPRINT_DIR.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = settings.QUERY_FINGERPRINT_SAMPLE_RATE
+        if not self.sample_rate:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.collector = QueryFingerprintCollector()
+        self.flush_interval = settings.QUERY_FINGERPRINT_FLUSH_INTERVAL
+        self.last_flush = time.monotonic()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        with connection.execute_wrapper(self.collector):
+            response = self.get_response(request)
+
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.last_flush = time.monotonic()
+            self.collector.dump(
+                os.path.join(settings.QUERY_FINGERPRINT_DIR, f'fingerprints-{os.getpid()}.json')
+            )
+        return response
@@ -0,0 +1,170 @@
+import functools
+import hashlib
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from rest_framework.response import Response
+
+# How a value was obtained
+HIT = 'hit'          # fresh value from the cache
+STALE = 'stale'      # expired value served while another request recomputes it
+MISS = 'miss'        # computed by this request
+SHARED = 'shared'    # computed by a concurrent request this one waited for
+
+DEFAULT_WAIT = 2.0          # seconds a request waits for another one's computation
+DEFAULT_LOCK_TIMEOUT = 10   # seconds; must exceed the slowest computation
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.value = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _unwrap(entry):
+    """(fresh_until, value) from a stored entry, or None for missing or foreign entries."""
+    if isinstance(entry, tuple) and len(entry) == 2:
+        return entry
+    return None
+
+
+def fetch(key, compute, timeout, stale=0, wait=DEFAULT_WAIT, lock_timeout=DEFAULT_LOCK_TIMEOUT, cache_if=None):
+    """
+    Return (value, how) for `key`, calling `compute()` at most once across concurrent requests.
+
+    Entries stay fresh for `timeout` seconds and are then served stale for
+    up to `stale` more while a single request recomputes them. On a cold
+    miss, threads of this process wait for the one computing, and other
+    processes wait (polling, up to `wait` seconds) on a short lock held in
+    the shared cache. If the computing request fails or is too slow, the
+    waiting ones compute for themselves rather than error out.
+
+    `cache_if(value)` can veto storing a result, e.g. an error response.
+    """
+    entry = _unwrap(cache.get(key))
+    if entry is not None and time.time() < entry[0]:
+        return entry[1], HIT
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if entry is not None:
+            return entry[1], STALE
+        if flight.done.wait(wait) and flight.ok:
+            return flight.value, SHARED
+        return compute(), MISS
+
+    try:
+        value, how = _lead(key, compute, entry, timeout, stale, wait, lock_timeout, cache_if)
+        flight.value, flight.ok = value, True
+        return value, how
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+def get_or_compute(key, compute, timeout, **options):
+    """Cached value for `key`, computing it single-flight on a miss; see fetch()."""
+    return fetch(key, compute, timeout, **options)[0]
+
+
+def _lead(key, compute, entry, timeout, stale, wait, lock_timeout, cache_if):
+    lock_key = f'{key}:lock'
+    token = uuid.uuid4().hex
+
+    if cache.add(lock_key, token, lock_timeout):
+        try:
+            return _compute_and_store(key, compute, timeout, stale, cache_if), MISS
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    # Another process holds the lock
+    if entry is not None:
+        return entry[1], STALE
+
+    deadline = time.monotonic() + wait
+    delay = 0.005
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+        found = cache.get_many([key, lock_key])
+        entry = _unwrap(found.get(key))
+        if entry is not None and time.time() < entry[0]:
+            return entry[1], SHARED
+        if lock_key not in found:
+            # The other process finished without storing a value (or failed)
+            break
+
+    return _compute_and_store(key, compute, timeout, stale, cache_if), MISS
+
+
+def _compute_and_store(key, compute, timeout, stale, cache_if):
+    value = compute()
+    if cache_if is None or cache_if(value):
+        cache.set(key, (time.time() + timeout, value), timeout + stale)
+    return value
+
+
+def cached(timeout, key, stale=0, **options):
+    """
+    Decorator for functions whose result can be cached: `key(*args, **kwargs)` builds the cache key.
+
+        @cached(300, key=lambda vendor_id: f'vendor:summary:{vendor_id}', stale=60)
+        def vendor_summary(vendor_id): ...
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                key(*args, **kwargs), lambda: func(*args, **kwargs), timeout, stale=stale, **options
+            )
+        return wrapper
+    return decorator
+
+
+def view_cache_key(method, request):
+    path = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+    user = request.user.pk if request.user.is_authenticated else 'anon'
+    return f'view:{method.__module__}.{method.__qualname__}:{user}:{path}'
+
+
+def cache_view(timeout, stale=0, **options):
+    """
+    Single-flight replacement for `cache_page` on APIView GET handlers.
+
+    The response data of 200 responses is cached per user and full path, so
+    concurrent requests for an expired entry run the handler once; the
+    data is rendered for each request. Other headers set by the handler
+    are not kept. The X-Cache header tells how the response was obtained.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            def compute():
+                response = method(view, request, *args, **kwargs)
+                return response.status_code, response.data
+
+            (status_code, data), how = fetch(
+                view_cache_key(method, request), compute, timeout, stale=stale,
+                cache_if=lambda value: value[0] == 200, **options
+            )
+            response = Response(data, status=status_code)
+            response['X-Cache'] = how
+            patch_cache_control(response, private=True, max_age=timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+
+class VersionedSnapshot:
+    """
+    Process-local, immutable snapshot of data that rarely changes.
+
+    `builder()` is called to produce the snapshot. A version token in the
+    shared cache is compared at most every `check_interval` seconds; when
+    another process calls `invalidate()` the token changes and every worker
+    rebuilds on its next access. The old snapshot keeps being served while
+    one thread rebuilds, then the reference is swapped in one assignment.
+    `max_age` forces a periodic rebuild for changes that bypass signals.
+    """
+
+    def __init__(self, name, builder, check_interval=1.0, max_age=None):
+        self.version_key = f'snapshot:{name}:version'
+        self.builder = builder
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._data = None
+        self._version = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self._data is not None and now - self._checked_at < self.check_interval:
+            return self._data
+
+        version = cache.get(self.version_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(self.version_key, version, timeout=None)
+            version = cache.get(self.version_key, version)
+        self._checked_at = now
+
+        stale = self.max_age is not None and now - self._built_at >= self.max_age
+        if self._data is not None and version == self._version and not stale:
+            return self._data
+
+        # Only one thread rebuilds; the others keep serving the previous snapshot
+        if not self._lock.acquire(blocking=self._data is None):
+            return self._data
+        try:
+            if self._data is None or self._version != version or stale:
+                data = self.builder()
+                self._data, self._version, self._built_at = data, version, time.monotonic()
+        finally:
+            self._lock.release()
+        return self._data
+
+    def invalidate(self):
+        """Publish a new version so every process rebuilds within `check_interval`."""
+        cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+        self._checked_at = 0.0
@@ -0,0 +1,92 @@
+import functools
+
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _names(value):
+    return tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+
+
+def requested_fields(request):
+    """
+    Return (fields, expand) from `?fields=id,name&expand=category`.
+
+    `fields` is None when the client did not narrow the response.
+    """
+    params = request.query_params
+    fields = _names(params.get(FIELDS_PARAM, '')) or None
+    expand = _names(params.get(EXPAND_PARAM, ''))
+    return fields, expand
+
+
+def check_sparse_fields(declared, expandable, fields, expand):
+    """Raise a ValidationError (400) for names the serializer does not offer."""
+    errors = {}
+    if fields is not None:
+        unknown = sorted(set(fields) - set(declared) - set(expand))
+        if unknown:
+            errors[FIELDS_PARAM] = [f"Unknown field(s): {', '.join(unknown)}"]
+    unknown = sorted(set(expand) - set(expandable))
+    if unknown:
+        errors[EXPAND_PARAM] = [f"Field(s) cannot be expanded: {', '.join(unknown)}"]
+    if errors:
+        raise serializers.ValidationError(errors)
+
+
+def pick(items, fields, expand=()):
+    """Narrow already-built dicts (e.g. rows not produced by a serializer) to the requested keys."""
+    if fields is None:
+        return items
+    wanted = set(fields) | set(expand)
+    return [{key: value for key, value in item.items() if key in wanted} for item in items]
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin adding `fields=` and `expand=` keyword arguments.
+
+    Unrequested fields are dropped before anything is serialized; names in
+    `expand` are replaced by the nested serializer declared for them in
+    `Meta.expandable_fields`. Incoming data is always validated with the
+    full set of fields.
+    """
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        self.sparse_fields = fields
+        self.sparse_expand = tuple(expand)
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        declared = super().get_fields()
+        if (self.sparse_fields is None and not self.sparse_expand) or hasattr(self, 'initial_data'):
+            return declared
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        readable = {name: field for name, field in declared.items() if not field.write_only}
+        check_sparse_fields(readable, expandable, self.sparse_fields, self.sparse_expand)
+
+        kept = {}
+        for name, field in readable.items():
+            if name in self.sparse_expand:
+                kept[name] = self._expanded(name, expandable[name])
+            elif self.sparse_fields is None or name in self.sparse_fields:
+                kept[name] = field
+        for name in self.sparse_expand:
+            if name not in kept:
+                kept[name] = self._expanded(name, expandable[name])
+        return kept
+
+    def _expanded(self, name, serializer_class):
+        model_field = self.Meta.model._meta.get_field(name)
+        return serializer_class(many=model_field.one_to_many, read_only=True)
+
+
+@functools.lru_cache(maxsize=None)
+def sparse(serializer_class):
+    """`serializer_class` with SparseFieldsMixin applied, for serializers that don't include it."""
+    if issubclass(serializer_class, SparseFieldsMixin):
+        return serializer_class
+    return type(serializer_class.__name__, (SparseFieldsMixin, serializer_class), {})
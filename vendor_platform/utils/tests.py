@@ -1,3 +1,551 @@
-from django.test import TestCase
+import json
+import logging
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+
+from vendors.models import Vendor, VendorServiceCategory, VendorService, PricingTier
+from vendors.serializers import VendorProfileSerializer, VendorServiceSerializer
+from .fast_serializers import fast_serializer, serialize_many
+from .cache_backends import HashRing, TwoTierCache
+from .concurrency import AIMDLimiter, ConcurrencyLimitMiddleware, ConcurrencyLimits
+from .log import JsonFormatter, QueueHandler, RequestIdMiddleware, request_id
+from . import batch, concurrency, profiling, singleflight
+
+# Profile image URLs come from the default storage; the S3 one needs AWS credentials
+@override_settings(DEFAULT_FILE_STORAGE='django.core.files.storage.InMemoryStorage')
+class FastReadSerializerTestCase(TestCase):
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            email='vendor@example.com',
+            company_name='Test Vendor',
+            vendor_id='V00000001',
+            profile_image='vendors/logo.png',
+            city='Austin',
+            rating=4.5,
+        )
+        category = VendorServiceCategory.objects.create(name='Catering')
+        service = VendorService.objects.create(
+            vendor=self.vendor,
+            category=category,
+            name='Buffet',
+            description='Buffet for 50',
+            base_price=Decimal('1200.5'),
+        )
+        VendorService.objects.create(
+            vendor=self.vendor, category=category, name='Empty', description='', base_price=10
+        )
+        PricingTier.objects.create(service=service, tier_name='Large', price='2000', min_quantity=5)
+        PricingTier.objects.create(service=service, tier_name='Small', price='900.99', max_quantity=4)
+        
+    def assertSameJSON(self, serializer_class, queryset):
+        renderer = JSONRenderer()
+        expected = renderer.render(serializer_class(queryset, many=True).data)
+        actual = renderer.render(fast_serializer(serializer_class).serialize(queryset))
+        self.assertEqual(actual, expected)
+        
+    def test_profile_output_identical(self):
+        self.assertSameJSON(VendorProfileSerializer, Vendor.objects.all())
+        
+    def test_nested_pricing_tiers_identical(self):
+        self.assertSameJSON(VendorServiceSerializer, VendorService.objects.order_by('id'))
+        
+    def test_nested_tiers_use_one_query(self):
+        with self.assertNumQueries(2):
+            fast_serializer(VendorServiceSerializer).serialize(VendorService.objects.all())
+            
+    def test_unsupported_serializer_falls_back(self):
+        class NameSerializer(serializers.ModelSerializer):
+            upper_name = serializers.SerializerMethodField()
+            
+            class Meta:
+                model = VendorService
+                fields = ['id', 'upper_name']
+                
+            def get_upper_name(self, obj):
+                return obj.name.upper()
+                
+        self.assertIsNone(fast_serializer(NameSerializer))
+        data = serialize_many(NameSerializer, VendorService.objects.order_by('id'))
+        self.assertEqual([item['upper_name'] for item in data], ['BUFFET', 'EMPTY'])
+        
+class ListHandler(logging.Handler):
+    def __init__(self, gate=None):
+        super().__init__()
+        self.lines = []
+        self.gate = gate
+        self.setFormatter(JsonFormatter())
+        
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.lines.append(json.loads(self.format(record)))
+        
+class StructuredLoggingTestCase(SimpleTestCase):
+    def log_to(self, handler):
+        logger = logging.getLogger('utils.tests.logging')
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        self.addCleanup(setattr, logger, 'handlers', [])
+        return logger
+        
+    def test_records_are_written_as_json_by_listener(self):
+        target = ListHandler()
+        handler = QueueHandler([target])
+        logger = self.log_to(handler)
+        
+        token = request_id.set('req-1')
+        try:
+            logger.info('Booking %s confirmed', 12, extra={'vendor_id': 3})
+        finally:
+            request_id.reset(token)
+        handler.close()
+        
+        self.assertEqual(len(target.lines), 1)
+        line = target.lines[0]
+        self.assertEqual(line['message'], 'Booking 12 confirmed')
+        self.assertEqual(line['request_id'], 'req-1')
+        self.assertEqual(line['vendor_id'], 3)
+        self.assertEqual(line['level'], 'INFO')
+        
+    def test_full_queue_drops_instead_of_blocking(self):
+        gate = threading.Event()
+        target = ListHandler(gate)
+        handler = QueueHandler([target], maxsize=2)
+        logger = self.log_to(handler)
+        
+        started = time.monotonic()
+        for index in range(20):
+            logger.info('Record %s', index)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertGreater(handler.dropped, 0)
+        
+        gate.set()
+        while handler.queue.qsize():
+            time.sleep(0.01)
+        logger.info('After release')
+        handler.close()
+        
+        warnings = [line for line in target.lines if line['level'] == 'WARNING']
+        self.assertEqual(warnings[0]['dropped'], handler.dropped)
+        self.assertEqual(target.lines[-1]['message'], 'After release')
+        
+    def test_request_id_middleware(self):
+        seen = []
+        
+        def view(request):
+            seen.append(request_id.get())
+            return HttpResponse()
+            
+        middleware = RequestIdMiddleware(view)
+        response = middleware(RequestFactory().get('/', HTTP_X_REQUEST_ID='edge-42'))
+        self.assertEqual(response['X-Request-ID'], 'edge-42')
+        
+        response = middleware(RequestFactory().get('/', HTTP_X_REQUEST_ID='bad id\n'))
+        self.assertEqual(len(response['X-Request-ID']), 32)
+        self.assertEqual(seen, ['edge-42', response['X-Request-ID']])
+        self.assertIsNone(request_id.get())
+        
+    def test_error_responses_logged_by_django_keep_the_request_id(self):
+        target = ListHandler()
+        handler = QueueHandler([target])
+        logger = logging.getLogger('django.request')
+        self.addCleanup(setattr, logger, 'handlers', logger.handlers)
+        logger.handlers = [handler]
+        
+        response = self.client.get('/api/no-such-route/', HTTP_X_REQUEST_ID='edge-404')
+        handler.close()
+        
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual([(line['message'], line['request_id']) for line in target.lines], [
+            ('Not Found: /api/no-such-route/', 'edge-404'),
+        ])
+        
+class SingleFlightTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        
+    def compute(self, delay=0):
+        self.calls += 1
+        time.sleep(delay)
+        return self.calls
+        
+    def test_concurrent_misses_compute_once(self):
+        results = []
+        
+        def request():
+            results.append(singleflight.fetch('sf:cold', lambda: self.compute(0.1), 60))
+            
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+            
+        self.assertEqual(self.calls, 1)
+        self.assertEqual({value for value, how in results}, {1})
+        self.assertEqual([how for value, how in results].count(singleflight.MISS), 1)
+        self.assertEqual(singleflight.fetch('sf:cold', self.compute, 60), (1, singleflight.HIT))
+        
+    def test_expired_entry_is_served_stale_while_locked(self):
+        cache.set('sf:stale', (time.time() - 1, 'old'), 60)
+        # Another process is already recomputing
+        cache.add('sf:stale:lock', 'other', 10)
+        
+        self.assertEqual(singleflight.fetch('sf:stale', self.compute, 60, stale=30), ('old', singleflight.STALE))
+        self.assertEqual(self.calls, 0)
+        
+        cache.delete('sf:stale:lock')
+        self.assertEqual(singleflight.fetch('sf:stale', self.compute, 60, stale=30), (1, singleflight.MISS))
+        
+    def test_waits_for_other_process(self):
+        cache.add('sf:remote:lock', 'other', 10)
+        
+        def other_process():
+            time.sleep(0.05)
+            cache.set('sf:remote', (time.time() + 60, 'theirs'), 60)
+            
+        thread = threading.Thread(target=other_process)
+        thread.start()
+        result = singleflight.fetch('sf:remote', self.compute, 60)
+        thread.join()
+        
+        self.assertEqual(result, ('theirs', singleflight.SHARED))
+        self.assertEqual(self.calls, 0)
+        
+    def test_cached_decorator(self):
+        @singleflight.cached(60, key=lambda vendor_id: f'sf:vendor:{vendor_id}')
+        def summary(vendor_id):
+            self.calls += 1
+            return {'vendor': vendor_id}
+            
+        self.assertEqual(summary(3), {'vendor': 3})
+        self.assertEqual(summary(3), {'vendor': 3})
+        summary(4)
+        self.assertEqual(self.calls, 2)
+        
+class TwoTierCacheTestCase(SimpleTestCase):
+    NODES = ['two-tier-a', 'two-tier-b', 'two-tier-c']
+    
+    def make_cache(self, l1_name, **options):
+        # LocMemCache nodes stand in for the Redis shards
+        options = {
+            'NODE_BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'L1_NAME': l1_name,
+            'L1_CHECK_INTERVAL': 0,
+            'L1_EXCLUDE': r':lock$',
+            **options,
+        }
+        backend = TwoTierCache(self.NODES, {'OPTIONS': options})
+        self.addCleanup(backend.l1.clear)
+        return backend
+        
+    def setUp(self):
+        self.cache = self.make_cache('process-1')
+        self.cache.clear()
+        
+    def test_keys_are_sharded_across_nodes(self):
+        self.cache.set_many({f'key:{index}': index for index in range(100)})
+        
+        self.assertEqual(self.cache.get_many(['key:1', 'key:2', 'missing']), {'key:1': 1, 'key:2': 2})
+        counts = [sum(':key:' in key for key in node._cache) for node in self.cache.nodes.values()]
+        self.assertEqual(sum(counts), 100)
+        self.assertTrue(all(count > 10 for count in counts))
+        
+        self.cache.delete_many(['key:1', 'key:2'])
+        self.assertIsNone(self.cache.get('key:1'))
+        
+    def test_adding_a_node_moves_a_fraction_of_keys(self):
+        keys = [f'key:{index}' for index in range(10000)]
+        before = HashRing(self.NODES)
+        after = HashRing(self.NODES + ['two-tier-d'])
+        
+        moved = [key for key in keys if before.node_for(key) != after.node_for(key)]
+        self.assertTrue(0.15 < len(moved) / len(keys) < 0.35)
+        self.assertEqual({after.node_for(key) for key in moved}, {'two-tier-d'})
+        
+    def test_l1_serves_local_copy_until_timeout(self):
+        local = self.make_cache('process-2', L1_TIMEOUT=0.05)
+        other = self.make_cache('process-3')
+        local.set('profile', {'name': 'Old'})
+        value = local.get('profile')
+        value['name'] = 'Mutated'
+        
+        other.set('profile', {'name': 'New'})
+        self.assertEqual(local.get('profile'), {'name': 'Old'})
+        time.sleep(0.06)
+        self.assertEqual(local.get('profile'), {'name': 'New'})
+        
+    def test_version_bump_drops_every_l1(self):
+        local = self.make_cache('process-2')
+        other = self.make_cache('process-3')
+        local.set('profile', 'old')
+        other.node(local.make_key('profile')).set(local.make_key('profile'), 'new')
+        self.assertEqual(local.get('profile'), 'old')
+        
+        other.invalidate_l1()
+        self.assertEqual(local.get('profile'), 'new')
+        
+    def test_excluded_keys_bypass_l1(self):
+        local = self.make_cache('process-2')
+        other = self.make_cache('process-3')
+        self.assertTrue(local.add('search:lock', 'mine', 10))
+        self.assertEqual(local.get('search:lock'), 'mine')
+        
+        other.delete('search:lock')
+        self.assertIsNone(local.get('search:lock'))
+        
+class ConcurrencyLimitTestCase(SimpleTestCase):
+    def make_limits(self):
+        return ConcurrencyLimits({
+            'booking': {'priority': 0, 'routes': ['create-booking'], 'initial_limit': 10, 'target_ms': 100},
+            'default': {'priority': 1, 'initial_limit': 10, 'target_ms': 100},
+            'search': {'priority': 2, 'routes': ['vendor-search'], 'initial_limit': 10, 'target_ms': 100},
+        }, 'default')
+        
+    def test_aimd_adjusts_to_latency(self):
+        limiter = AIMDLimiter('search', 2, initial_limit=10, target_ms=100, backoff=0.5)
+        
+        for _ in range(10):
+            self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        for _ in range(10):
+            limiter.release(20)
+        self.assertEqual(limiter.snapshot()['limit'], 10)
+        self.assertGreater(limiter.limit, 10)
+        
+        limiter.acquire()
+        self.assertTrue(limiter.release(250))
+        # Further slow completions in the same window count as one signal
+        limiter.acquire()
+        limiter.release(250)
+        self.assertEqual(limiter.snapshot()['limit'], 5)
+        self.assertEqual(limiter.snapshot()['shed'], 1)
+        
+    def test_overload_backs_off_lower_priorities_only(self):
+        limits = self.make_limits()
+        limits.overloaded(limits.limiters['search'])
+        self.assertEqual(limits.limiters['booking'].limit, 10)
+        
+        limits.overloaded(limits.limiters['booking'])
+        self.assertEqual(limits.limiters['booking'].limit, 10)
+        self.assertEqual(limits.limiters['default'].limit, 8)
+        self.assertEqual(limits.limiters['search'].limit, 8)
+        
+    def test_middleware_sheds_with_retry_after(self):
+        limits = self.make_limits()
+        search = limits.limiters['search']
+        for _ in range(10):
+            search.acquire()
+            
+        with mock.patch.object(concurrency, 'limits', limits):
+            middleware = ConcurrencyLimitMiddleware(lambda request: HttpResponse())
+            shed = middleware(RequestFactory().get('/api/search/vendors/'))
+            served = middleware(RequestFactory().post('/api/bookings/'))
+            
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed['Retry-After'], '1')
+        self.assertEqual(served.status_code, 200)
+        self.assertEqual(limits.snapshot()['classes']['search']['shed'], 1)
+        self.assertEqual(limits.snapshot()['classes']['booking']['in_flight'], 0)
+        
+    @override_settings(CORS_ALLOWED_ORIGINS=['https://example.com'])
+    def test_shed_responses_and_preflights_carry_cors_headers(self):
+        limits = self.make_limits()
+        search = limits.limiters['search']
+        for _ in range(10):
+            search.acquire()
+            
+        with mock.patch.object(concurrency, 'limits', limits):
+            shed = self.client.get('/api/search/vendors/', HTTP_ORIGIN='https://example.com')
+            preflight = self.client.options(
+                '/api/search/vendors/', HTTP_ORIGIN='https://example.com',
+                HTTP_ACCESS_CONTROL_REQUEST_METHOD='GET',
+            )
+            
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed['Access-Control-Allow-Origin'], 'https://example.com')
+        self.assertEqual(preflight.status_code, 200)
+        self.assertEqual(preflight['Access-Control-Allow-Origin'], 'https://example.com')
+        self.assertEqual(limits.snapshot()['classes']['search']['shed'], 1)
+        
+class BatchMixin:
+    def setUp(self):
+        cache.clear()
+        self.vendor = Vendor.objects.create(email='v@example.com', vendor_id='V1', company_name='V', status='approved')
+        self.category = VendorServiceCategory.objects.create(name='Catering')
+        self.service = VendorService.objects.create(
+            vendor=self.vendor, category=self.category, name='Buffet', description='', base_price=100
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.vendor)
+        
+    def batch(self, *requests):
+        return self.client.post('/api/batch/', {'requests': list(requests)}, format='json')
+        
+    def dashboard(self):
+        paths = ['/api/vendor/profile/?fields=company_name', '/api/vendor/services/', '/api/vendor/bookings/']
+        response = self.batch(*[{'path': path} for path in paths])
+        self.assertEqual(response.status_code, 200)
+        for path, item in zip(paths, response.data['responses']):
+            cache.clear()
+            self.assertEqual(item['status'], 200)
+            self.assertEqual(item['body'], self.client.get(path).data)
+        return response.data['responses']
+        
+class BatchTestCase(BatchMixin, APITestCase):
+    def test_dashboard_in_one_request(self):
+        responses = self.dashboard()
+        self.assertEqual(responses[0]['body'], {'company_name': 'V'})
+        self.assertEqual(responses[1]['headers']['X-Cache'], 'miss')
+        
+    def test_writes_apply_in_order(self):
+        responses = self.batch(
+            {'method': 'POST', 'path': '/api/vendor/services/', 'body': {
+                'category': self.category.id, 'name': 'Lunch', 'description': 'Set menu', 'base_price': '20.00',
+            }},
+            {'path': '/api/vendor/services/?fields=name'},
+            {'method': 'DELETE', 'path': f'/api/vendor/services/{self.service.id}/'},
+        ).data['responses']
+        
+        self.assertEqual([item['status'] for item in responses], [201, 200, 204])
+        self.assertEqual(responses[1]['body'], [{'name': 'Buffet'}, {'name': 'Lunch'}])
+        self.assertFalse(VendorService.objects.get(pk=self.service.pk).is_active)
+        
+    def test_sub_requests_keep_their_own_permissions(self):
+        responses = self.batch({'path': '/api/metrics/concurrency/'}, {'path': '/api/nowhere/'}).data['responses']
+        self.assertEqual([item['status'] for item in responses], [403, 404])
+        
+        self.client.force_authenticate(None)
+        self.assertIn(self.batch({'path': '/api/vendor/profile/'}).status_code, (401, 403))
+        
+    def test_invalid_batches(self):
+        self.assertEqual(self.batch().status_code, 400)
+        self.assertEqual(self.batch({'path': '/admin/'}).status_code, 400)
+        self.assertEqual(self.batch({'path': '/api/batch/'}).status_code, 400)
+        self.assertEqual(self.batch({'path': '/api/vendor/profile/', 'method': 'TRACE'}).status_code, 400)
+        with self.settings(BATCH_MAX_REQUESTS=2):
+            self.assertEqual(self.batch(*[{'path': '/api/vendor/profile/'}] * 3).status_code, 400)
+            
+    def test_sub_requests_count_against_their_route_class(self):
+        limits = ConcurrencyLimits({
+            'default': {'priority': 0, 'initial_limit': 10},
+            'listing': {'priority': 1, 'routes': ['vendor-services'], 'initial_limit': 2, 'retry_after': 3},
+        }, 'default')
+        listing = limits.limiters['listing']
+        listing.acquire()
+        
+        with mock.patch.object(concurrency, 'limits', limits):
+            responses = self.batch(
+                {'path': '/api/vendor/services/'}, {'path': '/api/vendor/services/'}, {'path': '/api/vendor/profile/'},
+            ).data['responses']
+            listing.acquire()
+            shed = self.batch({'path': '/api/vendor/services/'}).data['responses']
+            
+        self.assertEqual([item['status'] for item in responses], [200, 200, 200])
+        self.assertEqual(shed[0]['status'], 503)
+        self.assertEqual(shed[0]['headers']['Retry-After'], '3')
+        snapshot = limits.snapshot()['classes']
+        self.assertEqual(snapshot['listing']['admitted'], 4)
+        self.assertEqual(snapshot['listing']['shed'], 1)
+        # The two batch requests and the profile sub-request
+        self.assertEqual(snapshot['default']['admitted'], 3)
+        
+@override_settings(BATCH_PARALLEL_WORKERS=4)
+class ParallelBatchTestCase(BatchMixin, TransactionTestCase):
+    def test_gets_run_on_pool_threads(self):
+        with mock.patch('utils.batch.run_one', wraps=batch.run_one) as run_one:
+            self.dashboard()
+        self.assertEqual(run_one.call_count, 3)
+        
+class ProfilingTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = self.settings(PROFILING_DIR=directory.name, PROFILING_INTERVAL_MS=1, PROFILING_TARGETS_REFRESH=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        
+        self.vendor = Vendor.objects.create(email='v@example.com', vendor_id='V1', company_name='V', status='approved')
+        self.admin = Vendor.objects.create(email='a@example.com', vendor_id='V2', company_name='A', is_staff=True)
+        self.client.force_authenticate(self.vendor)
+        
+    def test_sampler_folds_stacks(self):
+        started = threading.Event()
+        
+        def busy():
+            started.wait()
+            # Spin until enough samples landed, however the threads get scheduled
+            deadline = time.monotonic() + 5
+            while max(sampler.stacks.values(), default=0) < 6 and time.monotonic() < deadline:
+                pass
+                
+        thread = threading.Thread(target=busy)
+        thread.start()
+        sampler = profiling.StackSampler(thread.ident, 0.001).start()
+        started.set()
+        thread.join()
+        sampler.stop()
+        
+        stack, count = sampler.folded().splitlines()[0].rsplit(' ', 1)
+        self.assertIn(';busy_(utils/tests.py:', stack)
+        self.assertGreater(int(count), 5)
+        
+    def test_only_selected_requests_are_profiled(self):
+        self.assertNotIn('X-Profile-Id', self.client.get('/api/vendor/profile/'))
+        self.assertNotIn('X-Profile-Id', self.client.get('/api/vendor/profile/', HTTP_X_PROFILE_TOKEN='forged'))
+        token = profiling.make_token('/api/vendor/bookings/')
+        self.assertNotIn('X-Profile-Id', self.client.get('/api/vendor/profile/', HTTP_X_PROFILE_TOKEN=token))
+        self.assertEqual(profiling.stored_profiles(), [])
+        
+        response = self.client.get('/api/vendor/bookings/', HTTP_X_PROFILE_TOKEN=token)
+        profile_id = response['X-Profile-Id']
+        
+        self.client.force_authenticate(self.admin)
+        profile = self.client.get(f'/api/profiles/{profile_id}/').data
+        self.assertEqual((profile['path'], profile['status'], profile['reason']), ('/api/vendor/bookings/', 200, 'token'))
+        self.assertEqual(profile['vendor_id'], self.vendor.pk)
+        self.assertEqual(profile['query_count'], len(profile['queries']))
+        self.assertTrue(any('FROM "bookings"' in query['sql'] for query in profile['queries']))
+        
+        folded = self.client.get(f'/api/profiles/{profile_id}/flamegraph/')
+        self.assertEqual(folded['Content-Type'], 'text/plain; charset=utf-8')
+        for line in folded.content.decode().splitlines():
+            self.assertRegex(line, r'^\S+ \d+$')
+            
+    def test_armed_target_for_one_vendor(self):
+        other = Vendor.objects.create(email='o@example.com', vendor_id='V3', company_name='O', status='approved')
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            '/api/profiles/', {'path': '/api/vendor/', 'vendor_id': self.vendor.pk, 'limit': 2}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        
+        self.client.force_authenticate(other)
+        self.assertNotIn('X-Profile-Id', self.client.get('/api/vendor/profile/'))
+        self.client.force_authenticate(self.vendor)
+        profiled = ['X-Profile-Id' in self.client.get('/api/vendor/profile/') for _ in range(3)]
+        self.assertEqual(profiled, [True, True, False])
+        
+        self.client.force_authenticate(self.admin)
+        summaries = self.client.get('/api/profiles/').data['profiles']
+        self.assertEqual([summary['vendor_id'] for summary in summaries], [self.vendor.pk] * 2)
+        self.assertNotIn('queries', summaries[0])
+        
+    def test_admin_only(self):
+        self.assertEqual(self.client.get('/api/profiles/').status_code, 403)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get('/api/profiles/../../etc/').status_code, 404)
+        self.assertEqual(self.client.post('/api/profiles/', {'rate': 2}, format='json').status_code, 400)
@@ -0,0 +1,8 @@
+import unicodedata
+
+
+def fold_text(value):
+    """Case- and accent-insensitive form of `value` for prefix matching ("Café" -> "cafe")."""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
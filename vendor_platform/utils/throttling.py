@@ -7,4 +7,7 @@ class BookingThrottle(UserRateThrottle):
     scope = 'booking_creation'
     
 class SearchThrottle(AnonRateThrottle):
-    scope = 'search'
\ No newline at end of file
+    scope = 'search'
+    
+class AutocompleteThrottle(AnonRateThrottle):
+    scope = 'autocomplete'
\ No newline at end of file
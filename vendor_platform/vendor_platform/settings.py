@@ -1,10 +1,8 @@
 # settings.py
 
 import os
-import pymysql
 from datetime import timedelta
 from pathlib import Path
-pymysql.install_as_MySQLdb()
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,10 +33,16 @@ INSTALLED_APPS = [
     'bookings',
     'search',
     'authentication',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'utils.log.RequestIdMiddleware',
+    # Ahead of the limiter so preflights are answered before it and shed 503s get CORS headers
     'corsheaders.middleware.CorsMiddleware',
+    'utils.concurrency.ConcurrencyLimitMiddleware',
+    'utils.profiling.ProfilingMiddleware',
+    'utils.query_fingerprints.QueryFingerprintMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,13 +85,34 @@ DATABASES = {
     }
 }
 
-# Redis cache
+# Local SQLite database (benchmarks, development without MySQL)
+if os.environ.get('DB_ENGINE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+    }
+
+# PyMySQL stands in for mysqlclient; only load it when MySQL is actually used
+if DATABASES['default']['ENGINE'] == 'django.db.backends.mysql':
+    import pymysql
+    pymysql.install_as_MySQLdb()
+
+# Redis cache: an in-process LRU (L1) in front of one or more Redis nodes (L2).
+# REDIS_URLS (comma-separated) shards keys across nodes with consistent hashing.
+REDIS_URLS = os.environ.get('REDIS_URLS') or os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1')
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        "BACKEND": "utils.cache_backends.TwoTierCache",
+        "LOCATION": REDIS_URLS.split(','),
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "NODE_BACKEND": "django_redis.cache.RedisCache",
+            "NODE_OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+            "L1_MAX_ENTRIES": int(os.environ.get('CACHE_L1_MAX_ENTRIES', 5000)),
+            "L1_TIMEOUT": int(os.environ.get('CACHE_L1_TIMEOUT', 5)),
+            # Version keys, locks and counters must be seen by every process at once
+            "L1_EXCLUDE": r':lock$|:version(:|$)|^search:(generation|stats:)|^throttle_|^profiling:|^capacity:',
         }
     }
 }
@@ -110,6 +135,7 @@ REST_FRAMEWORK = {
         'vendor_registration': '5/day',
         'booking_creation': '10/hour',
         'search': '30/minute',
+        'autocomplete': '600/minute',
     },
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -129,6 +155,10 @@ AWS_S3_FILE_OVERWRITE = False
 AWS_DEFAULT_ACL = 'private'
 AWS_S3_SIGNATURE_VERSION = 's3v4'
 
+# Static files (the admin's CSS and JS)
+STATIC_URL = os.environ.get('STATIC_URL', 'static/')
+STATIC_ROOT = os.environ.get('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "https://example.com",
@@ -148,30 +178,52 @@ os.makedirs(log_dir, exist_ok=True)  # ✅ ensures logs folder exists
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'sample_info': {
+            '()': 'utils.log.SamplingFilter',
+            'rate': float(os.environ.get('LOG_INFO_SAMPLE_RATE', 1.0)),
+            'level': 'INFO',
+        },
+    },
+    'formatters': {
+        'json': {
+            '()': 'utils.log.JsonFormatter',
+        },
+    },
     'handlers': {
         'file': {
             'level': 'INFO',
             'class': 'logging.FileHandler',
             'filename': os.path.join(log_dir, 'django.log'),
+            'formatter': 'json',
         },
         'console': {
             'level': 'DEBUG',
             'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+        # Request threads only enqueue; a background listener formats and writes.
+        # Must sort after the handlers it references.
+        'queue': {
+            '()': 'utils.log.QueueHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'maxsize': int(os.environ.get('LOG_QUEUE_SIZE', 10000)),
+            'filters': ['sample_info'],
         },
     },
     'loggers': {
         'django': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': True,
         },
         'vendors': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'bookings': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -182,3 +234,106 @@ LOGGING = {
 # Custom user model
 AUTH_USER_MODEL = 'vendors.Vendor'
 
+# Maximum bookings per bulk status transition request
+BOOKING_BULK_TRANSITION_LIMIT = 500
+
+# Admin changelists show the table statistics' row estimate instead of an exact
+# COUNT(*) once an unfiltered table is at least this big
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000))
+
+# Finished bookings older than this are moved to the archive tables
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.environ.get('BOOKING_ARCHIVE_AFTER_DAYS', 365))
+
+# How long a booking Idempotency-Key and its stored response are kept
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+# Days ahead that availability rules are expanded for open-ended slot listings,
+# and how far ahead a rule occurrence can be booked
+AVAILABILITY_RULE_HORIZON_DAYS = int(os.environ.get('AVAILABILITY_RULE_HORIZON_DAYS', 90))
+
+# Longest from/to window a slot listing may request (rules are expanded day by day)
+AVAILABILITY_MAX_WINDOW_DAYS = int(os.environ.get('AVAILABILITY_MAX_WINDOW_DAYS', 366))
+
+# Seconds a vendor-month availability calendar stays cached (changes invalidate it sooner)
+CALENDAR_CACHE_TIMEOUT = int(os.environ.get('CALENDAR_CACHE_TIMEOUT', 3600))
+
+# Minutes a checkout hold reserves slot capacity before the sweeper releases it
+SLOT_HOLD_MINUTES = int(os.environ.get('SLOT_HOLD_MINUTES', 10))
+
+# Seconds the capacity reconciliation watermark is moved back, so bookings committed
+# late by long transactions are still recounted on the next run
+CAPACITY_RECONCILE_OVERLAP = int(os.environ.get('CAPACITY_RECONCILE_OVERLAP', 300))
+
+# Adaptive concurrency limits per route class and worker process (AIMD on latency).
+# Lower priority numbers win: when a class runs over its latency target, every
+# class with a higher number backs off as well.
+CONCURRENCY_LIMITS_ENABLED = os.environ.get('CONCURRENCY_LIMITS_ENABLED', 'True') == 'True'
+CONCURRENCY_DEFAULT_CLASS = 'default'
+CONCURRENCY_ROUTE_CLASSES = {
+    'booking': {
+        'priority': 0,
+        'routes': ['create-booking', 'create-slot-hold', 'confirm-slot-hold', 'slot-hold-detail'],
+        'initial_limit': 40, 'min_limit': 8, 'max_limit': 200, 'target_ms': 800, 'retry_after': 1,
+    },
+    'default': {
+        'priority': 1,
+        'initial_limit': 40, 'min_limit': 4, 'max_limit': 200, 'target_ms': 1000, 'retry_after': 2,
+    },
+    'listing': {
+        'priority': 2,
+        'routes': [
+            'vendor-services', 'vendor-bookings', 'vendor-availability', 'vendor-availability-calendar',
+        ],
+        'initial_limit': 20, 'min_limit': 2, 'max_limit': 100, 'target_ms': 500, 'retry_after': 2,
+    },
+    'search': {
+        'priority': 3,
+        'routes': ['vendor-search', 'search-autocomplete'],
+        'initial_limit': 20, 'min_limit': 2, 'max_limit': 100, 'target_ms': 300, 'retry_after': 3,
+    },
+}
+
+# Batch endpoint: sub-requests per batch, and threads running consecutive GETs in parallel.
+# 1 runs them sequentially on the request's own connection; parallel GETs each use a pool
+# thread's connection, which only pays off with slow queries and a CONN_MAX_AGE above 0.
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+BATCH_PARALLEL_WORKERS = int(os.environ.get('BATCH_PARALLEL_WORKERS', 1))
+
+# Query fingerprint sampling (share of requests, 0 disables the middleware)
+QUERY_FINGERPRINT_SAMPLE_RATE = float(os.environ.get('QUERY_FINGERPRINT_SAMPLE_RATE', 0))
+QUERY_FINGERPRINT_DIR = os.environ.get('QUERY_FINGERPRINT_DIR', os.path.join(BASE_DIR, 'query_fingerprints'))
+QUERY_FINGERPRINT_FLUSH_INTERVAL = 60  # seconds
+
+# On-demand request profiling (stack samples + queries), stored as folded flame graph files.
+# Requests are picked by a signed X-Profile-Token header, targets armed through
+# /api/profiles/, or the random PROFILING_SAMPLE_RATE share (0 = none).
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True') == 'True'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))
+PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_KEEP = 200  # newest profiles kept per host
+PROFILING_MAX_QUERIES = 500  # queries listed per profile; all are counted
+PROFILING_TOKEN_MAX_AGE = 60 * 60  # seconds
+PROFILING_TARGETS_REFRESH = 5  # seconds between reads of the armed targets
+
+# Vendor search cache: result pages and per-vendor profiles (seconds)
+SEARCH_CACHE_TIMEOUT = int(os.environ.get('SEARCH_CACHE_TIMEOUT', 300))
+SEARCH_VENDOR_CACHE_TIMEOUT = int(os.environ.get('SEARCH_VENDOR_CACHE_TIMEOUT', 3600))
+
+# Seconds an expired search page is still served while one request recomputes it
+SEARCH_CACHE_STALE = int(os.environ.get('SEARCH_CACHE_STALE', 60))
+
+# Rebuild the typeahead index at least this often (seconds), for changes made outside the ORM
+TYPEAHEAD_MAX_AGE = int(os.environ.get('TYPEAHEAD_MAX_AGE', 600))
+
+# Benchmarks
+BENCHMARK_RESULTS_DIR = os.environ.get('BENCHMARK_RESULTS_DIR', os.path.join(BASE_DIR, 'benchmark_results'))
+
+# Allowed relative increase per metric before a run is reported as a regression
+BENCHMARK_REGRESSION_THRESHOLDS = {
+    'p50_ms': 0.25,
+    'p95_ms': 0.25,
+    'queries': 0.0,
+    'peak_memory_kb': 0.25,
+}
+
@@ -1,3 +1,91 @@
 from django.contrib import admin
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 
-# Register your models here.
+from search import cache as search_cache
+from search.typeahead import snapshot as typeahead_snapshot
+from utils.admin import LargeTableAdmin, log_bulk_change
+from .models import Vendor, VendorServiceCategory, VendorService, PricingTier, AvailabilityRule, AvailabilitySlot
+
+
+@admin.register(Vendor)
+class VendorAdmin(LargeTableAdmin):
+    list_display = ('vendor_id', 'company_name', 'email', 'city', 'state', 'status', 'rating', 'created_at')
+    list_filter = ('status',)
+    # Exact matches on unique columns; a contains-search would scan the table
+    search_fields = ('=vendor_id', '=email')
+    readonly_fields = ('vendor_id', 'last_login', 'date_joined')
+    exclude = ('password',)
+    filter_horizontal = ('groups', 'user_permissions')
+    actions = ['approve_vendors', 'suspend_vendors']
+
+    @admin.action(description='Approve selected vendors')
+    def approve_vendors(self, request, queryset):
+        self.set_status(request, queryset, 'approved')
+
+    @admin.action(description='Suspend selected vendors')
+    def suspend_vendors(self, request, queryset):
+        self.set_status(request, queryset, 'suspended')
+
+    def set_status(self, request, queryset, new_status):
+        """One UPDATE for every selected vendor not already in `new_status`."""
+        with transaction.atomic():
+            vendors = list(
+                queryset.exclude(status=new_status).select_for_update().only('id', 'company_name')
+            )
+            if vendors:
+                Vendor.objects.filter(pk__in=[vendor.pk for vendor in vendors]).update(
+                    status=new_status, updated_at=timezone.now()
+                )
+                log_bulk_change(request, vendors, ['Status'])
+
+        if vendors:
+            # update() sends no post_save, so search.signals.vendor_saved does not run
+            cache.delete_many([search_cache.vendor_key(vendor.pk) for vendor in vendors])
+            search_cache.invalidate_pages()
+            typeahead_snapshot.invalidate()
+        self.message_user(request, f'{len(vendors)} vendor(s) set to {new_status}.')
+
+
+@admin.register(VendorServiceCategory)
+class VendorServiceCategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('=name',)
+
+
+@admin.register(VendorService)
+class VendorServiceAdmin(LargeTableAdmin):
+    list_display = ('name', 'vendor', 'category', 'base_price', 'is_active')
+    list_select_related = ('vendor', 'category')
+    list_filter = ('is_active',)
+    search_fields = ('=vendor__vendor_id',)
+    raw_id_fields = ('vendor',)
+
+
+@admin.register(PricingTier)
+class PricingTierAdmin(admin.ModelAdmin):
+    list_display = ('tier_name', 'service', 'price', 'min_quantity', 'max_quantity', 'is_active')
+    list_select_related = ('service__vendor',)
+    raw_id_fields = ('service',)
+
+
+@admin.register(AvailabilityRule)
+class AvailabilityRuleAdmin(LargeTableAdmin):
+    list_display = ('id', 'vendor', 'service', 'weekdays', 'start_time', 'end_time', 'valid_from', 'is_active')
+    list_select_related = ('vendor', 'service__vendor')
+    list_filter = ('is_active',)
+    raw_id_fields = ('vendor', 'service')
+
+
+@admin.register(AvailabilitySlot)
+class AvailabilitySlotAdmin(LargeTableAdmin):
+    list_display = (
+        'id', 'vendor', 'service', 'date', 'start_time', 'end_time',
+        'booked_capacity', 'held_capacity', 'max_capacity', 'is_available',
+    )
+    list_select_related = ('vendor', 'service__vendor')
+    list_filter = ('is_available',)
+    search_fields = ('=vendor__vendor_id',)
+    raw_id_fields = ('vendor', 'service', 'rule')
@@ -5,4 +5,4 @@ class VendorsConfig(AppConfig):
     name = 'vendors'
     
     def ready(self):
-        import vendors
\ No newline at end of file
+        import vendors.signals  # noqa: F401
\ No newline at end of file
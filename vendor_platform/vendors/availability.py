@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import AvailabilityRule, AvailabilitySlot
+
+
+def parse_date(value):
+    """ISO date string (or date) to a date; None if missing or malformed."""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def expansion_window(date_from=None, date_to=None):
+    """
+    Window over which rules are expanded for a listing.
+
+    Open-ended listings are clipped to AVAILABILITY_RULE_HORIZON_DAYS from
+    the start (today by default), so rule expansion never depends on history.
+    Raises ValueError for windows longer than AVAILABILITY_MAX_WINDOW_DAYS,
+    since rules are expanded day by day.
+    """
+    start = parse_date(date_from) or date.today()
+    end = parse_date(date_to) or start + timedelta(days=settings.AVAILABILITY_RULE_HORIZON_DAYS)
+    if (end - start).days > settings.AVAILABILITY_MAX_WINDOW_DAYS:
+        raise ValueError(f'from and to may be at most {settings.AVAILABILITY_MAX_WINDOW_DAYS} days apart')
+    return start, end
+
+
+def occurrences(rule, date_from, date_to):
+    """Dates in [date_from, date_to] on which `rule` opens."""
+    day = max(date_from, rule.valid_from)
+    end = min(date_to, rule.valid_until) if rule.valid_until else date_to
+    while day <= end:
+        if rule.occurs_on(day):
+            yield day
+        day += timedelta(days=1)
+
+
+def virtual_slot(rule, day):
+    """A rule occurrence rendered like AvailabilitySlotSerializer output, with no id yet."""
+    return {
+        'id': None,
+        'service': rule.service_id,
+        'date': day.isoformat(),
+        'start_time': rule.start_time.isoformat(),
+        'end_time': rule.end_time.isoformat(),
+        'is_available': True,
+        'max_capacity': rule.max_capacity,
+        'booked_capacity': 0,
+        'held_capacity': 0,
+        'rule': rule.id,
+    }
+
+
+def expand_rules(vendor, date_from, date_to, service_id=None, materialized=()):
+    """
+    Virtual slots for the vendor's rules in the window.
+
+    `materialized` holds (service_id, ISO date, ISO start time) of stored
+    slots, as found in serialized slot rows; those occurrences are skipped since the stored row (with its bookings
+    or per-day overrides) takes precedence.
+    """
+    rules = AvailabilityRule.objects.filter(
+        Q(valid_until__isnull=True) | Q(valid_until__gte=date_from),
+        vendor=vendor,
+        is_active=True,
+        valid_from__lte=date_to,
+    )
+    if service_id:
+        rules = rules.filter(service_id=service_id)
+
+    taken = set(materialized)
+    slots = []
+    for rule in rules:
+        for day in occurrences(rule, date_from, date_to):
+            if (rule.service_id, day.isoformat(), rule.start_time.isoformat()) not in taken:
+                slots.append(virtual_slot(rule, day))
+    return slots
+
+
+# Stands in for slot_id while a rule_id + date request is validated; the real id
+# exists once the occurrence is stored inside the booking's transaction
+PENDING_SLOT_ID = 0
+
+
+def bookable_rule(rule_id, service_id, day):
+    """
+    The rule of a `rule_id` + `date` booking, or None when that occurrence cannot be booked.
+
+    The rule must belong to `service_id` and open on `day`, which has to lie
+    between today and AVAILABILITY_RULE_HORIZON_DAYS ahead. Nothing is written.
+    """
+    today = date.today()
+    if not today <= day <= today + timedelta(days=settings.AVAILABILITY_RULE_HORIZON_DAYS):
+        return None
+    rule = AvailabilityRule.objects.filter(id=rule_id, service_id=service_id).first()
+    if rule is None or not rule.occurs_on(day):
+        return None
+    return rule
+
+
+def materialize_slot(rule, day):
+    """Return the stored slot for a rule occurrence, creating it on first use."""
+    # Concurrent first bookings race on the unique (vendor, service, date, start_time)
+    slot, created = AvailabilitySlot.objects.get_or_create(
+        vendor_id=rule.vendor_id,
+        service_id=rule.service_id,
+        date=day,
+        start_time=rule.start_time,
+        defaults={'end_time': rule.end_time, 'max_capacity': rule.max_capacity, 'rule': rule},
+    )
+    return slot
+
+
+def resolve_slot(data):
+    """
+    Accept `rule_id` + `date` in a booking request in place of `slot_id`.
+
+    Returns (data, occurrence). Data naming a slot comes back unchanged with
+    occurrence None. For a bookable rule occurrence, `slot_id` is set to
+    PENDING_SLOT_ID and occurrence is the (rule, day) to hand to
+    materialize_slot() inside the booking transaction, once the request is
+    valid. Returns None when the occurrence is not bookable.
+    """
+    if data.get('slot_id') or not data.get('rule_id'):
+        return data, None
+
+    day = parse_date(data.get('date'))
+    try:
+        rule_id = int(data.get('rule_id'))
+        service_id = int(data.get('service_id'))
+    except (TypeError, ValueError):
+        return None
+    rule = bookable_rule(rule_id, service_id, day) if day else None
+    if rule is None:
+        return None
+
+    data = data.copy()
+    data['slot_id'] = PENDING_SLOT_ID
+    return data, (rule, day)
@@ -0,0 +1,142 @@
+import calendar
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+
+from .availability import expand_rules
+from .models import AvailabilitySlot
+
+# Per-day status codes, one character per day in the response
+CLOSED, FREE, PARTIAL, FULL = '0', '1', '2', '3'
+
+
+def month_bounds(month):
+    """'YYYY-MM' -> (first day, last day); raises ValueError when malformed."""
+    year, month_number = (int(part) for part in month.split('-'))
+    first = date(year, month_number, 1)
+    return first, first.replace(day=calendar.monthrange(year, month_number)[1])
+
+
+def _day_status(capacity, free):
+    if not capacity:
+        return CLOSED
+    if not free:
+        return FULL
+    return FREE if free == capacity else PARTIAL
+
+
+def build_calendar(vendor, first, last, service_id=None, by_service=False):
+    """
+    Per-day capacity summary for the vendor between `first` and `last`.
+
+    Stored slots are aggregated with one grouped query; occurrences of
+    availability rules that have no stored slot yet add their full capacity.
+    """
+    slots = AvailabilitySlot.objects.filter(vendor=vendor, date__gte=first, date__lte=last, is_available=True)
+    if service_id:
+        slots = slots.filter(service_id=service_id)
+
+    used = F('booked_capacity') + F('held_capacity')
+    rows = slots.values('date', 'service_id').annotate(
+        capacity=Sum('max_capacity'),
+        free=Sum(Case(
+            When(max_capacity__gt=used, then=F('max_capacity') - used),
+            default=0,
+            output_field=IntegerField(),
+        )),
+    ).order_by()
+
+    days = (last - first).days + 1
+    totals = {}
+    for row in rows:
+        totals[(row['service_id'], row['date'])] = [row['capacity'], row['free']]
+
+    virtual = expand_rules(vendor, first, last, service_id)
+    if virtual:
+        # Stored slots (open or closed) replace the rule occurrence they materialize or override
+        stored = _stored_keys(vendor, first, last)
+        virtual = [
+            slot for slot in virtual if (slot['service'], slot['date'], slot['start_time']) not in stored
+        ]
+    for slot in virtual:
+        key = (slot['service'], date.fromisoformat(slot['date']))
+        entry = totals.setdefault(key, [0, 0])
+        entry[0] += slot['max_capacity']
+        entry[1] += slot['max_capacity']
+
+    def summarize(entries):
+        capacity = [0] * days
+        free = [0] * days
+        for (service, day), (slot_capacity, slot_free) in entries:
+            index = (day - first).days
+            capacity[index] += slot_capacity
+            free[index] += slot_free
+        return {
+            'status': ''.join(_day_status(c, f) for c, f in zip(capacity, free)),
+            'free': free,
+            'capacity': capacity,
+        }
+
+    result = {'month': first.strftime('%Y-%m'), 'days': days, **summarize(totals.items())}
+    if by_service:
+        per_service = {}
+        for (service, day), entry in totals.items():
+            per_service.setdefault(service, []).append(((service, day), entry))
+        result['services'] = {str(service): summarize(entries) for service, entries in sorted(per_service.items())}
+    return result
+
+
+def _stored_keys(vendor, first, last):
+    return {
+        (service_id, day.isoformat(), start_time.isoformat())
+        for service_id, day, start_time in AvailabilitySlot.objects.filter(
+            vendor=vendor, date__gte=first, date__lte=last
+        ).values_list('service_id', 'date', 'start_time')
+    }
+
+
+def _version_keys(vendor_id, month):
+    return f'calendar:version:{vendor_id}', f'calendar:version:{vendor_id}:{month}'
+
+
+def cached_calendar(vendor, month, service_id=None, by_service=False):
+    """build_calendar for a 'YYYY-MM' month, cached per vendor-month until invalidated."""
+    first, last = month_bounds(month)
+    vendor_key, month_key = _version_keys(vendor.pk, first.strftime('%Y-%m'))
+    versions = cache.get_many([vendor_key, month_key])
+    for key in (vendor_key, month_key):
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+
+    key = f"calendar:{vendor.pk}:{first:%Y-%m}:{service_id or ''}:{int(by_service)}:{versions[vendor_key]}:{versions[month_key]}"
+    result = cache.get(key)
+    if result is None:
+        result = build_calendar(vendor, first, last, service_id, by_service)
+        cache.set(key, result, settings.CALENDAR_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_calendar(vendor_id, day=None):
+    """
+    Drop cached calendars of the vendor's month containing `day`, or all its months.
+
+    The version is bumped once the current transaction commits, so a
+    concurrent rebuild cannot cache uncommitted state under the new version.
+    """
+    # `day` may be a date or an ISO string (unsaved model input)
+    vendor_key, month_key = _version_keys(vendor_id, str(day)[:7] if day else '')
+    key = month_key if day else vendor_key
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, timeout=None))
+
+
+def invalidate_slots(slot_ids):
+    """Invalidate the calendars touched by slots changed through queryset.update()."""
+    for vendor_id, day in set(
+        AvailabilitySlot.objects.filter(id__in=slot_ids).values_list('vendor_id', 'date')
+    ):
+        invalidate_calendar(vendor_id, day)
@@ -0,0 +1,34 @@
+from utils.snapshots import VersionedSnapshot
+from utils.text import fold_text
+from .models import VendorServiceCategory
+
+
+class CategoryCatalog:
+    """Immutable view of VendorServiceCategory: id -> row and folded name -> id."""
+
+    def __init__(self, rows):
+        self.by_id = {row['id']: row for row in rows}
+        self.by_name = {fold_text(row['name']): row['id'] for row in rows}
+
+    def get(self, pk):
+        return self.by_id.get(pk)
+
+    def resolve_name(self, name):
+        """Id of the category called `name` (case- and accent-insensitive), or None."""
+        return self.by_name.get(fold_text(name))
+
+    def active(self):
+        return [row for row in self.by_id.values() if row['is_active']]
+
+
+def build_catalog():
+    return CategoryCatalog(list(
+        VendorServiceCategory.objects.values('id', 'name', 'description', 'is_active')
+    ))
+
+
+categories = VersionedSnapshot('service-categories', build_catalog)
+
+
+def get_catalog():
+    return categories.get()
@@ -0,0 +1,276 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from search import cache as search_cache
+from .catalog import get_catalog
+from .models import VendorService, PricingTier
+
+CHUNK_SIZE = 500
+# Errors beyond this many are counted but not listed, so the report stays bounded
+MAX_REPORTED_ERRORS = 1000
+# Reported on the first unreadable line; rows before it are imported, none after it
+STOPPED = 'Import stopped at this line'
+
+# bulk_create skips auto_now, so updated_at is set on the rows and listed here
+SERVICE_FIELDS = ['category_id', 'description', 'base_price', 'is_active', 'updated_at']
+TIER_FIELDS = ['description', 'price', 'min_quantity', 'max_quantity', 'is_active', 'updated_at']
+
+
+class ServiceRowSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    category = serializers.CharField()
+    description = serializers.CharField(allow_blank=True, default='')
+    base_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    is_active = serializers.BooleanField(default=True)
+
+    def validate_category(self, value):
+        catalog = get_catalog()
+        category_id = int(value) if value.isdigit() and catalog.get(int(value)) else catalog.resolve_name(value)
+        if category_id is None:
+            raise serializers.ValidationError(f'Unknown category {value!r}')
+        return category_id
+
+
+class TierRowSerializer(serializers.Serializer):
+    tier_name = serializers.CharField(max_length=100)
+    description = serializers.CharField(allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    min_quantity = serializers.IntegerField(min_value=0, default=1)
+    max_quantity = serializers.IntegerField(min_value=0, allow_null=True, default=None)
+    is_active = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        if data['max_quantity'] is not None and data['max_quantity'] < data['min_quantity']:
+            raise serializers.ValidationError('max_quantity must not be below min_quantity')
+        return data
+
+
+def _csv_records(stream):
+    """
+    One record per CSV row: service columns plus optional `tier_*` columns.
+
+    A service with several tiers repeats its service columns on each row.
+    """
+    for row in csv.DictReader(stream):
+        row = {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        tier = None
+        if row.get('tier_name'):
+            tier = {
+                'tier_name': row['tier_name'],
+                'description': row.get('tier_description', ''),
+                'price': row.get('tier_price'),
+                'min_quantity': row.get('min_quantity') or 1,
+                'max_quantity': row.get('max_quantity') or None,
+                'is_active': row.get('tier_is_active') or True,
+            }
+        service = {key: row[key] for key in ('name', 'category', 'description', 'base_price', 'is_active') if row.get(key)}
+        yield service, [tier] if tier else []
+
+
+def _ndjson_records(stream):
+    """One record per line: a service object with an optional `tiers` list."""
+    for line in stream:
+        if not line.strip():
+            yield None, None
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield {'__error__': f'Invalid JSON: {exc}'}, []
+            continue
+        if not isinstance(data, dict):
+            yield {'__error__': 'Expected a JSON object'}, []
+            continue
+        tiers = data.pop('tiers', None) or []
+        yield data, tiers if isinstance(tiers, list) else [tiers]
+
+
+def records(stream, file_format):
+    """
+    Yield (line number, service dict, tier dicts) from a text stream without reading it all.
+
+    A decoding or CSV parsing error ends the stream: it is yielded as an
+    error record on the first line that could not be read.
+    """
+    if file_format == 'csv':
+        # Line 1 is the header
+        numbered, number = enumerate(_csv_records(stream), start=2), 1
+    elif file_format == 'ndjson':
+        numbered, number = enumerate(_ndjson_records(stream), start=1), 0
+    else:
+        raise ValueError(f'Unsupported format {file_format!r}; use csv or ndjson')
+
+    try:
+        for number, (service, tiers) in numbered:
+            if service is not None:
+                yield number, service, tiers
+    except UnicodeDecodeError:
+        yield number + 1, {'__error__': f'{STOPPED}: the file is not UTF-8 encoded'}, []
+    except csv.Error as exc:
+        yield number + 1, {'__error__': f'{STOPPED}: malformed CSV: {exc}'}, []
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.services = 0
+        self.tiers = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'services_upserted': self.services,
+            'tiers_upserted': self.tiers,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+        }
+
+
+class RowValidator:
+    """Validate import rows with one serializer instance each, avoiding DRF's per-instance field copies."""
+
+    def __init__(self, report):
+        self.report = report
+        self.service = ServiceRowSerializer()
+        self.tier = TierRowSerializer()
+
+    def __call__(self, number, service, tiers):
+        if '__error__' in service:
+            self.report.error(number, {'non_field_errors': [service['__error__']]})
+            return None
+
+        try:
+            data = self.service.run_validation(service)
+            valid_tiers = []
+            for index, tier in enumerate(tiers):
+                try:
+                    valid_tiers.append(self.tier.run_validation(tier if isinstance(tier, dict) else {}))
+                except serializers.ValidationError as exc:
+                    raise serializers.ValidationError({f'tiers[{index}]': exc.detail})
+        except serializers.ValidationError as exc:
+            self.report.error(number, exc.detail)
+            return None
+        return data, valid_tiers
+
+
+def _conflict_target(fields):
+    """unique_fields for a conflict upsert; MySQL takes none and matches on any unique key."""
+    features = connections[VendorService.objects.db].features
+    return {'unique_fields': fields} if features.supports_update_conflicts_with_target else {}
+
+
+def _upsert_chunk(vendor, chunk):
+    now = timezone.now()
+    # Later rows win when a chunk names the same service or tier twice
+    services = {}
+    tiers = {}
+    for data, service_tiers in chunk:
+        services[data['name']] = VendorService(
+            vendor=vendor,
+            name=data['name'],
+            category_id=data['category'],
+            description=data['description'],
+            base_price=data['base_price'],
+            is_active=data['is_active'],
+            updated_at=now,
+        )
+        for tier in service_tiers:
+            tiers[(data['name'], tier['tier_name'])] = tier
+
+    with transaction.atomic():
+        VendorService.objects.bulk_create(
+            list(services.values()),
+            update_conflicts=True,
+            **_conflict_target(['vendor', 'name']),
+            update_fields=SERVICE_FIELDS,
+        )
+        if tiers:
+            # Conflict upserts don't return primary keys on every backend
+            service_ids = dict(
+                VendorService.objects.filter(vendor=vendor, name__in={name for name, tier_name in tiers})
+                .values_list('name', 'id')
+            )
+            PricingTier.objects.bulk_create(
+                [
+                    PricingTier(service_id=service_ids[name], updated_at=now, **tier)
+                    for (name, tier_name), tier in tiers.items()
+                ],
+                update_conflicts=True,
+                **_conflict_target(['service', 'tier_name']),
+                update_fields=TIER_FIELDS,
+            )
+    return len(services), len(tiers)
+
+
+def import_services(vendor, stream, file_format, chunk_size=CHUNK_SIZE):
+    """
+    Upsert the vendor's services and pricing tiers from a CSV or NDJSON text stream.
+
+    Rows are read and validated `chunk_size` at a time and each chunk is
+    written in its own transaction, so memory stays flat for any file
+    size. Invalid rows are skipped and reported by line number; a chunk
+    that fails in the database is rolled back and reported as a whole. A
+    file that stops decoding or parsing partway is imported up to that
+    line, and the report says where it stopped.
+    """
+    report = ImportReport()
+    validate = RowValidator(report)
+    rows = records(stream, file_format)
+
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            break
+        report.rows += len(batch)
+
+        chunk = []
+        for number, service, tiers in batch:
+            valid = validate(number, service, tiers)
+            if valid:
+                chunk.append(valid)
+        if not chunk:
+            continue
+
+        try:
+            services, tiers = _upsert_chunk(vendor, chunk)
+        except DatabaseError as exc:
+            report.error(f'{batch[0][0]}-{batch[-1][0]}', {'non_field_errors': [f'Chunk not saved: {exc}']})
+            continue
+        report.services += services
+        report.tiers += tiers
+
+    if report.services:
+        # bulk_create sends no post_save signals
+        search_cache.invalidate_pages()
+    return report
+
+
+FORMATS_BY_EXTENSION = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+def detect_format(filename, requested=None):
+    if requested:
+        return requested if requested in ('csv', 'ndjson') else None
+    for extension, file_format in FORMATS_BY_EXTENSION.items():
+        if (filename or '').lower().endswith(extension):
+            return file_format
+    return None
+
+
+def text_stream(uploaded_file, encoding='utf-8'):
+    """Wrap an upload's underlying binary file as text without reading it into memory."""
+    return io.TextIOWrapper(getattr(uploaded_file, 'file', uploaded_file), encoding=encoding, newline='')
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from vendors.models import Vendor
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill Vendor.city_normalized and state_normalized for existing rows, in primary key '
+        'batches with one short transaction each. Safe to rerun; only stale rows are written.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read per batch (default: 1000)')
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to pause between batches, to spare replicas on large tables',
+        )
+
+    def handle(self, *args, **options):
+        fields = list(Vendor.NORMALIZED_FIELDS.values())
+        columns = [*Vendor.NORMALIZED_FIELDS, *fields]
+        last_pk = 0
+        scanned = updated = 0
+
+        while True:
+            batch = list(
+                Vendor.objects.filter(pk__gt=last_pk).order_by('pk').only(*columns)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            stale = []
+            for vendor in batch:
+                current = [getattr(vendor, field) for field in fields]
+                vendor.sync_normalized()
+                if current != [getattr(vendor, field) for field in fields]:
+                    stale.append(vendor)
+            if stale:
+                # bulk_update leaves updated_at alone and sends no signals, as a data migration should
+                with transaction.atomic():
+                    Vendor.objects.bulk_update(stale, fields)
+                updated += len(stale)
+
+            self.stdout.write(f'{scanned} vendors scanned, {updated} updated (last id {last_pk})')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {updated} of {scanned} vendors updated'))
@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from vendors.importers import CHUNK_SIZE, detect_format, import_services
+from vendors.models import Vendor
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON file of services and pricing tiers into a vendor's catalogue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('vendor', help='Vendor email or vendor_id')
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Default: from the file extension')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows validated and written per transaction')
+        parser.add_argument('--errors', help='Write the full error report as JSON to this path')
+
+    def handle(self, *args, **options):
+        try:
+            vendor = Vendor.objects.get(Q(email=options['vendor']) | Q(vendor_id=options['vendor']))
+        except Vendor.DoesNotExist:
+            raise CommandError(f"Vendor {options['vendor']!r} not found")
+
+        file_format = detect_format(options['path'], options['format'])
+        if not file_format:
+            raise CommandError('Cannot tell the format from the file name; pass --format')
+
+        with open(options['path'], encoding='utf-8', newline='') as stream:
+            report = import_services(vendor, stream, file_format, chunk_size=options['chunk_size']).as_dict()
+
+        self.stdout.write(
+            f"{report['rows']} rows: {report['services_upserted']} services and "
+            f"{report['tiers_upserted']} tiers upserted, {report['error_count']} errors"
+        )
+        for error in report['errors'][:20]:
+            self.stdout.write(self.style.WARNING(f"line {error['line']}: {json.dumps(error['errors'])}"))
+        if options['errors']:
+            with open(options['errors'], 'w') as handle:
+                json.dump(report, handle, indent=2)
@@ -1,11 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import uuid
 import os
 
+from utils.text import fold_text
+
 # -------------------------------
 # Utility Functions / Validators
 # -------------------------------
@@ -47,6 +50,9 @@ class Vendor(AbstractUser):
     address = models.TextField()
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=100)
+    # Case- and accent-folded copies (utils.text.fold_text) for indexed exact-match filters
+    city_normalized = models.CharField(max_length=100, blank=True, editable=False)
+    state_normalized = models.CharField(max_length=100, blank=True, editable=False)
     country = models.CharField(max_length=100)
     zip_code = models.CharField(max_length=20)
     phone = models.CharField(max_length=20)
@@ -66,11 +72,25 @@ class Vendor(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['company_name']
 
+    NORMALIZED_FIELDS = {'city': 'city_normalized', 'state': 'state_normalized'}
+
     def save(self, *args, **kwargs):
         if not self.vendor_id:
             self.vendor_id = self.generate_vendor_id()
+        self.sync_normalized()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields,
+                *(self.NORMALIZED_FIELDS[name] for name in update_fields if name in self.NORMALIZED_FIELDS),
+            }
         super().save(*args, **kwargs)
 
+    def sync_normalized(self):
+        """Refresh the folded copies; bulk_create() and update() callers must do this themselves."""
+        for source, target in self.NORMALIZED_FIELDS.items():
+            setattr(self, target, fold_text(getattr(self, source)))
+
     def generate_vendor_id(self):
         return f"V{str(timezone.now().timestamp()).replace('.', '')[-8:]}"
 
@@ -81,7 +101,7 @@ class Vendor(AbstractUser):
         db_table = 'vendors'
         indexes = [
             models.Index(fields=['status', 'rating']),
-            models.Index(fields=['city', 'state']),
+            models.Index(fields=['city_normalized', 'state_normalized']),
         ]
 
 # -------------------------------
@@ -133,14 +153,53 @@ class PricingTier(models.Model):
     min_quantity = models.PositiveIntegerField(default=1)
     max_quantity = models.PositiveIntegerField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'pricing_tiers'
         ordering = ['min_quantity']
+        unique_together = ['service', 'tier_name']
 
     def __str__(self):
         return f"{self.service.name} - {self.tier_name}"
 
+# -------------------------------
+# Availability Rule
+# -------------------------------
+
+class AvailabilityRule(models.Model):
+    """Weekly availability template; occurrences are expanded on read and stored as slots only when booked."""
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='availability_rules')
+    service = models.ForeignKey(VendorService, on_delete=models.CASCADE, related_name='availability_rules')
+    # Bit n set = open on weekday n (Monday = 0)
+    weekdays = models.PositiveSmallIntegerField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    max_capacity = models.PositiveIntegerField(default=1)
+    valid_from = models.DateField()
+    valid_until = models.DateField(null=True, blank=True)
+    excluded_dates = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def occurs_on(self, day):
+        return bool(
+            self.is_active
+            and self.valid_from <= day
+            and (self.valid_until is None or day <= self.valid_until)
+            and self.weekdays & (1 << day.weekday())
+            and day.isoformat() not in self.excluded_dates
+        )
+
+    def __str__(self):
+        return f"{self.service.name} {self.start_time}-{self.end_time} from {self.valid_from}"
+
+    class Meta:
+        db_table = 'availability_rules'
+        indexes = [
+            models.Index(fields=['vendor', 'valid_from']),
+        ]
+
 # -------------------------------
 # Availability Slot
 # -------------------------------
@@ -154,9 +213,13 @@ class AvailabilitySlot(models.Model):
     is_available = models.BooleanField(default=True)
     max_capacity = models.PositiveIntegerField(default=1)
     booked_capacity = models.PositiveIntegerField(default=0)
+    # Capacity reserved by unexpired checkout holds (bookings.SlotHold)
+    held_capacity = models.PositiveIntegerField(default=0)
+    # Set when the slot was materialized from a rule occurrence
+    rule = models.ForeignKey(AvailabilityRule, on_delete=models.SET_NULL, null=True, blank=True, related_name='slots')
 
     def is_fully_booked(self):
-        return not self.is_available or self.booked_capacity >= self.max_capacity
+        return not self.is_available or self.booked_capacity + self.held_capacity >= self.max_capacity
 
     def __str__(self):
         return f"{self.vendor.company_name} - {self.service.name} on {self.date} ({self.start_time} - {self.end_time})"
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from .models import Vendor, VendorService, PricingTier, AvailabilitySlot
+from .models import Vendor, VendorService, VendorServiceCategory, PricingTier, AvailabilitySlot, AvailabilityRule
+from .catalog import get_catalog
 from utils.file_validation import FileSizeValidator, ImageDimensionValidator
+from utils.sparse_fields import SparseFieldsMixin
 
 class VendorRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -56,7 +58,17 @@ class VendorLoginSerializer(serializers.Serializer):
             
         raise serializers.ValidationError('Email and password are required')
         
-class VendorProfileSerializer(serializers.ModelSerializer):
+class CategorySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VendorServiceCategory
+        fields = ['id', 'name']
+        
+class ServiceSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VendorService
+        fields = ['id', 'name', 'base_price', 'is_active']
+        
+class VendorProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Vendor
         fields = [
@@ -66,13 +78,29 @@ class VendorProfileSerializer(serializers.ModelSerializer):
             'status', 'created_at'
         ]
         read_only_fields = ['vendor_id', 'rating', 'total_reviews', 'status', 'created_at']
+        expandable_fields = {'services': ServiceSummarySerializer}
         
 class PricingTierSerializer(serializers.ModelSerializer):
     class Meta:
         model = PricingTier
         fields = ['id', 'tier_name', 'description', 'price', 'min_quantity', 'max_quantity', 'is_active']
         
-class VendorServiceSerializer(serializers.ModelSerializer):
+class CategoryField(serializers.PrimaryKeyRelatedField):
+    """Category primary key validated against the in-process catalog instead of the DB."""
+    
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            row = get_catalog().get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if row is None:
+            self.fail('does_not_exist', pk_value=data)
+        return VendorServiceCategory(**row)
+        
+class VendorServiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    category = CategoryField(queryset=VendorServiceCategory.objects.all())
     pricing_tiers = PricingTierSerializer(many=True, read_only=True)
     
     class Meta:
@@ -81,14 +109,17 @@ class VendorServiceSerializer(serializers.ModelSerializer):
             'id', 'category', 'name', 'description', 'base_price', 
             'is_active', 'pricing_tiers', 'created_at'
         ]
+        expandable_fields = {'category': CategorySummarySerializer}
         
-class AvailabilitySlotSerializer(serializers.ModelSerializer):
+class AvailabilitySlotSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = AvailabilitySlot
         fields = [
             'id', 'service', 'date', 'start_time', 'end_time',
-            'is_available', 'max_capacity', 'booked_capacity'
+            'is_available', 'max_capacity', 'booked_capacity', 'held_capacity', 'rule'
         ]
+        read_only_fields = ['held_capacity', 'rule']
+        expandable_fields = {'service': ServiceSummarySerializer}
         
     def validate(self, data):
         # Check if end time is after start time
@@ -114,4 +145,53 @@ class AvailabilitySlotSerializer(serializers.ModelSerializer):
             if overlapping_slots.exists():
                 raise serializers.ValidationError('Time slot overlaps with existing availability')
                 
-        return data
\ No newline at end of file
+        return data
+        
+class WeekdaysField(serializers.Field):
+    """Weekdays as a list of numbers (Monday = 0), stored as a bitmask."""
+    
+    def to_representation(self, value):
+        return [day for day in range(7) if value & (1 << day)]
+        
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError('Expected a non-empty list of weekdays (0 = Monday).')
+        mask = 0
+        for day in data:
+            if not isinstance(day, int) or isinstance(day, bool) or not 0 <= day <= 6:
+                raise serializers.ValidationError(f'Invalid weekday {day!r}; use 0 (Monday) to 6 (Sunday).')
+            mask |= 1 << day
+        return mask
+        
+class AvailabilityRuleSerializer(serializers.ModelSerializer):
+    weekdays = WeekdaysField()
+    excluded_dates = serializers.ListField(child=serializers.DateField(), required=False)
+    
+    class Meta:
+        model = AvailabilityRule
+        fields = [
+            'id', 'service', 'weekdays', 'start_time', 'end_time', 'max_capacity',
+            'valid_from', 'valid_until', 'excluded_dates', 'is_active', 'created_at'
+        ]
+        read_only_fields = ['created_at']
+        
+    def validate_service(self, service):
+        vendor = self.context.get('vendor')
+        if vendor is not None and service.vendor_id != vendor.pk:
+            raise serializers.ValidationError('Service not found')
+        return service
+        
+    def validate(self, data):
+        start_time = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = data.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time and end_time and end_time <= start_time:
+            raise serializers.ValidationError('End time must be after start time')
+            
+        valid_from = data.get('valid_from', getattr(self.instance, 'valid_from', None))
+        valid_until = data.get('valid_until', getattr(self.instance, 'valid_until', None))
+        if valid_from and valid_until and valid_until < valid_from:
+            raise serializers.ValidationError('valid_until must not be before valid_from')
+            
+        if 'excluded_dates' in data:
+            data['excluded_dates'] = sorted({day.isoformat() for day in data['excluded_dates']})
+        return data
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .availability_calendar import invalidate_calendar
+from .catalog import categories
+from .models import AvailabilityRule, AvailabilitySlot, VendorServiceCategory
+
+
+@receiver(post_save, sender=VendorServiceCategory)
+@receiver(post_delete, sender=VendorServiceCategory)
+def category_changed(sender, instance, **kwargs):
+    # Every worker reloads its category snapshot within a second of the commit; bumping
+    # the version earlier lets a worker cache the old rows under the new version
+    transaction.on_commit(categories.invalidate)
+
+
+@receiver(post_save, sender=AvailabilitySlot)
+@receiver(post_delete, sender=AvailabilitySlot)
+def slot_changed(sender, instance, **kwargs):
+    invalidate_calendar(instance.vendor_id, instance.date)
+
+
+@receiver(post_save, sender=AvailabilityRule)
+@receiver(post_delete, sender=AvailabilityRule)
+def rule_changed(sender, instance, **kwargs):
+    # A rule spans many months
+    invalidate_calendar(instance.vendor_id)
@@ -1,8 +1,25 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import Vendor, VendorService
+from django.core.cache import cache
+from .models import Vendor, VendorService, VendorServiceCategory, AvailabilityRule, AvailabilitySlot, PricingTier
+from .importers import import_services
+from .catalog import categories, get_catalog
+from .serializers import VendorServiceSerializer
+from services.filters import VendorFilter
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 class VendorTestCase(APITestCase):
@@ -116,4 +133,455 @@ class VendorServiceTestCase(APITestCase):
         # Verify service was created
         service = VendorService.objects.get(name=service_data['name'])
         self.assertEqual(service.vendor, self.vendor)
-        self.assertEqual(str(service.base_price), service_data['base_price'])
\ No newline at end of file
+        self.assertEqual(str(service.base_price), service_data['base_price'])
+        
+class CategoryCatalogTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = VendorServiceCategory.objects.create(name='Catering')
+            
+    def test_lookups_do_not_query_after_first_load(self):
+        get_catalog()
+        
+        with self.assertNumQueries(0):
+            catalog = get_catalog()
+            self.assertEqual(catalog.resolve_name(' CATERING '), self.category.pk)
+            self.assertEqual(catalog.get(self.category.pk)['name'], 'Catering')
+            serializer = VendorServiceSerializer(data={
+                'category': self.category.pk, 'name': 'Buffet', 'description': 'x', 'base_price': '10.00'
+            })
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            
+        self.assertEqual(serializer.validated_data['category'].pk, self.category.pk)
+        self.assertFalse(VendorServiceSerializer(data={
+            'category': 999, 'name': 'Buffet', 'description': 'x', 'base_price': '10.00'
+        }).is_valid())
+        
+    def test_admin_change_publishes_new_version(self):
+        get_catalog()
+        self.category.name = 'Catering & Events'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+            
+        self.assertEqual(get_catalog().resolve_name('catering & events'), self.category.pk)
+        
+    def test_version_changes_only_after_commit(self):
+        version = cache.get(categories.version_key)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.category.name = 'Events'
+            self.category.save()
+            self.assertEqual(cache.get(categories.version_key), version)
+            
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get(categories.version_key), version)
+        
+    def test_other_worker_reloads_after_version_change(self):
+        get_catalog()
+        VendorServiceCategory.objects.filter(pk=self.category.pk).update(name='Events')
+        cache.set(categories.version_key, 'changed-elsewhere')
+        categories._checked_at -= categories.check_interval
+        
+        self.assertEqual(get_catalog().resolve_name('events'), self.category.pk)
+        self.assertEqual(get_catalog().resolve_name(' ÉVENTS '), self.category.pk)
+        
+    def test_search_filter_resolves_category_by_name(self):
+        vendor = Vendor.objects.create(email='v@example.com', vendor_id='V1', company_name='V', status='approved')
+        VendorService.objects.create(
+            vendor=vendor, category=self.category, name='Buffet', description='', base_price=100
+        )
+        
+        matched = VendorFilter({'service_category': 'catering'}, queryset=Vendor.objects.all()).qs
+        missing = VendorFilter({'service_category': 'unknown'}, queryset=Vendor.objects.all()).qs
+        
+        self.assertEqual(list(matched), [vendor])
+        self.assertEqual(list(missing), [])
+        self.assertNotIn('vendor_service_categories', str(matched.query))
+        
+class VendorLocationFilterTestCase(TestCase):
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            email='v@example.com', vendor_id='V1', company_name='V', status='approved', city=' São  Paulo', state='SP'
+        )
+        
+    def search(self, **params):
+        return list(VendorFilter(params, queryset=Vendor.objects.all()).qs)
+        
+    def test_case_and_accent_insensitive_exact_match(self):
+        self.assertEqual((self.vendor.city_normalized, self.vendor.state_normalized), ('sao paulo', 'sp'))
+        self.assertEqual(self.search(city='SAO PAULO', state='sp'), [self.vendor])
+        self.assertEqual(self.search(city='são paulo'), [self.vendor])
+        self.assertEqual(self.search(city='Sao'), [])
+        
+        sql = str(VendorFilter({'city': 'x'}, queryset=Vendor.objects.all()).qs.query)
+        self.assertIn('"city_normalized" = x', sql)
+        self.assertNotIn('UPPER', sql)
+        
+    def test_kept_in_sync_on_save(self):
+        self.vendor.city = 'Pune'
+        self.vendor.save(update_fields=['city'])
+        
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.city_normalized, 'pune')
+        
+    def test_backfill(self):
+        Vendor.objects.update(city_normalized='', state_normalized='')
+        out = io.StringIO()
+        call_command('backfill_normalized_columns', batch_size=1, stdout=out)
+        
+        self.assertIn('Done: 1 of 1 vendors updated', out.getvalue())
+        self.assertEqual(self.search(city='sao paulo'), [self.vendor])
+        
+class VendorAdminTestCase(TestCase):
+    def setUp(self):
+        self.staff = Vendor.objects.create(
+            email='staff@example.com', vendor_id='STAFF', company_name='Staff', is_staff=True, is_superuser=True
+        )
+        self.pending = Vendor.objects.create(email='p@example.com', vendor_id='V1', company_name='Pending')
+        self.approved = Vendor.objects.create(
+            email='a@example.com', vendor_id='V2', company_name='Approved', status='approved'
+        )
+        self.client.force_login(self.staff)
+        
+    def test_approve_action_updates_and_logs_changed_vendors(self):
+        response = self.client.post(reverse('admin:vendors_vendor_changelist'), {
+            'action': 'approve_vendors', '_selected_action': [self.pending.id, self.approved.id],
+        })
+        
+        self.assertEqual(response.status_code, 302)
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.status, 'approved')
+        self.assertEqual(
+            list(LogEntry.objects.values_list('object_id', 'object_repr', 'user_id')),
+            [(str(self.pending.id), 'Pending', self.staff.id)]
+        )
+        
+    def test_large_unfiltered_changelist_uses_estimated_count(self):
+        with mock.patch('utils.paginators.estimated_row_count', return_value=2500000) as estimate:
+            response = self.client.get(reverse('admin:vendors_vendor_changelist'))
+            self.assertContains(response, '2500000 vendors')
+            
+            filtered = self.client.get(reverse('admin:vendors_vendor_changelist'), {'status__exact': 'approved'})
+            self.assertContains(filtered, '1 vendor')
+            
+        estimate.assert_called_once()
+        
+class AvailabilityRuleTestCase(APITestCase):
+    def setUp(self):
+        self.vendor = Vendor.objects.create(email='v@example.com', vendor_id='V1', company_name='V', status='approved')
+        category = VendorServiceCategory.objects.create(name='Catering')
+        self.service = VendorService.objects.create(
+            vendor=self.vendor, category=category, name='Buffet', description='', base_price=100
+        )
+        self.client.force_authenticate(self.vendor)
+        # Mondays and Wednesdays, 2030-01-07 is a Monday
+        response = self.client.post('/api/vendor/availability/rules/', {
+            'service': self.service.id, 'weekdays': [0, 2], 'start_time': '10:00', 'end_time': '12:00',
+            'max_capacity': 3, 'valid_from': '2030-01-07', 'excluded_dates': ['2030-01-16'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.rule = AvailabilityRule.objects.get()
+        
+    def slots(self, date_from='2030-01-01', date_to='2030-01-20'):
+        return self.client.get('/api/vendor/availability/', {'from': date_from, 'to': date_to}).data
+        
+    def test_rules_expand_for_the_requested_window(self):
+        with self.assertNumQueries(2):
+            slots = self.slots()
+            
+        self.assertEqual([slot['date'] for slot in slots], ['2030-01-07', '2030-01-09', '2030-01-14'])
+        self.assertEqual(slots[0]['id'], None)
+        self.assertEqual(slots[0]['rule'], self.rule.id)
+        self.assertEqual(AvailabilitySlot.objects.count(), 0)
+        self.assertEqual(self.client.get('/api/vendor/availability/rules/').data[0]['weekdays'], [0, 2])
+        
+    @override_settings(AVAILABILITY_RULE_HORIZON_DAYS=3650)
+    def test_first_booking_materializes_the_occurrence(self):
+        booking = {
+            'service_id': self.service.id, 'rule_id': self.rule.id, 'date': '2030-01-09',
+            'customer_name': 'Customer', 'customer_email': 'customer@example.com',
+        }
+        self.assertEqual(self.client.post('/api/bookings/', booking, format='json').status_code, 201)
+        self.assertEqual(self.client.post('/api/bookings/', booking, format='json').status_code, 201)
+        excluded = dict(booking, date='2030-01-16')
+        self.assertEqual(self.client.post('/api/bookings/', excluded, format='json').status_code, 400)
+        
+        slot = AvailabilitySlot.objects.get()
+        self.assertEqual((slot.date.isoformat(), slot.booked_capacity, slot.rule_id), ('2030-01-09', 2, self.rule.id))
+        slots = self.slots()
+        self.assertEqual([(s['date'], s['id'], s['booked_capacity']) for s in slots], [
+            ('2030-01-07', None, 0), ('2030-01-09', slot.id, 2), ('2030-01-14', None, 0)
+        ])
+        
+    def test_occurrence_is_validated_before_a_slot_is_stored(self):
+        today = date.today()
+        rule = AvailabilityRule.objects.create(
+            vendor=self.vendor, service=self.service, weekdays=127, start_time='08:00',
+            end_time='09:00', valid_from=today - timedelta(days=30)
+        )
+        other = VendorService.objects.create(
+            vendor=self.vendor, category=self.service.category, name='Other', description='', base_price=1
+        )
+        booking = {
+            'service_id': self.service.id, 'rule_id': rule.id, 'date': (today + timedelta(days=1)).isoformat(),
+            'customer_name': 'Customer', 'customer_email': 'customer@example.com',
+        }
+        rejected = [
+            dict(booking, customer_email='not-an-email'),
+            dict(booking, service_id=other.id),
+            dict(booking, date=(today - timedelta(days=7)).isoformat()),
+            dict(booking, date=(today + timedelta(days=settings.AVAILABILITY_RULE_HORIZON_DAYS + 1)).isoformat()),
+        ]
+        for data in rejected:
+            self.assertEqual(self.client.post('/api/bookings/', data, format='json').status_code, 400, data)
+        self.assertFalse(AvailabilitySlot.objects.exists())
+        
+        self.assertEqual(self.client.post('/api/bookings/', booking, format='json').status_code, 201)
+        self.assertEqual(AvailabilitySlot.objects.get().rule_id, rule.id)
+        
+    def test_listing_window_is_bounded(self):
+        response = self.client.get('/api/vendor/availability/', {'from': '0001-01-01', 'to': '9999-12-31'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+    def test_invalid_rule_is_rejected(self):
+        response = self.client.post('/api/vendor/availability/rules/', {
+            'service': self.service.id, 'weekdays': [7], 'start_time': '12:00', 'end_time': '10:00',
+            'valid_from': '2030-01-07',
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+class AvailabilityCalendarTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = Vendor.objects.create(email='v@example.com', vendor_id='V1', company_name='V', status='approved')
+        category = VendorServiceCategory.objects.create(name='Catering')
+        self.service = VendorService.objects.create(
+            vendor=self.vendor, category=category, name='Buffet', description='', base_price=100
+        )
+        self.client.force_authenticate(self.vendor)
+        
+    def slot(self, day, start='10:00', capacity=2, booked=0, **kwargs):
+        return AvailabilitySlot.objects.create(
+            vendor=self.vendor, service=self.service, date=day, start_time=start, end_time='23:00',
+            max_capacity=capacity, booked_capacity=booked, **kwargs
+        )
+        
+    def calendar(self, **params):
+        return self.client.get('/api/vendor/availability/calendar/', {'month': '2030-02', **params})
+        
+    def test_month_summary(self):
+        self.slot('2030-02-01')
+        self.slot('2030-02-02', booked=1)
+        self.slot('2030-02-02', start='12:00', booked=2)
+        self.slot('2030-02-03', booked=2)
+        self.slot('2030-02-04', is_available=False)
+        # Every Saturday from Feb 9 except Feb 16, at a time with no stored slot
+        AvailabilityRule.objects.create(
+            vendor=self.vendor, service=self.service, weekdays=1 << 5, start_time='09:00',
+            end_time='10:00', max_capacity=4, valid_from='2030-02-09', excluded_dates=['2030-02-16']
+        )
+        
+        with self.assertNumQueries(3):
+            data = self.calendar(by_service='1').data
+            
+        self.assertEqual(data['days'], 28)
+        self.assertEqual(data['status'], '1230' + '0' * 4 + '1' + '0' * 13 + '1' + '0' * 5)
+        self.assertEqual(data['free'][:4], [2, 1, 0, 0])
+        self.assertEqual(data['capacity'][:4], [2, 4, 2, 0])
+        self.assertEqual(data['free'][8], 4)
+        self.assertEqual(data['services'][str(self.service.id)]['status'], data['status'])
+        
+    def test_cached_until_a_slot_changes(self):
+        slot = self.slot('2030-02-01')
+        self.calendar()
+        
+        with self.assertNumQueries(0):
+            self.calendar()
+            
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.booked_capacity = 2
+            slot.save()
+            
+        self.assertEqual(self.calendar().data['status'][0], '3')
+        
+    def test_invalid_month(self):
+        self.assertEqual(self.calendar(month='2030-13').status_code, status.HTTP_400_BAD_REQUEST)
+        
+class SparseFieldsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = Vendor.objects.create(email='v@example.com', vendor_id='V1', company_name='V', status='approved')
+        self.category = VendorServiceCategory.objects.create(name='Catering')
+        self.service = VendorService.objects.create(
+            vendor=self.vendor, category=self.category, name='Buffet', description='', base_price=100
+        )
+        PricingTier.objects.create(service=self.service, tier_name='Large', price=150, min_quantity=10)
+        self.client.force_authenticate(self.vendor)
+        
+    def test_fields_narrow_output_and_queries(self):
+        with self.assertNumQueries(2):
+            full = self.client.get('/api/vendor/services/').data
+        self.assertEqual(len(full[0]['pricing_tiers']), 1)
+        
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/vendor/services/', {'fields': 'id,name'})
+        self.assertEqual(response.data, [{'id': self.service.id, 'name': 'Buffet'}])
+        
+    def test_expand_matches_between_list_and_detail(self):
+        params = {'fields': 'id,category', 'expand': 'category'}
+        listed = self.client.get('/api/vendor/services/', params).data[0]
+        detail = self.client.get(f'/api/vendor/services/{self.service.id}/', params).data
+        
+        self.assertEqual(listed, {'id': self.service.id, 'category': {'id': self.category.id, 'name': 'Catering'}})
+        self.assertEqual(detail, listed)
+        
+    def test_profile_expands_services(self):
+        data = self.client.get('/api/vendor/profile/', {'fields': 'vendor_id', 'expand': 'services'}).data
+        
+        self.assertEqual(data['vendor_id'], 'V1')
+        self.assertEqual([service['name'] for service in data['services']], ['Buffet'])
+        self.assertEqual(set(data), {'vendor_id', 'services'})
+        
+    def test_slots_with_rule_occurrences(self):
+        AvailabilitySlot.objects.create(
+            vendor=self.vendor, service=self.service, date='2030-01-08', start_time='10:00',
+            end_time='12:00', max_capacity=2
+        )
+        # Mondays, 2030-01-07 is a Monday
+        AvailabilityRule.objects.create(
+            vendor=self.vendor, service=self.service, weekdays=1, start_time='10:00',
+            end_time='12:00', max_capacity=3, valid_from='2030-01-07'
+        )
+        
+        slots = self.client.get('/api/vendor/availability/', {
+            'from': '2030-01-07', 'to': '2030-01-08', 'fields': 'date', 'expand': 'service',
+        }).data
+        
+        summary = {'id': self.service.id, 'name': 'Buffet', 'base_price': '100.00', 'is_active': True}
+        self.assertEqual(slots, [
+            {'date': '2030-01-07', 'service': summary},
+            {'date': '2030-01-08', 'service': summary},
+        ])
+        
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get('/api/vendor/services/', {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.get(f'/api/vendor/services/{self.service.id}/', {'expand': 'vendor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+class ServiceImportTestCase(APITestCase):
+    CSV = (
+        'name,category,description,base_price,tier_name,tier_price,min_quantity,max_quantity\n'
+        'Buffet,catering,Hot food,100,Small,90,1,10\n'
+        'Buffet,catering,Hot food,100,Large,80,11,\n'
+        'Portraits,Photography,,250,,,,\n'
+        'Broken,Unknown,,abc,,,,\n'
+        'Bad tier,Catering,,10,Tiny,5,9,2\n'
+    )
+    
+    def setUp(self):
+        cache.clear()
+        self.vendor = Vendor.objects.create(email='v@example.com', vendor_id='V1', company_name='V', status='approved')
+        VendorServiceCategory.objects.create(name='Catering')
+        VendorServiceCategory.objects.create(name='Photography')
+        self.client.force_authenticate(self.vendor)
+        
+    def upload(self, content, name='services.csv'):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post('/api/vendor/services/import/', {'file': upload}, format='multipart')
+        
+    def test_csv_import_reports_row_errors(self):
+        response = self.upload(self.CSV)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rows'], 5)
+        self.assertEqual((response.data['services_upserted'], response.data['tiers_upserted']), (2, 2))
+        self.assertEqual([error['line'] for error in response.data['errors']], [5, 6])
+        self.assertIn('category', response.data['errors'][0]['errors'])
+        buffet = VendorService.objects.get(vendor=self.vendor, name='Buffet')
+        self.assertEqual(
+            list(buffet.pricing_tiers.values_list('tier_name', 'price', 'max_quantity')),
+            [('Small', 90, 10), ('Large', 80, None)]
+        )
+        
+    def test_reimport_updates_in_place(self):
+        self.upload(self.CSV)
+        long_ago = timezone.now() - timedelta(days=30)
+        VendorService.objects.update(updated_at=long_ago)
+        PricingTier.objects.update(updated_at=long_ago)
+        lines = '\n'.join([
+            json.dumps({'name': 'Buffet', 'category': 'Catering', 'base_price': '120.50',
+                        'tiers': [{'tier_name': 'Small', 'price': '95'}]}),
+            '',
+            json.dumps({'name': 'Drone', 'category': 'photography', 'base_price': 300}),
+            '{not json',
+        ])
+        
+        report = import_services(self.vendor, io.StringIO(lines), 'ndjson', chunk_size=1).as_dict()
+        
+        self.assertEqual((report['services_upserted'], report['error_count']), (2, 1))
+        self.assertEqual(report['errors'][0]['line'], 4)
+        self.assertEqual(VendorService.objects.filter(vendor=self.vendor).count(), 3)
+        self.assertEqual(str(VendorService.objects.get(name='Buffet').base_price), '120.50')
+        self.assertEqual(PricingTier.objects.get(tier_name='Small').price, 95)
+        self.assertEqual(PricingTier.objects.count(), 2)
+        self.assertGreater(VendorService.objects.get(name='Buffet').updated_at, long_ago)
+        self.assertGreater(PricingTier.objects.get(tier_name='Small').updated_at, long_ago)
+        self.assertEqual(PricingTier.objects.get(tier_name='Large').updated_at, long_ago)
+        
+    def test_upsert_without_conflict_target(self):
+        # MySQL rejects unique_fields and resolves conflicts on the unique_together keys
+        targets = {VendorService: ['vendor', 'name'], PricingTier: ['service', 'tier_name']}
+        passed = []
+        bulk_create = QuerySet.bulk_create
+        
+        def without_target(queryset, objs, **kwargs):
+            passed.append('unique_fields' in kwargs)
+            # SQLite still needs the target to run the statement
+            with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', True):
+                return bulk_create(queryset, objs, unique_fields=targets[queryset.model], **kwargs)
+            
+        self.upload(self.CSV)
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=without_target):
+            lines = json.dumps({'name': 'Buffet', 'category': 'Catering', 'base_price': 130,
+                                'tiers': [{'tier_name': 'Small', 'price': '70'}]})
+            report = import_services(self.vendor, io.StringIO(lines), 'ndjson').as_dict()
+            
+        self.assertEqual(passed, [False, False])
+        self.assertEqual((report['services_upserted'], report['tiers_upserted'], report['error_count']), (1, 1, 0))
+        self.assertEqual(PricingTier.objects.get(tier_name='Small').price, 70)
+        
+    def test_unreadable_file_keeps_the_partial_report(self):
+        # Decoding runs a buffer at a time, so the bad byte sits beyond the first one
+        rows = ''.join(f'Service {i},Catering,,20\n' for i in range(500))
+        content = f'name,category,description,base_price\n{rows}'.encode() + b'Caf\xe9,Catering,,20\n'
+        response = self.client.post(
+            '/api/vendor/services/import/', {'file': SimpleUploadedFile('services.csv', content)}, format='multipart'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        imported = response.data['services_upserted']
+        self.assertGreater(imported, 0)
+        self.assertEqual(VendorService.objects.filter(vendor=self.vendor).count(), imported)
+        # Line 1 is the header
+        self.assertEqual(response.data['errors'], [{
+            'line': imported + 2,
+            'errors': {'non_field_errors': ['Import stopped at this line: the file is not UTF-8 encoded']},
+        }])
+        
+    def test_malformed_csv_keeps_the_partial_report(self):
+        # An unclosed quote runs past the field size limit
+        lines = 'name,category,base_price\nCake,Catering,20\n"Pie,Catering,30\n' + 'x' * (csv.field_size_limit() + 1)
+        report = import_services(self.vendor, io.StringIO(lines), 'csv', chunk_size=1).as_dict()
+        
+        self.assertEqual(report['services_upserted'], 1)
+        self.assertEqual(report['errors'][0]['line'], 3)
+        self.assertIn('malformed CSV', report['errors'][0]['errors']['non_field_errors'][0])
+        
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.upload('x', name='services.xlsx').status_code, status.HTTP_400_BAD_REQUEST)
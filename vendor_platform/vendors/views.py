@@ -2,24 +2,30 @@ from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.views import APIView
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
 from django.db import transaction
 from django.conf import settings
 import jwt
 from datetime import datetime, timedelta
 
-from .models import Vendor, VendorService, PricingTier, AvailabilitySlot
+from .models import Vendor, VendorService, PricingTier, AvailabilitySlot, AvailabilityRule
+from .availability import expand_rules, expansion_window
+from .availability_calendar import cached_calendar
+from .importers import import_services, detect_format, text_stream
 from .serializers import (
     VendorRegistrationSerializer, VendorLoginSerializer, 
     VendorProfileSerializer, VendorServiceSerializer,
-    AvailabilitySlotSerializer, PricingTierSerializer
+    AvailabilitySlotSerializer, PricingTierSerializer, AvailabilityRuleSerializer,
+    ServiceSummarySerializer
 )
 from utils.throttling import VendorThrottle
+from utils.fast_serializers import serialize_many
+from utils.sparse_fields import pick, requested_fields
+from utils.singleflight import cache_view
 from authentication.utils import generate_jwt_token  # add this import
 
 class VendorLoginView(APIView):
+    permission_classes = [permissions.AllowAny]
+    
     def post(self, request):
         serializer = VendorLoginSerializer(data=request.data)
         
@@ -37,6 +43,7 @@ class VendorLoginView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class VendorRegistrationView(APIView):
+    permission_classes = [permissions.AllowAny]
     throttle_classes = [VendorThrottle]
     
     def post(self, request):
@@ -61,7 +68,8 @@ class VendorProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        serializer = VendorProfileSerializer(request.user)
+        fields, expand = requested_fields(request)
+        serializer = VendorProfileSerializer(request.user, fields=fields, expand=expand)
         return Response(serializer.data)
         
     def put(self, request):
@@ -80,12 +88,11 @@ class VendorProfileView(APIView):
 class VendorServiceListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
-    @method_decorator(cache_page(60 * 5))  # Cache for 5 minutes
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_view(60 * 5, stale=60)  # Cache for 5 minutes, then serve stale while one request refreshes
     def get(self, request):
         services = VendorService.objects.filter(vendor=request.user, is_active=True)
-        serializer = VendorServiceSerializer(services, many=True)
-        return Response(serializer.data)
+        fields, expand = requested_fields(request)
+        return Response(serialize_many(VendorServiceSerializer, services, fields=fields, expand=expand))
         
     def post(self, request):
         serializer = VendorServiceSerializer(data=request.data)
@@ -96,6 +103,25 @@ class VendorServiceListView(APIView):
             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
+class VendorServiceImportView(APIView):
+    """Bulk upsert of services and pricing tiers from an uploaded CSV or NDJSON file."""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+            
+        file_format = detect_format(upload.name, request.data.get('format'))
+        if not file_format:
+            return Response(
+                {'error': 'format must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        report = import_services(request.user, text_stream(upload), file_format)
+        return Response(report.as_dict())
+        
 class VendorServiceDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -114,7 +140,8 @@ class VendorServiceDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
             
-        serializer = VendorServiceSerializer(service)
+        fields, expand = requested_fields(request)
+        serializer = VendorServiceSerializer(service, fields=fields, expand=expand)
         return Response(serializer.data)
         
     def put(self, request, pk):
@@ -157,6 +184,14 @@ class AvailabilitySlotView(APIView):
         date_to = request.query_params.get('to')
         service_id = request.query_params.get('service_id')
         
+        try:
+            start, end = expansion_window(date_from, date_to)
+        except ValueError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
         slots = AvailabilitySlot.objects.filter(vendor=request.user)
         
         if date_from:
@@ -168,8 +203,30 @@ class AvailabilitySlotView(APIView):
         if service_id:
             slots = slots.filter(service_id=service_id)
             
-        serializer = AvailabilitySlotSerializer(slots, many=True)
-        return Response(serializer.data)
+        # Merging in rule occurrences needs these keys; they are dropped again below if not requested
+        fields, expand = requested_fields(request)
+        data = serialize_many(
+            AvailabilitySlotSerializer, slots,
+            fields=None if fields is None else {'service', 'date', 'start_time', *fields}, expand=expand
+        )
+        
+        def slot_service(slot):
+            return slot['service']['id'] if 'service' in expand else slot['service']
+            
+        # Add rule occurrences in the window that have no stored slot yet
+        virtual = expand_rules(
+            request.user, start, end, service_id,
+            materialized=[(slot_service(slot), slot['date'], slot['start_time']) for slot in data]
+        )
+        if virtual:
+            if 'service' in expand:
+                services = VendorService.objects.filter(pk__in={slot['service'] for slot in virtual})
+                summaries = {service['id']: service for service in serialize_many(ServiceSummarySerializer, services)}
+                for slot in virtual:
+                    slot['service'] = summaries[slot['service']]
+            data = sorted(data + virtual, key=lambda slot: (slot['date'], slot['start_time']))
+            
+        return Response(pick(data, fields, expand))
         
     def post(self, request):
         serializer = AvailabilitySlotSerializer(
@@ -181,4 +238,80 @@ class AvailabilitySlotView(APIView):
             serializer.save(vendor=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+class AvailabilityCalendarView(APIView):
+    """Month view: per-day status string and free/total capacity arrays instead of full slot rows."""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        month = request.query_params.get('month') or datetime.now().strftime('%Y-%m')
+        service_id = request.query_params.get('service_id')
+        by_service = request.query_params.get('by_service') in ('1', 'true')
+        
+        if service_id and not service_id.isdigit():
+            return Response({'error': 'service_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+            
+        try:
+            data = cached_calendar(request.user, month, int(service_id) if service_id else None, by_service)
+        except ValueError:
+            return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+            
+        return Response(data)
+        
+class AvailabilityRuleListView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        rules = AvailabilityRule.objects.filter(vendor=request.user)
+        return Response(AvailabilityRuleSerializer(rules, many=True).data)
+        
+    def post(self, request):
+        serializer = AvailabilityRuleSerializer(data=request.data, context={'vendor': request.user})
+        
+        if serializer.is_valid():
+            serializer.save(vendor=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+class AvailabilityRuleDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self, pk, vendor):
+        try:
+            return AvailabilityRule.objects.get(pk=pk, vendor=vendor)
+        except AvailabilityRule.DoesNotExist:
+            return None
+            
+    def put(self, request, pk):
+        rule = self.get_object(pk, request.user)
+        
+        if not rule:
+            return Response(
+                {'error': 'Availability rule not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+            
+        serializer = AvailabilityRuleSerializer(
+            rule, data=request.data, partial=True, context={'vendor': request.user}
+        )
+        
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+            
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+    def delete(self, request, pk):
+        rule = self.get_object(pk, request.user)
+        
+        if not rule:
+            return Response(
+                {'error': 'Availability rule not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+            
+        # Slots already materialized from the rule (and their bookings) are kept
+        rule.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file